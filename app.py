@@ -11,6 +11,12 @@ warnings.filterwarnings("ignore", category=SAWarning, message=".*Unrecognized se
 
 # models.py'deki db objesini import et
 from models import db
+from services.db_health import get_db_health_monitor
+from services.log_writer import get_log_writer
+from services.replica_router import get_replica_router
+from services.stats_service import get_stats_service
+from services.message_search import get_message_search
+from services.pool_metrics import TimedQueuePool, instrument_engines, warm_up_on_first_request
 
 # Logging ayarları
 def setup_logging(app):
@@ -43,21 +49,52 @@ def create_app(config_name=None):
          supports_credentials=True,
          methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
 
+    # Havuz boyutu ayarlıysa bağlantı bekleme sürelerini ölçen havuzu kullan
+    engine_options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    if 'pool_size' in engine_options and 'poolclass' not in engine_options:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {**engine_options, 'poolclass': TimedQueuePool}
+
     # SQLAlchemy başlat
     db.init_app(app)
 
     # Veritabanı tablolarını oluştur
     with app.app_context():
+        # Havuz metriklerini ilk bağlantıdan önce bağla
+        instrument_engines(db.engines)
         try:
             db.create_all()
             # Test database connection and set flag
             from models import User
             User.query.limit(1).first()  # Test query
-            app.db_working = True
+            db_working = True
             app.logger.info("Database connection successful")
         except Exception as e:
             app.logger.warning(f"Veritabanı bağlantısı başarısız. create_all atlandı: {e}")
-            app.db_working = False
+            db_working = False
+
+        # Tam metin arama indeksini hazırla (yoksa oluşturulur); olmazsa ilk aramada yeniden denenir
+        if db_working:
+            try:
+                get_message_search().ensure_index(db.engine)
+            except Exception as e:
+                app.logger.warning(f"Tam metin arama indeksi oluşturulamadı, LIKE kullanılacak: {e}")
+
+    # Bağlantı havuzunu her worker'da ilk istekte ısıt (fork öncesi açılan bağlantılar paylaşılmasın)
+    if db_working:
+        warm_up_on_first_request(app, app.config.get('DB_POOL_WARMUP', 0))
+
+    # Veritabanı durumunu arka planda güncel tut
+    get_db_health_monitor().start(app, available=db_working)
+
+    # Okuma replikalarının erişilebilirliğini ve gecikmesini izle
+    get_replica_router().start(app)
+
+    # Yönetici istatistik sayaçlarını arka planda güncelle
+    get_stats_service().start(app)
+
+    # Sistem loglarını arka planda toplu yaz
+    if app.config.get('SYSTEM_LOG_WRITE_BEHIND', True):
+        get_log_writer().start(app)
 
     # Root endpoint
     @app.route('/')
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Move the messages of idle conversations into compressed archive rows.
+
+    python archive_messages.py                      # ARCHIVE_IDLE_DAYS / ARCHIVE_BATCH_SIZE
+    python archive_messages.py --idle-days 30 --max-batches 50
+    python archive_messages.py --dry-run
+    python archive_messages.py --restore 42
+
+Meant to run from cron. Each batch is its own transaction, so the script
+can be stopped at any time; archived conversations stay readable and are
+restored automatically when someone writes to them.
+"""
+
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from services.message_archive import get_message_archiver
+import logging
+
+def archive_messages(idle_days=None, batch_size=None, max_batches=None, dry_run=False):
+    """Archive idle conversations; returns True on success."""
+    app = create_app()
+    archiver = get_message_archiver()
+    
+    with app.app_context():
+        try:
+            if dry_run:
+                idle = archiver.count_idle(idle_days)
+                print(f"🔍 {idle} conversations idle for {idle_days or archiver.idle_days} days would be archived")
+                return True
+            
+            totals = archiver.archive_idle(idle_days, batch_size, max_batches)
+            print(f"✅ Archived {totals['conversations']} conversations ({totals['messages']} messages, "
+                  f"{totals['bytes']} bytes) in {totals['batches']} batches")
+            return True
+        except Exception as e:
+            print(f"❌ Error during archiving: {str(e)}")
+            return False
+
+def restore_conversation(conversation_id):
+    """Move one conversation's messages back to the messages table; returns True on success."""
+    app = create_app()
+    
+    with app.app_context():
+        try:
+            restored = get_message_archiver().restore_conversation(conversation_id)
+            print(f"✅ Restored {restored} messages of conversation {conversation_id}")
+            return True
+        except Exception as e:
+            print(f"❌ Error restoring conversation {conversation_id}: {str(e)}")
+            return False
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Archive the messages of idle conversations.')
+    parser.add_argument('--idle-days', type=int, default=None,
+                        help='Days without activity before archiving (default: ARCHIVE_IDLE_DAYS)')
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help='Conversations per transaction (default: ARCHIVE_BATCH_SIZE)')
+    parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches')
+    parser.add_argument('--dry-run', action='store_true', help='Only count the conversations that would be archived')
+    parser.add_argument('--restore', type=int, metavar='CONVERSATION_ID', help='Restore one archived conversation')
+    args = parser.parse_args()
+    
+    if args.restore is not None:
+        ok = restore_conversation(args.restore)
+    else:
+        ok = archive_messages(args.idle_days, args.batch_size, args.max_batches, args.dry_run)
+    if not ok:
+        sys.exit(1)
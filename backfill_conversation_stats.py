@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Script to recompute the denormalized message stats of every conversation
+(message_count, last_message_at, last_message_preview) from its messages.
+Migration 0002 adds the columns and runs this once; use the script to
+repair the values later. Safe to run more than once.
+"""
+
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from services.database_service import DatabaseService
+import logging
+
+def backfill_conversation_stats(batch_size):
+    """Recompute the stats for every conversation."""
+    app = create_app()
+    
+    with app.app_context():
+        try:
+            updated = DatabaseService().backfill_conversation_stats(batch_size)
+            print(f"✅ Backfilled message stats for {updated} conversations")
+            return True
+        except Exception as e:
+            print(f"❌ Error during backfill: {str(e)}")
+            return False
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--batch-size', type=int, default=500, help='Conversations per batch (default: 500)')
+    args = parser.parse_args()
+    
+    if backfill_conversation_stats(args.batch_size):
+        print("✅ Conversation stats backfill completed successfully.")
+    else:
+        print("❌ Conversation stats backfill failed.")
+        sys.exit(1)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 from urllib.parse import quote_plus
 
@@ -6,6 +7,21 @@ from urllib.parse import quote_plus
 load_dotenv()
 
 
+def engine_options(pool_size, max_overflow, pool_timeout, pool_recycle):
+    """Build SQLALCHEMY_ENGINE_OPTIONS for a pool of the given size."""
+    return {
+        'pool_pre_ping': True,
+        'pool_recycle': pool_recycle,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': pool_timeout,
+        'connect_args': {
+            'timeout': 5,
+            'TrustServerCertificate': 'yes'
+        }
+    }
+
+
 class Config:
     """Base configuration class for the Flask application."""
 
@@ -36,23 +52,130 @@ class Config:
         print("Falling back to SQLite. Reason:", e)
         SQLALCHEMY_DATABASE_URI = 'sqlite:///chatbot_fallback.db'
 
+    # Read replicas (comma-separated URLs), each registered as bind replica_<n>
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    SQLALCHEMY_BINDS = {f'replica_{i}': url for i, url in enumerate(DATABASE_REPLICA_URLS)}
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 5))
+    REPLICA_CHECK_INTERVAL_SECONDS = float(os.environ.get('REPLICA_CHECK_INTERVAL_SECONDS', 2))
+    REPLICA_STICKY_SECONDS = float(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_pre_ping': True,
-        'pool_recycle': 300,
-        'connect_args': {
-            'timeout': 5,
-            'TrustServerCertificate': 'yes'
-        }
-    }
+
+    # Connection pool, per worker process; ProductionConfig raises the size defaults
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT_SECONDS = int(os.environ.get('DB_POOL_TIMEOUT_SECONDS', 30))
+    DB_POOL_RECYCLE_SECONDS = int(os.environ.get('DB_POOL_RECYCLE_SECONDS', 300))
+    # Connections opened per engine when a worker serves its first request
+    DB_POOL_WARMUP = int(os.environ.get('DB_POOL_WARMUP', 2))
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT_SECONDS,
+                                               DB_POOL_RECYCLE_SECONDS)
 
     # Gemini AI configuration
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
 
+    # LLM providers in failover order: gemini:<model>, openai:<model>, stub
+    LLM_PROVIDERS = os.environ.get('LLM_PROVIDERS', 'gemini:gemini-2.0-flash,gemini:gemini-2.0-flash-lite')
+    LLM_FAILOVER_TIMEOUT_SECONDS = float(os.environ.get('LLM_FAILOVER_TIMEOUT_SECONDS', 12))
+    OPENAI_COMPAT_BASE_URL = os.environ.get('OPENAI_COMPAT_BASE_URL', 'http://localhost:11434/v1')
+    OPENAI_COMPAT_API_KEY = os.environ.get('OPENAI_COMPAT_API_KEY')
+    LLM_STUB_LATENCY_MS = int(os.environ.get('LLM_STUB_LATENCY_MS', 0))
+
+    # LLM execution pool
+    LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', 32))
+    LLM_QUEUE_DEPTH = int(os.environ.get('LLM_QUEUE_DEPTH', 256))
+    LLM_TIMEOUT_SECONDS = float(os.environ.get('LLM_TIMEOUT_SECONDS', 30))
+    SINGLE_FLIGHT_ENABLED = os.environ.get('SINGLE_FLIGHT_ENABLED', 'True').lower() == 'true'
+
+    # Circuit breaker around the LLM upstream
+    CIRCUIT_BREAKER_FAILURE_RATE = float(os.environ.get('CIRCUIT_BREAKER_FAILURE_RATE', 0.5))
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS = float(os.environ.get('CIRCUIT_BREAKER_SLOW_CALL_SECONDS', 15))
+    CIRCUIT_BREAKER_SLOW_CALL_RATE = float(os.environ.get('CIRCUIT_BREAKER_SLOW_CALL_RATE', 0.8))
+    CIRCUIT_BREAKER_WINDOW_SIZE = int(os.environ.get('CIRCUIT_BREAKER_WINDOW_SIZE', 20))
+    CIRCUIT_BREAKER_MIN_CALLS = int(os.environ.get('CIRCUIT_BREAKER_MIN_CALLS', 5))
+    CIRCUIT_BREAKER_OPEN_SECONDS = float(os.environ.get('CIRCUIT_BREAKER_OPEN_SECONDS', 30))
+    CIRCUIT_BREAKER_HALF_OPEN_CALLS = int(os.environ.get('CIRCUIT_BREAKER_HALF_OPEN_CALLS', 2))
+
+    # Cache backend shared by the app's caches: memory (one worker), sqlite (workers of one host), redis
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 4096))
+    CACHE_SQLITE_PATH = os.environ.get('CACHE_SQLITE_PATH', '/tmp/chatbot-cache.sqlite3')
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_KEY_PREFIX = os.environ.get('CACHE_KEY_PREFIX', 'chatbot')
+    CACHE_INVALIDATION_POLL_SECONDS = float(os.environ.get('CACHE_INVALIDATION_POLL_SECONDS', 0.5))
+
+    # Exact-match response cache
+    RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'True').lower() == 'true'
+    RESPONSE_CACHE_TTL_SECONDS = float(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', 3600))
+
+    # Semantic (near-duplicate) cache for first-turn messages
+    SEMANTIC_CACHE_ENABLED = os.environ.get('SEMANTIC_CACHE_ENABLED', 'True').lower() == 'true'
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.environ.get('SEMANTIC_CACHE_MAX_ENTRIES', 2048))
+    SEMANTIC_CACHE_TTL_SECONDS = float(os.environ.get('SEMANTIC_CACHE_TTL_SECONDS', 86400))
+    SEMANTIC_CACHE_THRESHOLD = float(os.environ.get('SEMANTIC_CACHE_THRESHOLD', 0.9))
+    SEMANTIC_CACHE_DIMENSIONS = int(os.environ.get('SEMANTIC_CACHE_DIMENSIONS', 1024))
+
     # Chat configuration
-    MAX_CONVERSATION_HISTORY = 10
+    MAX_CONVERSATION_HISTORY = int(os.environ.get('MAX_CONVERSATION_HISTORY', 50))
+    HISTORY_TOKEN_BUDGET = int(os.environ.get('HISTORY_TOKEN_BUDGET', 2000))
+    HISTORY_MIN_PARTIAL_TOKENS = int(os.environ.get('HISTORY_MIN_PARTIAL_TOKENS', 64))
+
+    # Per-process cache of recent conversation history (read-through, write-through, invalidated across workers)
+    HISTORY_CACHE_ENABLED = os.environ.get('HISTORY_CACHE_ENABLED', 'True').lower() == 'true'
+    HISTORY_CACHE_MAX_CONVERSATIONS = int(os.environ.get('HISTORY_CACHE_MAX_CONVERSATIONS', 1000))
+    HISTORY_CACHE_MESSAGES = int(os.environ.get('HISTORY_CACHE_MESSAGES', 50))
+    HISTORY_CACHE_TTL_SECONDS = float(os.environ.get('HISTORY_CACHE_TTL_SECONDS', 300))
+
+    # Keyset pagination of conversation and message lists
+    PAGE_SIZE_DEFAULT = int(os.environ.get('PAGE_SIZE_DEFAULT', 50))
+    PAGE_SIZE_MAX = int(os.environ.get('PAGE_SIZE_MAX', 200))
+    # Hard cap on admin log and user pages
+    ADMIN_PAGE_SIZE_MAX = int(os.environ.get('ADMIN_PAGE_SIZE_MAX', 500))
+
+    # Admin stats counters: update interval, 24h-active recount and full reconcile periods
+    STATS_REFRESH_SECONDS = float(os.environ.get('STATS_REFRESH_SECONDS', 10))
+    STATS_ACTIVE_REFRESH_SECONDS = float(os.environ.get('STATS_ACTIVE_REFRESH_SECONDS', 300))
+    STATS_RECONCILE_SECONDS = float(os.environ.get('STATS_RECONCILE_SECONDS', 3600))
+
+    # NDJSON export: rows fetched per database round trip
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+
+    # Message archive: days without activity before a conversation is archived, conversations per batch
+    ARCHIVE_IDLE_DAYS = int(os.environ.get('ARCHIVE_IDLE_DAYS', 90))
+    ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 100))
+
+    # Message search: deepest result reachable by paging
+    SEARCH_MAX_RESULTS = int(os.environ.get('SEARCH_MAX_RESULTS', 1000))
+
+    # Rolling conversation summaries
+    SUMMARY_ENABLED = os.environ.get('SUMMARY_ENABLED', 'True').lower() == 'true'
+    SUMMARY_KEEP_RECENT_MESSAGES = int(os.environ.get('SUMMARY_KEEP_RECENT_MESSAGES', 10))
+    SUMMARY_TRIGGER_MESSAGES = int(os.environ.get('SUMMARY_TRIGGER_MESSAGES', 10))
+    SUMMARY_BATCH_MESSAGES = int(os.environ.get('SUMMARY_BATCH_MESSAGES', 40))
+    SUMMARY_MAX_BATCHES_PER_RUN = int(os.environ.get('SUMMARY_MAX_BATCHES_PER_RUN', 5))
+    SUMMARY_MAX_WORDS = int(os.environ.get('SUMMARY_MAX_WORDS', 250))
+    SUMMARY_WORKERS = int(os.environ.get('SUMMARY_WORKERS', 2))
     DEFAULT_RESPONSE = "I'm sorry, I couldn't process your request at the moment. Please try again."
 
+    # Write-behind system log sink
+    SYSTEM_LOG_WRITE_BEHIND = os.environ.get('SYSTEM_LOG_WRITE_BEHIND', 'True').lower() == 'true'
+    SYSTEM_LOG_QUEUE_SIZE = int(os.environ.get('SYSTEM_LOG_QUEUE_SIZE', 10000))
+    SYSTEM_LOG_BATCH_SIZE = int(os.environ.get('SYSTEM_LOG_BATCH_SIZE', 200))
+    SYSTEM_LOG_FLUSH_SECONDS = float(os.environ.get('SYSTEM_LOG_FLUSH_SECONDS', 1))
+    SYSTEM_LOG_ENQUEUE_TIMEOUT_SECONDS = float(os.environ.get('SYSTEM_LOG_ENQUEUE_TIMEOUT_SECONDS', 0))
+    SYSTEM_LOG_MAX_RETRIES = int(os.environ.get('SYSTEM_LOG_MAX_RETRIES', 3))
+
+    # Per-process database availability, refreshed in the background
+    DB_HEALTH_CHECK_INTERVAL_SECONDS = float(os.environ.get('DB_HEALTH_CHECK_INTERVAL_SECONDS', 5))
+    DB_HEALTH_MIN_RECHECK_SECONDS = float(os.environ.get('DB_HEALTH_MIN_RECHECK_SECONDS', 1))
+
+    # Background health monitor (one prober per host, results shared via a status file)
+    HEALTH_CHECK_INTERVAL_SECONDS = float(os.environ.get('HEALTH_CHECK_INTERVAL_SECONDS', 30))
+    HEALTH_CHECK_TIMEOUT_SECONDS = float(os.environ.get('HEALTH_CHECK_TIMEOUT_SECONDS', 10))
+    HEALTH_STATUS_FILE = os.environ.get(
+        'HEALTH_STATUS_FILE', os.path.join(tempfile.gettempdir(), 'chatbot_health.json')
+    )
+
     # Security configuration
     BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
     SESSION_COOKIE_SECURE = os.environ.get('SESSION_COOKIE_SECURE', 'False').lower() == 'true'
@@ -88,11 +211,20 @@ class ProductionConfig(Config):
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Strict'
 
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_WARMUP = int(os.environ.get('DB_POOL_WARMUP', 5))
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(DB_POOL_SIZE, DB_MAX_OVERFLOW, Config.DB_POOL_TIMEOUT_SECONDS,
+                                               Config.DB_POOL_RECYCLE_SECONDS)
+
 
 class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # In-memory SQLite keeps one connection; pool sizing does not apply
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    DB_POOL_WARMUP = 0
     WTF_CSRF_ENABLED = False
 
 
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Export conversations and messages as NDJSON, streaming from the database.
+
+    python export_conversations.py --user-id 42 -o user42.ndjson
+    python export_conversations.py --conversation-id 7 --gzip -o conv7.ndjson.gz
+    python export_conversations.py --all --gzip > all.ndjson.gz
+
+Each conversation is written as a ``conversation`` record followed by its
+``message`` records; memory use does not depend on the export size.
+"""
+
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from services.database_service import DatabaseService
+from services.ndjson_export import ndjson_chunks
+
+def export_conversations(output, user_id=None, conversation_id=None, compress=False, batch_size=None):
+    """Write the selected conversations to output; returns the number of records written."""
+    db_service = DatabaseService()
+    count = 0
+    
+    def counted(records):
+        nonlocal count
+        for record in records:
+            count += 1
+            yield record
+    
+    records = db_service.iter_export_records(user_id=user_id, conversation_id=conversation_id,
+                                             batch_size=batch_size)
+    for chunk in ndjson_chunks(counted(records), compress):
+        output.write(chunk)
+    output.flush()
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Export conversations and messages as NDJSON.')
+    scope = parser.add_mutually_exclusive_group(required=True)
+    scope.add_argument('--user-id', type=int, help='Export every conversation of this user')
+    scope.add_argument('--conversation-id', type=int, help='Export a single conversation')
+    scope.add_argument('--all', action='store_true', help='Export every conversation of every user')
+    parser.add_argument('-o', '--output', default='-', help='Output file (default: stdout)')
+    parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+    parser.add_argument('--batch-size', type=int, default=None, help='Rows fetched per database round trip')
+    args = parser.parse_args()
+    
+    app = create_app()
+    with app.app_context():
+        try:
+            if args.output == '-':
+                written = export_conversations(sys.stdout.buffer, args.user_id, args.conversation_id,
+                                               args.gzip, args.batch_size)
+            else:
+                with open(args.output, 'wb') as output:
+                    written = export_conversations(output, args.user_id, args.conversation_id,
+                                                   args.gzip, args.batch_size)
+        except Exception as e:
+            print(f"❌ Export failed: {str(e)}", file=sys.stderr)
+            sys.exit(1)
+    
+    # Progress goes to stderr so stdout can carry the export itself
+    print(f"✅ Exported {written} records", file=sys.stderr)
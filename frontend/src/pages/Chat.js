@@ -1,6 +1,7 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { Row, Col, Card, Form, Button, ListGroup, Modal, Dropdown, Alert } from 'react-bootstrap';
 import api from '../utils/axios';
+import { streamMessage } from '../utils/chatApi';
 import RenameConversationModal from '../components/RenameConversationModal';
 
 const Chat = ({ user }) => {
@@ -13,13 +14,23 @@ const Chat = ({ user }) => {
   const [showRenameModal, setShowRenameModal] = useState(false);
   const [selectedConversation, setSelectedConversation] = useState(null);
   const [error, setError] = useState('');
+  // Cursors of the next older page, null when everything is loaded
+  const [conversationsCursor, setConversationsCursor] = useState(null);
+  const [messagesCursor, setMessagesCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const messagesEndRef = useRef(null);
+  const keepScrollRef = useRef(false);
 
   useEffect(() => {
     loadConversations();
   }, []);
 
   useEffect(() => {
+    // Older messages are prepended; stay where the user is reading
+    if (keepScrollRef.current) {
+      keepScrollRef.current = false;
+      return;
+    }
     scrollToBottom();
   }, [messages]);
 
@@ -27,10 +38,13 @@ const Chat = ({ user }) => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   };
 
+  const nextCursor = (pagination) => (pagination && pagination.has_more ? pagination.before_cursor : null);
+
   const loadConversations = async () => {
     try {
       const response = await api.get('/api/chat/conversations');
       setConversations(response.data.conversations);
+      setConversationsCursor(nextCursor(response.data.pagination));
       setError('');
     } catch (error) {
       console.error('Error loading conversations:', error);
@@ -42,10 +56,29 @@ const Chat = ({ user }) => {
     }
   };
 
+  const loadMoreConversations = async () => {
+    if (!conversationsCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const response = await api.get('/api/chat/conversations', { params: { before: conversationsCursor } });
+      setConversations(prev => {
+        const seen = new Set(prev.map(conv => conv.id));
+        return [...prev, ...response.data.conversations.filter(conv => !seen.has(conv.id))];
+      });
+      setConversationsCursor(nextCursor(response.data.pagination));
+    } catch (error) {
+      console.error('Error loading more conversations:', error);
+      setError('Failed to load more conversations.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const loadConversation = async (conversationId) => {
     try {
       const response = await api.get(`/api/chat/conversations/${conversationId}/messages`);
       setMessages(response.data.messages);
+      setMessagesCursor(nextCursor(response.data.pagination));
       setCurrentConversationId(conversationId);
       setError('');
     } catch (error) {
@@ -58,6 +91,24 @@ const Chat = ({ user }) => {
     }
   };
 
+  const loadOlderMessages = async () => {
+    if (!messagesCursor || !currentConversationId || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const response = await api.get(`/api/chat/conversations/${currentConversationId}/messages`, {
+        params: { before: messagesCursor }
+      });
+      keepScrollRef.current = true;
+      setMessages(prev => [...response.data.messages, ...prev]);
+      setMessagesCursor(nextCursor(response.data.pagination));
+    } catch (error) {
+      console.error('Error loading older messages:', error);
+      setError('Failed to load older messages.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const sendMessage = async (e) => {
     e.preventDefault();
     
@@ -76,26 +127,35 @@ const Chat = ({ user }) => {
     setMessages(prev => [...prev, newUserMessage]);
 
     try {
-      const response = await api.post('/api/chat/send', {
-        message: userMessage,
-        conversation_id: currentConversationId
-      }, {
-        withCredentials: true
+      let botMessageAdded = false;
+      const upsertBotMessage = (content, timestamp) => {
+        const botMessage = {
+          content: content,
+          sender_type: 'bot',
+          timestamp: timestamp || new Date().toISOString()
+        };
+        if (!botMessageAdded) {
+          botMessageAdded = true;
+          setMessages(prev => [...prev, botMessage]);
+        } else {
+          setMessages(prev => [...prev.slice(0, -1), botMessage]);
+        }
+      };
+
+      const result = await streamMessage(userMessage, currentConversationId, {
+        onChunk: (_text, fullText) => {
+          upsertBotMessage(fullText);
+        }
       });
 
       // Update conversation ID if this is a new chat
       if (!currentConversationId) {
-        setCurrentConversationId(response.data.conversation_id);
+        setCurrentConversationId(result.conversation_id);
         loadConversations(); // Refresh conversation list
       }
 
-      // Add bot response
-      const botMessage = {
-        content: response.data.response,
-        sender_type: 'bot',
-        timestamp: response.data.timestamp
-      };
-      setMessages(prev => [...prev, botMessage]);
+      // Finalize bot response with the server timestamp
+      upsertBotMessage(result.response, result.timestamp);
 
     } catch (error) {
       console.error('Error sending message:', error);
@@ -115,6 +175,7 @@ const Chat = ({ user }) => {
   const startNewChat = () => {
     setCurrentConversationId(null);
     setMessages([]);
+    setMessagesCursor(null);
   };
 
   const handleRenameConversation = (conversation) => {
@@ -235,6 +296,11 @@ const Chat = ({ user }) => {
                   </ListGroup.Item>
                 ))
               )}
+              {conversationsCursor && (
+                <ListGroup.Item action className="text-center text-muted" onClick={loadMoreConversations}>
+                  {loadingMore ? 'Loading...' : 'Load more'}
+                </ListGroup.Item>
+              )}
             </ListGroup>
           </Card.Body>
         </Card>
@@ -273,6 +339,13 @@ const Chat = ({ user }) => {
 
           {/* Chat Messages */}
           <Card.Body className="chat-messages">
+            {messagesCursor && (
+              <div className="text-center mb-3">
+                <Button size="sm" variant="outline-secondary" onClick={loadOlderMessages} disabled={loadingMore}>
+                  {loadingMore ? 'Loading...' : 'Load older messages'}
+                </Button>
+              </div>
+            )}
             {messages.length === 0 ? (
               <div className="welcome-message">
                 <i className="fas fa-robot fa-3x mb-3"></i>
@@ -342,6 +415,11 @@ const Chat = ({ user }) => {
                 </small>
               </ListGroup.Item>
             ))}
+            {conversationsCursor && (
+              <ListGroup.Item action className="text-center text-muted" onClick={loadMoreConversations}>
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </ListGroup.Item>
+            )}
           </ListGroup>
         </Modal.Body>
       </Modal>
@@ -29,12 +29,13 @@ export const renameConversation = async (conversationId, newTitle) => {
 };
 
 /**
- * Get all conversations for the current user
+ * Get a page of conversations for the current user, most recently updated first
+ * @param {Object} params - Optional { limit, before, after } pagination cursors
  * @returns {Promise<Array>} - Array of conversation objects
  */
-export const getConversations = async () => {
+export const getConversations = async (params = {}) => {
   try {
-    const response = await chatApi.get('/chat/conversations');
+    const response = await chatApi.get('/chat/conversations', { params });
     return response.data.conversations;
   } catch (error) {
     console.error('Error fetching conversations:', error);
@@ -60,13 +61,14 @@ export const createNewConversation = async (title = null) => {
 };
 
 /**
- * Get messages for a specific conversation
+ * Get a page of messages for a specific conversation (the newest page by default)
  * @param {number} conversationId - The ID of the conversation
- * @returns {Promise<Object>} - Object containing messages and conversation details
+ * @param {Object} params - Optional { limit, before, after } pagination cursors
+ * @returns {Promise<Object>} - Object containing messages, conversation details and pagination
  */
-export const getConversationMessages = async (conversationId) => {
+export const getConversationMessages = async (conversationId, params = {}) => {
   try {
-    const response = await chatApi.get(`/chat/conversations/${conversationId}/messages`);
+    const response = await chatApi.get(`/chat/conversations/${conversationId}/messages`, { params });
     return response.data;
   } catch (error) {
     console.error('Error fetching conversation messages:', error);
@@ -92,3 +94,85 @@ export const sendMessage = async (message, conversationId = null) => {
     throw error;
   }
 };
+
+/**
+ * Send a message to the chatbot and stream the reply as it is generated
+ * @param {string} message - The message to send
+ * @param {number} conversationId - Optional conversation ID
+ * @param {Object} handlers - Callbacks: onStart(data), onChunk(text), onDone(data)
+ * @returns {Promise<Object>} - The final `done` event payload with the full response text
+ */
+export const streamMessage = async (message, conversationId = null, handlers = {}) => {
+  const { onStart, onChunk, onDone } = handlers;
+  let fullText = '';
+  let donePayload = null;
+
+  const response = await fetch('/api/chat/stream', {
+    method: 'POST',
+    credentials: 'include',
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: 'text/event-stream'
+    },
+    body: JSON.stringify({
+      message: message,
+      conversation_id: conversationId
+    })
+  });
+
+  if (!response.ok) {
+    let errorMessage = `Request failed with status ${response.status}`;
+    try {
+      const data = await response.json();
+      errorMessage = data.error || errorMessage;
+    } catch (e) {
+      // Non-JSON error body
+    }
+    const error = new Error(errorMessage);
+    error.status = response.status;
+    throw error;
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  const handleFrame = (frame) => {
+    let event = 'message';
+    const dataLines = [];
+    frame.split('\n').forEach((line) => {
+      if (line.startsWith('event:')) {
+        event = line.slice(6).trim();
+      } else if (line.startsWith('data:')) {
+        dataLines.push(line.slice(5).trim());
+      }
+    });
+    if (dataLines.length === 0) return;
+
+    const data = JSON.parse(dataLines.join('\n'));
+    if (event === 'start' && onStart) {
+      onStart(data);
+    } else if (event === 'chunk') {
+      fullText += data.text;
+      if (onChunk) onChunk(data.text, fullText);
+    } else if (event === 'done') {
+      donePayload = { ...data, response: fullText };
+      if (onDone) onDone(donePayload);
+    }
+  };
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      handleFrame(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+    }
+  }
+
+  return donePayload || { response: fullText };
+};
@@ -0,0 +1,28 @@
+"""Versioned schema migrations.
+
+Each migration is a module with a VERSION, a NAME and an ``upgrade()``
+function that runs inside the Flask app context. Migrations are idempotent
+(they check the live schema first), so databases created by ``db.create_all()``
+simply get them recorded. Applied versions are kept in ``schema_migrations``.
+A migration runs in one transaction with its record unless it sets
+``TRANSACTIONAL = False`` (see ``apply_migrations``).
+Run ``python migrate_database.py`` to apply them.
+"""
+from migrations import (
+    m0001_user_credentials, m0002_conversation_stats, m0003_hot_path_indexes, m0004_stats_counters,
+    m0005_message_archive, m0006_message_search, m0007_admin_listing_indexes
+)
+from migrations.runner import apply_migrations, migration_status
+
+# In version order
+MIGRATIONS = [
+    m0001_user_credentials,
+    m0002_conversation_stats,
+    m0003_hot_path_indexes,
+    m0004_stats_counters,
+    m0005_message_archive,
+    m0006_message_search,
+    m0007_admin_listing_indexes
+]
+
+__all__ = ['MIGRATIONS', 'apply_migrations', 'migration_status']
@@ -0,0 +1,27 @@
+"""Add users.password and give legacy users a username and a default password."""
+import hashlib
+import random
+import secrets
+
+from sqlalchemy import or_
+
+from migrations.runner import add_column
+from models import db, User
+
+VERSION = 1
+NAME = 'user_credentials'
+
+# Legacy users log in with this and are expected to change it
+DEFAULT_PASSWORD = 'changeme123'
+
+
+def upgrade():
+    add_column('users', User.__table__.c.password, "NOT NULL DEFAULT ''")
+
+    for user in User.query.filter(or_(User.username == None, User.username == '')).all():  # noqa: E711
+        user.username = f"user_{random.randint(1000, 9999)}"
+
+    salt = secrets.token_hex(8)
+    default_hash = f"{salt}${hashlib.sha256((salt + DEFAULT_PASSWORD).encode()).hexdigest()}"
+    for user in User.query.filter(or_(User.password == None, User.password == '')).all():  # noqa: E711
+        user.password = default_hash
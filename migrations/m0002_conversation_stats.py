@@ -0,0 +1,21 @@
+"""Add the denormalized message stats to conversations and fill them from messages."""
+from migrations.runner import add_column
+from models import Conversation, db
+
+VERSION = 2
+NAME = 'conversation_stats'
+# The backfill commits per batch; adding the columns and the backfill are both re-runnable
+TRANSACTIONAL = False
+
+
+def upgrade():
+    columns = Conversation.__table__.c
+    add_column('conversations', columns.message_count, "NOT NULL DEFAULT 0")
+    add_column('conversations', columns.last_message_at)
+    add_column('conversations', columns.last_message_preview)
+    # Commit the DDL before the backfill starts committing batches
+    db.session.commit()
+
+    # Commits per batch, so large tables are not backfilled in one transaction
+    from services.database_service import DatabaseService
+    DatabaseService().backfill_conversation_stats()
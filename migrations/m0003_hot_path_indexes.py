@@ -0,0 +1,21 @@
+"""Composite indexes for the history, conversation list and system log queries."""
+from migrations.runner import create_index
+
+VERSION = 3
+NAME = 'hot_path_indexes'
+
+# Kept in sync with the __table_args__ indexes in models.py
+INDEXES = [
+    # History, pagination and summaries: messages of a conversation by time
+    ('messages', 'ix_messages_conversation_timestamp', ['conversation_id', 'timestamp', 'id']),
+    # Sidebar: a user's conversations, most recently updated first
+    ('conversations', 'ix_conversations_user_updated', ['user_id', 'updated_at', 'id']),
+    # Admin logs, filtered by level or not, newest first
+    ('system_logs', 'ix_system_logs_level_timestamp', ['level', 'timestamp']),
+    ('system_logs', 'ix_system_logs_timestamp', ['timestamp'])
+]
+
+
+def upgrade():
+    for table, name, columns in INDEXES:
+        create_index(table, name, columns)
@@ -0,0 +1,12 @@
+"""Counter table for the admin stats and an index for the 24h-active conversation count."""
+from migrations.runner import create_index, create_table
+from models import StatsCounter
+
+VERSION = 4
+NAME = 'stats_counters'
+
+
+def upgrade():
+    create_table(StatsCounter)
+    # Kept in sync with the __table_args__ index in models.py
+    create_index('conversations', 'ix_conversations_updated_at', ['updated_at'])
@@ -0,0 +1,11 @@
+"""Cold storage for the messages of idle conversations."""
+from migrations.runner import add_column, create_table
+from models import Conversation, MessageArchive
+
+VERSION = 5
+NAME = 'message_archive'
+
+
+def upgrade():
+    add_column('conversations', Conversation.__table__.c.archived_at)
+    create_table(MessageArchive)
@@ -0,0 +1,16 @@
+"""Full-text index over message content: FTS5 table and triggers on SQLite, a full-text index on MSSQL."""
+from models import db
+
+VERSION = 6
+NAME = 'message_search'
+# The DDL runs on its own autocommit connection; ensure_index is idempotent
+TRANSACTIONAL = False
+
+
+def upgrade():
+    # Full-text DDL runs on its own autocommit connection (MSSQL refuses it in a transaction).
+    # Raises if the index cannot be created, so the migration is not recorded without it.
+    from services.message_search import get_message_search
+    mode = get_message_search().ensure_index(db.engine)
+    if mode == 'like' and db.engine.dialect.name in ('sqlite', 'mssql'):
+        raise RuntimeError("Full-text index was not created")
@@ -0,0 +1,12 @@
+"""Indexes behind the filtered admin log and user listings."""
+from migrations.runner import create_index
+
+VERSION = 7
+NAME = 'admin_listing_indexes'
+
+
+def upgrade():
+    # Kept in sync with the __table_args__ indexes in models.py
+    create_index('system_logs', 'ix_system_logs_module_timestamp', ['module', 'timestamp'])
+    create_index('system_logs', 'ix_system_logs_user_timestamp', ['user_id', 'timestamp'])
+    create_index('users', 'ix_users_created_at', ['created_at'])
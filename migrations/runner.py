@@ -0,0 +1,187 @@
+import logging
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, text
+
+from models import db
+
+logger = logging.getLogger(__name__)
+
+# Kept out of the models' metadata so db.create_all() never touches it
+_metadata = MetaData()
+schema_migrations = Table(
+    'schema_migrations',
+    _metadata,
+    Column('version', Integer, primary_key=True, autoincrement=False),
+    Column('name', String(200), nullable=False),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+
+def column_exists(table: str, column: str) -> bool:
+    """Whether a column exists in the live database."""
+    return column in {col['name'] for col in inspect(db.session.connection()).get_columns(table)}
+
+
+def index_exists(table: str, index: str) -> bool:
+    """Whether an index exists in the live database."""
+    return index in {idx['name'] for idx in inspect(db.session.connection()).get_indexes(table)}
+
+
+def add_column(table: str, model_column, ddl_suffix: str = ''):
+    """
+    Add a column declared on a model, if it is missing.
+
+    Args:
+        table (str): Table name
+        model_column (Column): Model column whose name and type are used
+        ddl_suffix (str): Extra DDL such as "NOT NULL DEFAULT 0"
+
+    Returns:
+        bool: True if the column was added
+    """
+    if column_exists(table, model_column.name):
+        return False
+    column_type = model_column.type.compile(dialect=db.session.get_bind().dialect)
+    db.session.execute(text(f"ALTER TABLE {table} ADD {model_column.name} {column_type} {ddl_suffix}".rstrip()))
+    logger.info(f"Added column {table}.{model_column.name}")
+    return True
+
+
+def create_table(model) -> bool:
+    """
+    Create the table of a model, with its indexes, if it is missing.
+
+    Args:
+        model: Model class whose ``__table__`` is created
+
+    Returns:
+        bool: True if the table was created
+    """
+    table = model.__table__
+    if inspect(db.session.connection()).has_table(table.name):
+        return False
+    table.create(db.session.connection())
+    logger.info(f"Created table {table.name}")
+    return True
+
+
+def create_index(table: str, name: str, columns: List[str], online: bool = True):
+    """
+    Create an index if it is missing, online where the engine allows it.
+
+    MSSQL builds the index with ONLINE = ON so the table stays writable;
+    editions without online index operations fall back to an offline build.
+    Other engines (SQLite) build it in place.
+
+    Args:
+        table (str): Table name
+        name (str): Index name
+        columns (List[str]): Indexed columns in order
+        online (bool): Try an online build on engines that support it
+
+    Returns:
+        bool: True if the index was created
+    """
+    if index_exists(table, name):
+        return False
+
+    ddl = f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"
+    if online and db.session.get_bind().dialect.name == 'mssql':
+        try:
+            with db.session.begin_nested():
+                db.session.execute(text(f"{ddl} WITH (ONLINE = ON)"))
+            logger.info(f"Created index {name} online")
+            return True
+        except Exception as e:
+            # Online index operations need Enterprise, Developer or Azure SQL
+            logger.warning(f"Online build of {name} not available, building offline: {str(e)}")
+
+    db.session.execute(text(ddl))
+    logger.info(f"Created index {name}")
+    return True
+
+
+def get_applied_versions() -> Dict[int, Dict]:
+    """
+    Get the migrations recorded as applied.
+
+    Returns:
+        Dict[int, Dict]: Version to {'name', 'applied_at'}
+    """
+    schema_migrations.create(db.session.connection(), checkfirst=True)
+    rows = db.session.execute(schema_migrations.select().order_by(schema_migrations.c.version)).all()
+    db.session.commit()
+    return {row.version: {'name': row.name, 'applied_at': row.applied_at} for row in rows}
+
+
+def migration_status(migrations) -> List[Dict]:
+    """
+    Describe every known migration and whether it has been applied.
+
+    Args:
+        migrations (list): Migration modules in version order
+
+    Returns:
+        List[Dict]: One entry per migration
+    """
+    applied = get_applied_versions()
+    return [
+        {
+            'version': migration.VERSION,
+            'name': migration.NAME,
+            'applied': migration.VERSION in applied,
+            'applied_at': applied[migration.VERSION]['applied_at'].isoformat()
+            if migration.VERSION in applied else None
+        }
+        for migration in migrations
+    ]
+
+
+def apply_migrations(migrations, target: int = None) -> List[int]:
+    """
+    Apply pending migrations in version order, each in its own transaction.
+
+    A migration and the record of it are committed together, so a failed
+    migration leaves neither behind and the run stops there. Migrations
+    that set ``TRANSACTIONAL = False`` commit their own work as they go (a
+    batched backfill, say) and must be safe to re-run: their record is
+    committed only after ``upgrade()`` returns, so one that fails part way
+    is left unrecorded and runs again, from the start, next time.
+
+    Args:
+        migrations (list): Migration modules in version order
+        target (int): Highest version to apply, None for all
+
+    Returns:
+        List[int]: Versions applied by this run
+    """
+    applied = get_applied_versions()
+    done = []
+
+    for migration in migrations:
+        if migration.VERSION in applied or (target is not None and migration.VERSION > target):
+            continue
+
+        transactional = getattr(migration, 'TRANSACTIONAL', True)
+        logger.info(f"Applying migration {migration.VERSION:04d} {migration.NAME}"
+                    f"{'' if transactional else ' (non-transactional)'}")
+        try:
+            migration.upgrade()
+            db.session.execute(schema_migrations.insert().values(
+                version=migration.VERSION,
+                name=migration.NAME,
+                applied_at=datetime.utcnow()
+            ))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Migration {migration.VERSION:04d} {migration.NAME} failed: {str(e)}")
+            if not transactional:
+                logger.error(f"Migration {migration.VERSION:04d} commits as it goes; "
+                             f"work done before the failure is kept and the migration will run again")
+            raise
+        done.append(migration.VERSION)
+
+    return done
@@ -1,12 +1,36 @@
+from contextvars import ContextVar
 from datetime import datetime, timedelta
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+
+# Engine that reads are routed to, set by services.replica_router; None means the primary
+read_engine = ContextVar('read_engine', default=None)
+
+
+class RoutingSession(Session):
+    """Session that sends statements to ``read_engine`` while one is set.
+
+    Flushes always go to the primary, so pending changes autoflushed before
+    a routed query are never written to a replica.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = read_engine.get()
+        if bind is None and engine is not None and not self._flushing:
+            return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
 
 # This will be initialized by the app factory
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model):
     """User model for storing user information."""
     __tablename__ = 'users'
+    __table_args__ = (
+        # Admin user listing, newest first (migration 0007)
+        db.Index('ix_users_created_at', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -41,6 +65,12 @@ class User(db.Model):
 class Conversation(db.Model):
     """Conversation model for storing chat sessions."""
     __tablename__ = 'conversations'
+    __table_args__ = (
+        # Sidebar: a user's conversations, most recently updated first (migration 0003)
+        db.Index('ix_conversations_user_updated', 'user_id', 'updated_at', 'id'),
+        # Admin stats: conversations active in the last 24 hours (migration 0004)
+        db.Index('ix_conversations_updated_at', 'updated_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -49,16 +79,45 @@ class Conversation(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
     
+    # Denormalized from messages, maintained by the write path (migration 0002 adds and backfills them)
+    message_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    last_message_at = db.Column(db.DateTime, nullable=True)
+    last_message_preview = db.Column(db.String(200), nullable=True)
+    
+    # Set while the messages are held in message_archives instead of messages (migration 0005)
+    archived_at = db.Column(db.DateTime, nullable=True)
+    
+    PREVIEW_LENGTH = 120
+    
     # Relationship with messages
     messages = db.relationship('Message', backref='conversation', lazy=True, cascade='all, delete-orphan')
     
+    # Rolling summary of older turns
+    summary = db.relationship('ConversationSummary', backref='conversation', uselist=False,
+                              lazy=True, cascade='all, delete-orphan')
+    
+    # Archived messages, while the conversation is archived
+    archive = db.relationship('MessageArchive', backref='conversation', uselist=False,
+                              lazy=True, cascade='all, delete-orphan')
+    
     def __repr__(self):
         return f'<Conversation {self.id}: {self.title}>'
     
+    @classmethod
+    def make_preview(cls, content: str) -> str:
+        """Single-line, length-capped preview of a message."""
+        preview = ' '.join((content or '').split())
+        if len(preview) > cls.PREVIEW_LENGTH:
+            preview = preview[:cls.PREVIEW_LENGTH - 1].rstrip() + '…'
+        return preview
+    
     def to_dict(self):
         # Convert UTC timestamps to UTC+3 for display
         utc_plus_3_created_at = (self.created_at + timedelta(hours=3)).isoformat()
         utc_plus_3_updated_at = (self.updated_at + timedelta(hours=3)).isoformat()
+        utc_plus_3_last_message_at = (
+            (self.last_message_at + timedelta(hours=3)).isoformat() if self.last_message_at else None
+        )
         return {
             'id': self.id,
             'user_id': self.user_id,
@@ -66,12 +125,19 @@ class Conversation(db.Model):
             'created_at': utc_plus_3_created_at,
             'updated_at': utc_plus_3_updated_at,
             'is_active': self.is_active,
-            'message_count': len(self.messages) if self.messages else 0
+            'message_count': self.message_count or 0,
+            'last_message_at': utc_plus_3_last_message_at,
+            'last_message_preview': self.last_message_preview,
+            'archived': self.archived_at is not None
         }
 
 class Message(db.Model):
     """Message model for storing individual chat messages."""
     __tablename__ = 'messages'
+    __table_args__ = (
+        # History, pagination and summaries: messages of a conversation by time (migration 0003)
+        db.Index('ix_messages_conversation_timestamp', 'conversation_id', 'timestamp', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     conversation_id = db.Column(db.Integer, db.ForeignKey('conversations.id'), nullable=False)
@@ -95,9 +161,44 @@ class Message(db.Model):
             'token_count': self.token_count
         }
 
+class ConversationSummary(db.Model):
+    """Rolling summary of the older turns of a conversation."""
+    __tablename__ = 'conversation_summaries'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    conversation_id = db.Column(db.Integer, db.ForeignKey('conversations.id'), unique=True, nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    last_message_id = db.Column(db.Integer, nullable=False)  # newest message folded into the summary
+    message_count = db.Column(db.Integer, default=0)  # messages folded in so far
+    token_count = db.Column(db.Integer, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ConversationSummary {self.conversation_id}: up to {self.last_message_id}>'
+    
+    def to_dict(self):
+        # Convert UTC timestamp to UTC+3 for display
+        utc_plus_3_updated_at = (self.updated_at + timedelta(hours=3)).isoformat()
+        return {
+            'conversation_id': self.conversation_id,
+            'content': self.content,
+            'last_message_id': self.last_message_id,
+            'message_count': self.message_count,
+            'token_count': self.token_count,
+            'updated_at': utc_plus_3_updated_at
+        }
+
 class SystemLog(db.Model):
     """System log model for tracking application events."""
     __tablename__ = 'system_logs'
+    __table_args__ = (
+        # Admin logs, filtered by level or not, newest first (migration 0003)
+        db.Index('ix_system_logs_level_timestamp', 'level', 'timestamp'),
+        db.Index('ix_system_logs_timestamp', 'timestamp'),
+        # Admin logs filtered by module or by user, newest first (migration 0007)
+        db.Index('ix_system_logs_module_timestamp', 'module', 'timestamp'),
+        db.Index('ix_system_logs_user_timestamp', 'user_id', 'timestamp'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     level = db.Column(db.String(20), nullable=False)  # 'INFO', 'WARNING', 'ERROR'
@@ -120,3 +221,32 @@ class SystemLog(db.Model):
             'user_id': self.user_id,
             'timestamp': utc_plus_3_timestamp
         }
+
+class MessageArchive(db.Model):
+    """Messages of an idle conversation, moved out of the hot table (see services/message_archive.py)."""
+    __tablename__ = 'message_archives'
+    
+    conversation_id = db.Column(db.Integer, db.ForeignKey('conversations.id'), primary_key=True)
+    # Gzipped JSON list of [id, sender_type, content, timestamp, token_count], oldest first
+    payload = db.Column(db.LargeBinary, nullable=False)
+    message_count = db.Column(db.Integer, nullable=False, default=0)
+    first_message_id = db.Column(db.Integer, nullable=True)
+    last_message_id = db.Column(db.Integer, nullable=True)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<MessageArchive {self.conversation_id}: {self.message_count} messages>'
+
+class StatsCounter(db.Model):
+    """Incrementally maintained figure for the admin stats (see services/stats_service.py)."""
+    __tablename__ = 'stats_counters'
+    
+    name = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    # Highest row id already counted, for counters advanced by id ranges
+    watermark = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    reconciled_at = db.Column(db.DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f'<StatsCounter {self.name}: {self.value}>'
@@ -1,10 +1,17 @@
 from flask import Blueprint, request, jsonify
+from datetime import datetime, timezone
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from services.database_service import DatabaseService
 from services.gemini_service import GeminiService
+from services.health_monitor import HealthMonitor
+from services.cache_backend import get_cache_backend
+from services.pool_metrics import get_pool_stats
+from services.stats_service import get_stats_service
+from services.pagination import page_args, pagination
+from config import Config
 import logging
 
 # Initialize blueprint
@@ -13,33 +20,63 @@ admin_bp = Blueprint('admin', __name__)
 # Initialize services
 db_service = DatabaseService()
 gemini_service = GeminiService()
+health_monitor = HealthMonitor(
+    checks={'database': db_service.ping, 'ai_service': gemini_service.check_api_status},
+    interval=Config.HEALTH_CHECK_INTERVAL_SECONDS,
+    timeout=Config.HEALTH_CHECK_TIMEOUT_SECONDS,
+    status_file=Config.HEALTH_STATUS_FILE
+)
 logger = logging.getLogger(__name__)
 
+@admin_bp.record_once
+def start_health_monitor(state):
+    """Start background health probing when the blueprint is registered."""
+    health_monitor.start(state.app)
+
 @admin_bp.route('/status', methods=['GET'])
 def system_status():
     """Get system status information."""
     try:
-        # Check database connection
-        db_status = db_service.test_connection()
-        
-        # Check Gemini API status
-        try:
-            ai_status = gemini_service.check_api_status()
-        except Exception as ai_error:
-            logger.error(f"AI service check failed: {str(ai_error)}")
-            ai_status = False
+        # Served from the background monitor's cache; never probes inline
+        health = health_monitor.get_status(wait_for_first=Config.HEALTH_CHECK_TIMEOUT_SECONDS)
+        db_health = health['database']
+        ai_health = health['ai_service']
+        db_status = bool(db_health['healthy'])
+        ai_status = bool(ai_health['healthy'])
         
         return jsonify({
             'database': {
                 'status': 'connected' if db_status else 'disconnected',
                 'healthy': db_status,
-                'available': db_service.db_available
+                'available': db_status,
+                'checked_at': db_health['checked_at'],
+                'age_seconds': db_health['age_seconds'],
+                'latency_ms': db_health['latency_ms'],
+                'stale': db_health['stale'],
+                'log_writer': db_service.log_writer.get_stats(),
+                'history_cache': db_service.history_cache.get_stats(),
+                'replicas': db_service.replicas.get_stats(),
+                'archive': db_service.archive.get_stats(),
+                'search': db_service.search.get_stats(),
+                'stats_counters': get_stats_service().get_job_stats()
             },
             'ai_service': {
                 'status': 'connected' if ai_status else 'disconnected',
-                'healthy': ai_status
+                'healthy': ai_status,
+                'checked_at': ai_health['checked_at'],
+                'age_seconds': ai_health['age_seconds'],
+                'latency_ms': ai_health['latency_ms'],
+                'stale': ai_health['stale'],
+                'executor': gemini_service.executor.get_stats(),
+                'response_cache': gemini_service.response_cache.get_stats(),
+                'semantic_cache': gemini_service.semantic_cache.get_stats(),
+                'token_counter': gemini_service.token_counter.get_stats(),
+                'single_flight': gemini_service.single_flight.get_stats(),
+                'providers': gemini_service.get_provider_stats()
             },
-            'overall_status': 'healthy' if (db_status and ai_status) else 'degraded'
+            'cache_backend': get_cache_backend().get_stats(),
+            'overall_status': 'healthy' if (db_status and ai_status) else 'degraded',
+            'prober': health_monitor.is_leader()
         })
         
     except Exception as e:
@@ -51,6 +88,42 @@ def system_status():
             'error': str(e)
         }), 500
 
+@admin_bp.route('/pool', methods=['GET'])
+def pool_metrics():
+    """Get database connection pool metrics for the primary and each replica."""
+    try:
+        return jsonify({'pools': get_pool_stats()})
+    except Exception as e:
+        logger.error(f"Error in pool_metrics: {str(e)}")
+        return jsonify({'error': 'Internal server error', 'pools': {}}), 500
+
+def _page_args(default_limit):
+    """Read ?limit= (capped at ADMIN_PAGE_SIZE_MAX), ?before= and ?after= for a keyset-paginated listing."""
+    return page_args(default_limit, Config.ADMIN_PAGE_SIZE_MAX)
+
+def _time_arg(name):
+    """
+    Read an ISO-8601 time filter as naive UTC; times without an offset are taken as UTC.
+    
+    Raises:
+        ValueError: If the value is not ISO-8601
+    """
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f"Invalid '{name}' time: {value}")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _fields_arg():
+    """Read ?fields=a,b,c, the columns to return; None for all."""
+    fields = request.args.get('fields')
+    return [field.strip() for field in fields.split(',') if field.strip()] if fields else None
+
 @admin_bp.route('/logs', methods=['GET'])
 def get_logs():
     """Get system logs."""
@@ -64,14 +137,24 @@ def get_logs():
                 'database_status': 'disconnected'
             })
         
-        level = request.args.get('level')
-        limit = int(request.args.get('limit', 100))
-        
-        logs = db_service.get_system_logs(level, limit)
+        limit, before, after = _page_args(100)
+        try:
+            logs, has_more = db_service.get_system_logs_page(
+                limit, before, after,
+                level=request.args.get('level'),
+                module=request.args.get('module'),
+                user_id=request.args.get('user_id', type=int),
+                since=_time_arg('since'),
+                until=_time_arg('until'),
+                fields=_fields_arg()
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e), 'logs': [], 'count': 0, 'database_status': 'connected'}), 400
         
         return jsonify({
-            'logs': [log.to_dict() for log in logs],
+            'logs': [db_service.row_to_dict(log) for log in logs],
             'count': len(logs),
+            'pagination': pagination(logs, has_more, limit, after, 'timestamp'),
             'database_status': 'connected'
         })
         
@@ -99,26 +182,15 @@ def get_stats():
                 'database_status': 'disconnected'
             })
         
-        from models import User, Conversation, Message, db
-        from sqlalchemy import func
-        
-        # Get basic counts
-        user_count = db.session.query(func.count(User.id)).scalar() or 0
-        conversation_count = db.session.query(func.count(Conversation.id)).scalar() or 0
-        message_count = db.session.query(func.count(Message.id)).scalar() or 0
-        
-        # Get active conversations (updated in last 24 hours)
-        from datetime import datetime, timedelta
-        yesterday = datetime.utcnow() - timedelta(days=1)
-        active_conversations = db.session.query(func.count(Conversation.id)).filter(
-            Conversation.updated_at >= yesterday
-        ).scalar() or 0
+        # Served from incrementally maintained counters, not table counts
+        stats_service = get_stats_service()
+        counts = stats_service.get_stats()
+        if counts is None:
+            # Only before the background job's first run
+            counts = stats_service.refresh()
         
         return jsonify({
-            'users': user_count,
-            'conversations': conversation_count,
-            'messages': message_count,
-            'active_conversations_24h': active_conversations,
+            **counts,
             'database_status': 'connected'
         })
         
@@ -145,13 +217,21 @@ def get_users():
                 'database_status': 'disconnected'
             })
         
-        from models import User
-        
-        limit = int(request.args.get('limit', 50))
-        users = User.query.order_by(User.created_at.desc()).limit(limit).all()
+        limit, before, after = _page_args(50)
+        try:
+            users, has_more = db_service.get_users_page(
+                limit, before, after,
+                username_prefix=request.args.get('username'),
+                since=_time_arg('since'),
+                until=_time_arg('until'),
+                fields=_fields_arg()
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e), 'users': [], 'database_status': 'connected'}), 400
         
         return jsonify({
-            'users': [user.to_dict() for user in users],
+            'users': [db_service.row_to_dict(user) for user in users],
+            'pagination': pagination(users, has_more, limit, after, 'created_at'),
             'database_status': 'connected'
         })
         
@@ -1,12 +1,17 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify, session, Response, stream_with_context, current_app
 from datetime import datetime, timedelta
 import uuid
+import json
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from services.gemini_service import GeminiService
 from services.database_service import DatabaseService
+from services.summary_service import SummaryService
+from services.ndjson_export import ndjson_response
+from services.pagination import page_args, pagination
+from config import Config
 import logging
 
 # Initialize blueprint
@@ -15,6 +20,7 @@ chat_bp = Blueprint('chat', __name__)
 # Initialize services
 gemini_service = GeminiService()
 db_service = DatabaseService()
+summary_service = SummaryService(gemini_service, db_service)
 logger = logging.getLogger(__name__)
 
 @chat_bp.route('/register', methods=['POST'])
@@ -36,8 +42,8 @@ def register():
             return jsonify({'error': 'Username and password cannot be empty'}), 400
         
         logger.info(f"Checking if user exists with username: {username}")
-        # Check if user already exists
-        existing_user = db_service.get_user_by_username(username)
+        # Check if user already exists (on the primary: a lagging replica may miss a fresh registration)
+        existing_user = db_service.get_user_by_username(username, primary=True)
         if existing_user:
             logger.error(f"User already exists with username: {username}")
             return jsonify({'error': 'User with this username already exists'}), 400
@@ -142,6 +148,9 @@ def get_current_user():
 @chat_bp.route('/send', methods=['POST'])
 def send_message():
     """Handle sending a message to the chatbot."""
+    if request.args.get('stream', '').lower() in ('1', 'true'):
+        return stream_message()
+    
     try:
         data = request.get_json()
         
@@ -152,24 +161,16 @@ def send_message():
         if not user_message:
             return jsonify({'error': 'Message cannot be empty'}), 400
         
-        # Check if database is available
-        from flask import current_app
-        db_working = getattr(current_app, 'db_working', False)
+        # Clients can opt out of cached responses per request
+        use_cache = data.get('use_cache', True) is not False
         
-        # Also check if database service is available
-        if db_working:
-            try:
-                # Test database connection
-                db_service._check_db_connection()
-                if not db_service.db_available:
-                    db_working = False
-            except Exception as e:
-                db_working = False
+        # Database availability comes from the background monitor (no per-request probe)
+        db_working = db_service.db_available
         
         if not db_working:
             # Fallback mode: AI-only response without database
             try:
-                ai_response = gemini_service.generate_response(user_message, [])
+                ai_response = gemini_service.generate_response(user_message, [], use_cache=use_cache)
                 return jsonify({
                     'response': ai_response,
                     'conversation_id': str(uuid.uuid4()),
@@ -182,6 +183,7 @@ def send_message():
                 return jsonify({'error': 'AI service unavailable'}), 500
         
         # Normal mode with database
+        ai_response = None
         try:
             # Check if user is logged in
             user_id = session.get('user_id')
@@ -190,33 +192,39 @@ def send_message():
             
             # Get or create conversation
             conversation_id = data.get('conversation_id')
+            conversation_history = []
+            summary = None
             
-            if not conversation_id:
-                conversation = db_service.create_conversation(user_id)
-                if not conversation:
-                    raise Exception('Failed to create conversation')
-                conversation_id = conversation.id
-            
-            # Save user message
-            user_msg = db_service.add_message(conversation_id, user_message, 'user')
-            if not user_msg:
-                raise Exception('Failed to save user message')
-            
-            # Get conversation history for context
-            conversation_history = db_service.get_conversation_history(conversation_id)
+            if conversation_id:
+                # Get the rolling summary plus the turns it does not cover yet
+                summary, summarized_until = summary_service.get_prompt_context(conversation_id)
+                conversation_history = summary_service.unsummarized(
+                    db_service.get_conversation_history(conversation_id, Config.MAX_CONVERSATION_HISTORY),
+                    summarized_until
+                )
+            received_at = datetime.utcnow()
             
             # Generate AI response
-            ai_response = gemini_service.generate_response(user_message, conversation_history)
-            
-            # Save AI response
-            token_count = gemini_service.count_tokens(ai_response)
-            ai_msg = db_service.add_message(conversation_id, ai_response, 'bot', token_count)
+            ai_response = gemini_service.generate_response(
+                user_message, conversation_history, use_cache=use_cache, summary=summary
+            )
             
-            if not ai_msg:
-                raise Exception('Failed to save AI response')
+            # Save conversation (if new), both messages and the audit log in one transaction
+            turn = db_service.save_chat_turn(
+                user_id,
+                conversation_id or None,
+                user_message,
+                ai_response,
+                user_token_count=gemini_service.count_tokens(user_message),
+                bot_token_count=gemini_service.count_tokens(ai_response),
+                user_timestamp=received_at
+            )
+            if not turn:
+                raise Exception('Failed to save chat turn')
+            conversation_id, _, ai_message_id = turn
             
-            # Log the interaction
-            db_service.log_system_event('INFO', f'Chat interaction completed', 'chat_routes', user_id)
+            # Fold older turns into the rolling summary in the background
+            summary_service.schedule_refresh(conversation_id)
             
             # Get UTC+3 timestamp for response
             utc_plus_3_timestamp = (datetime.utcnow() + timedelta(hours=3)).isoformat()
@@ -224,15 +232,18 @@ def send_message():
             return jsonify({
                 'response': ai_response,
                 'conversation_id': conversation_id,
-                'message_id': ai_msg.id,
+                'message_id': ai_message_id,
                 'timestamp': utc_plus_3_timestamp
             })
             
         except Exception as db_error:
             logger.error(f"Database operation failed: {str(db_error)}")
+            db_service.health.report_failure()
             # Database operation failed, fall back to AI-only mode
+            # (reusing the reply if it was already generated)
             try:
-                ai_response = gemini_service.generate_response(user_message, [])
+                if ai_response is None:
+                    ai_response = gemini_service.generate_response(user_message, [], use_cache=use_cache)
                 return jsonify({
                     'response': ai_response,
                     'conversation_id': str(uuid.uuid4()),
@@ -260,18 +271,136 @@ def send_message():
         except:
             return jsonify({'error': 'Service temporarily unavailable'}), 500
 
+def _sse_event(event: str, data: dict) -> str:
+    """Format a single Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@chat_bp.route('/stream', methods=['POST'])
+def stream_message():
+    """Stream the chatbot's reply to the client as Server-Sent Events.
+    
+    Emits a ``start`` event with the conversation id, one ``chunk`` event per
+    piece of generated text and a final ``done`` event. The bot message is
+    persisted once the stream completes or the client disconnects.
+    """
+    data = request.get_json(silent=True)
+    
+    if not data or 'message' not in data:
+        return jsonify({'error': 'Message is required'}), 400
+    
+    user_message = data['message'].strip()
+    if not user_message:
+        return jsonify({'error': 'Message cannot be empty'}), 400
+    
+    use_cache = data.get('use_cache', True) is not False
+    
+    db_working = db_service.db_available
+    
+    user_id = None
+    conversation_id = None
+    conversation_history = []
+    summary = None
+    
+    if db_working:
+        user_id = session.get('user_id')
+        if not user_id:
+            return jsonify({'error': 'Authentication required. Please login first.'}), 401
+        
+        try:
+            conversation_id = data.get('conversation_id')
+            if not conversation_id:
+                conversation = db_service.create_conversation(user_id)
+                if not conversation:
+                    raise Exception('Failed to create conversation')
+                conversation_id = conversation.id
+            else:
+                summary, summarized_until = summary_service.get_prompt_context(conversation_id)
+                conversation_history = summary_service.unsummarized(
+                    db_service.get_conversation_history(conversation_id, Config.MAX_CONVERSATION_HISTORY),
+                    summarized_until
+                )
+        except Exception as db_error:
+            logger.error(f"Database operation failed before streaming: {str(db_error)}")
+            db_service.health.report_failure()
+            db_working = False
+            conversation_history = []
+            summary = None
+    
+    mode = 'normal' if db_working else 'fallback'
+    if not db_working:
+        conversation_id = str(uuid.uuid4())
+    
+    received_at = datetime.utcnow()
+    
+    def generate():
+        chunks = []
+        ai_message_id = None
+        
+        yield _sse_event('start', {'conversation_id': conversation_id, 'mode': mode})
+        try:
+            for chunk in gemini_service.generate_response_stream(
+                user_message, conversation_history, use_cache=use_cache, summary=summary
+            ):
+                chunks.append(chunk)
+                yield _sse_event('chunk', {'text': chunk})
+        finally:
+            # Runs on normal completion and when the client disconnects mid-stream
+            ai_response = ''.join(chunks).strip()
+            if db_working:
+                # The user message is stored with whatever reply was produced, in one transaction
+                turn = db_service.save_chat_turn(
+                    user_id,
+                    conversation_id,
+                    user_message,
+                    ai_response,
+                    user_token_count=gemini_service.count_tokens(user_message),
+                    bot_token_count=gemini_service.count_tokens(ai_response) if ai_response else 0,
+                    user_timestamp=received_at,
+                    log_message='Chat interaction completed (streamed)'
+                )
+                if turn:
+                    ai_message_id = turn[2]
+                    summary_service.schedule_refresh(conversation_id)
+                else:
+                    logger.error(f"Failed to save streamed chat turn for conversation {conversation_id}")
+        
+        yield _sse_event('done', {
+            'conversation_id': conversation_id,
+            'message_id': ai_message_id or str(uuid.uuid4()),
+            'timestamp': (datetime.utcnow() + timedelta(hours=3)).isoformat(),
+            'mode': mode
+        })
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+def _page_args():
+    """Read ?limit=, ?before= and ?after= for a keyset-paginated list."""
+    return page_args(Config.PAGE_SIZE_DEFAULT, Config.PAGE_SIZE_MAX)
+
 @chat_bp.route('/conversations', methods=['GET'])
 def get_conversations():
-    """Get user's conversations."""
+    """Get one page of the user's conversations, most recently updated first."""
     try:
         user_id = session.get('user_id')
         if not user_id:
             return jsonify({'error': 'Authentication required. Please login first.'}), 401
         
-        conversations = db_service.get_user_conversations(user_id)
+        limit, before, after = _page_args()
+        try:
+            conversations, has_more = db_service.get_user_conversations_page(user_id, limit, before, after)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
-            'conversations': [conv.to_dict() for conv in conversations]
+            'conversations': [conv.to_dict() for conv in conversations],
+            'pagination': pagination(conversations, has_more, limit, after, 'updated_at')
         })
         
     except Exception as e:
@@ -280,7 +409,7 @@ def get_conversations():
 
 @chat_bp.route('/conversations/<int:conversation_id>/messages', methods=['GET'])
 def get_conversation_messages(conversation_id):
-    """Get messages for a specific conversation."""
+    """Get one page of a conversation's messages (newest page first, oldest first within it)."""
     try:
         user_id = session.get('user_id')
         if not user_id:
@@ -291,17 +420,90 @@ def get_conversation_messages(conversation_id):
         if not conversation or conversation.user_id != user_id:
             return jsonify({'error': 'Conversation not found'}), 404
         
-        messages = db_service.get_conversation_messages(conversation_id)
+        limit, before, after = _page_args()
+        try:
+            messages, has_more = db_service.get_conversation_messages_page(
+                conversation_id, limit, before, after, archived=conversation.archived_at is not None
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
-            'messages': [msg.to_dict() for msg in messages],
-            'conversation': conversation.to_dict()
+            # Pages are selected newest-first but rendered in chat order
+            'messages': [msg.to_dict() for msg in reversed(messages)],
+            'conversation': conversation.to_dict(),
+            'pagination': pagination(messages, has_more, limit, after, 'timestamp')
         })
         
     except Exception as e:
         logger.error(f"Error in get_conversation_messages: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@chat_bp.route('/search', methods=['GET'])
+def search_messages():
+    """Full-text search over the user's messages, best match first (?q=, ?limit=, ?offset=)."""
+    try:
+        user_id = session.get('user_id')
+        if not user_id:
+            return jsonify({'error': 'Authentication required. Please login first.'}), 401
+        
+        query = request.args.get('q', '').strip()
+        if not db_service.search.tokenize(query):
+            return jsonify({'error': 'Search query is required'}), 400
+        
+        limit, _, _ = _page_args()
+        offset = max(0, request.args.get('offset', 0, type=int))
+        results, has_more = db_service.search_messages(user_id, query, limit, offset)
+        
+        return jsonify({
+            'query': query,
+            'results': results,
+            'pagination': {
+                'limit': limit,
+                'offset': offset,
+                'has_more': has_more,
+                'next_offset': offset + len(results) if has_more else None
+            }
+        })
+        
+    except Exception as e:
+        logger.error(f"Error in search_messages: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+def _export_compressed() -> bool:
+    """Whether the export was requested gzipped (?gzip=true)."""
+    return request.args.get('gzip', 'false').lower() == 'true'
+
+@chat_bp.route('/conversations/<int:conversation_id>/export', methods=['GET'])
+def export_conversation(conversation_id):
+    """Stream one of the user's conversations as NDJSON (?gzip=true to compress)."""
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'User session required'}), 401
+    
+    conversation = db_service.get_conversation(conversation_id)
+    if not conversation or conversation.user_id != user_id:
+        return jsonify({'error': 'Conversation not found'}), 404
+    
+    if not db_service.test_connection():
+        return jsonify({'error': 'Database unavailable'}), 503
+    
+    records = db_service.iter_export_records(user_id=user_id, conversation_id=conversation_id)
+    return ndjson_response(records, f'conversation-{conversation_id}', _export_compressed())
+
+@chat_bp.route('/export', methods=['GET'])
+def export_conversations():
+    """Stream all of the user's conversations and messages as NDJSON (?gzip=true to compress)."""
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'Authentication required. Please login first.'}), 401
+    
+    if not db_service.test_connection():
+        return jsonify({'error': 'Database unavailable'}), 503
+    
+    records = db_service.iter_export_records(user_id=user_id)
+    return ndjson_response(records, f'conversations-user-{user_id}', _export_compressed())
+
 @chat_bp.route('/conversations/<int:conversation_id>', methods=['PUT'])
 def update_conversation(conversation_id):
     """Update conversation details."""
@@ -26,9 +26,12 @@ def send_message_simple():
         # Generate a simple session ID for this request
         conversation_id = data.get('conversation_id') or str(uuid.uuid4())
         
+        # Clients can opt out of cached responses per request
+        use_cache = data.get('use_cache', True) is not False
+        
         # Generate AI response directly (no database save)
         logger.info(f"Processing message: {user_message[:50]}...")
-        ai_response = gemini_service.generate_response(user_message, [])
+        ai_response = gemini_service.generate_response(user_message, [], use_cache=use_cache)
         
         return jsonify({
             'response': ai_response,
@@ -1,4 +1,5 @@
 from flask import Blueprint, jsonify
+from services.db_health import get_db_health_monitor
 
 # Initialize blueprint
 main_bp = Blueprint('main', __name__)
@@ -20,14 +21,17 @@ def root():
 @main_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
-    from flask import current_app
     from datetime import datetime
  
-    db_status = 'healthy' if getattr(current_app, 'db_working', False) else 'unhealthy'
+    # Reported from the background monitor; this endpoint never queries the database
+    db_health = get_db_health_monitor().get_status()
+    db_status = 'healthy' if db_health['available'] else 'unhealthy'
 
     return jsonify({
         'status': 'healthy',
         'database': db_status,
+        'database_checked_at': db_health['checked_at'],
+        'database_latency_ms': db_health['latency_ms'],
         'timestamp': datetime.utcnow().isoformat()
     }), 200
 
@@ -44,6 +48,8 @@ def api_docs():
                 'response': {
                     'status': 'string - Service health status',
                     'database': 'string - Database connection status',
+                    'database_checked_at': 'string - UTC time of the last background check',
+                    'database_latency_ms': 'number - Latency of the last background check',
                     'timestamp': 'string - Current UTC timestamp'
                 }
             },
@@ -85,18 +91,65 @@ def api_docs():
                     'description': 'Send message to AI',
                     'body': {
                         'message': 'string - Required',
-                        'conversation_id': 'string - Optional'
+                        'conversation_id': 'string - Optional',
+                        'use_cache': 'boolean - Optional, false bypasses the response cache'
+                    }
+                },
+                'stream': {
+                    'method': 'POST',
+                    'path': '/api/chat/stream',
+                    'description': 'Send message to AI and stream the reply as Server-Sent Events (also /api/chat/send?stream=1)',
+                    'body': {
+                        'message': 'string - Required',
+                        'conversation_id': 'string - Optional',
+                        'use_cache': 'boolean - Optional, false bypasses the response cache'
                     }
                 },
                 'conversations': {
                     'method': 'GET',
                     'path': '/api/chat/conversations',
-                    'description': 'Get user conversations'
+                    'description': 'Get a page of user conversations, most recently updated first',
+                    'query': {
+                        'limit': 'integer - Optional page size',
+                        'before': 'string - Optional pagination.before_cursor, for older conversations',
+                        'after': 'string - Optional pagination.after_cursor, for newer conversations'
+                    }
                 },
                 'messages': {
                     'method': 'GET',
-                    'path': '/api/chat/messages/<conversation_id>',
-                    'description': 'Get conversation messages'
+                    'path': '/api/chat/conversations/<conversation_id>/messages',
+                    'description': 'Get a page of conversation messages (newest page by default)',
+                    'query': {
+                        'limit': 'integer - Optional page size',
+                        'before': 'string - Optional pagination.before_cursor, for older messages',
+                        'after': 'string - Optional pagination.after_cursor, for newer messages'
+                    }
+                },
+                'search': {
+                    'method': 'GET',
+                    'path': '/api/chat/search',
+                    'description': 'Full-text search over your messages, best match first, with highlighted snippets',
+                    'query': {
+                        'q': 'string - Required, words to find (the last one also matches as a prefix)',
+                        'limit': 'integer - Optional page size',
+                        'offset': 'integer - Optional pagination.next_offset, for the next page'
+                    }
+                },
+                'export_conversation': {
+                    'method': 'GET',
+                    'path': '/api/chat/conversations/<conversation_id>/export',
+                    'description': 'Download a conversation and its messages as NDJSON',
+                    'query': {
+                        'gzip': 'boolean - Optional, true for a gzipped .ndjson.gz'
+                    }
+                },
+                'export': {
+                    'method': 'GET',
+                    'path': '/api/chat/export',
+                    'description': 'Download all of the user\'s conversations and messages as NDJSON',
+                    'query': {
+                        'gzip': 'boolean - Optional, true for a gzipped .ndjson.gz'
+                    }
                 }
             },
             'admin': {
@@ -110,15 +163,40 @@ def api_docs():
                     'path': '/api/admin/stats',
                     'description': 'Get system statistics'
                 },
+                'pool': {
+                    'method': 'GET',
+                    'path': '/api/admin/pool',
+                    'description': 'Get database connection pool metrics (checked out, overflow, checkout wait histogram)'
+                },
                 'users': {
                     'method': 'GET',
                     'path': '/api/admin/users',
-                    'description': 'Get all users'
+                    'description': 'Get a page of users, most recently created first',
+                    'query': {
+                        'limit': 'integer - Optional page size (capped at ADMIN_PAGE_SIZE_MAX)',
+                        'before': 'string - Optional pagination.before_cursor, for older users',
+                        'after': 'string - Optional pagination.after_cursor, for newer users',
+                        'username': 'string - Optional username prefix',
+                        'since': 'string - Optional ISO-8601 time, created at or after (UTC unless an offset is given)',
+                        'until': 'string - Optional ISO-8601 time, created before',
+                        'fields': 'string - Optional comma-separated columns (id, username, email, created_at, is_active)'
+                    }
                 },
                 'logs': {
                     'method': 'GET',
                     'path': '/api/admin/logs',
-                    'description': 'Get system logs'
+                    'description': 'Get a page of system logs, newest first',
+                    'query': {
+                        'limit': 'integer - Optional page size (capped at ADMIN_PAGE_SIZE_MAX)',
+                        'before': 'string - Optional pagination.before_cursor, for older logs',
+                        'after': 'string - Optional pagination.after_cursor, for newer logs',
+                        'level': 'string - Optional level, e.g. ERROR',
+                        'module': 'string - Optional module',
+                        'user_id': 'integer - Optional user',
+                        'since': 'string - Optional ISO-8601 time, at or after (UTC unless an offset is given)',
+                        'until': 'string - Optional ISO-8601 time, before',
+                        'fields': 'string - Optional comma-separated columns (id, level, message, module, user_id, timestamp)'
+                    }
                 }
             }
         }
@@ -0,0 +1,585 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from config import Config
+
+
+class CacheBackend(ABC):
+    """Storage and invalidation transport shared by the application's caches.
+
+    Entries are addressed by ``(namespace, key)`` and hold JSON-serializable
+    values with a TTL. :meth:`invalidate` removes an entry (or a whole
+    namespace when ``key`` is None) and broadcasts the removal, so caches in
+    other workers that keep a local copy can drop it through the handlers
+    registered with :meth:`subscribe`; :meth:`publish` broadcasts an update
+    they can apply instead. Broadcasts never come back to the backend
+    instance that sent them; the caller already updated its own state.
+
+    Backend errors are logged and counted, and reads then behave as misses,
+    so an unreachable cache never fails a request.
+    """
+
+    kind = 'base'
+
+    def __init__(self):
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        self._handlers = {}
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._sets = 0
+        self._errors = 0
+        self._published = 0
+        self._received = 0
+
+        self.logger = logging.getLogger(__name__)
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """
+        Look up an entry.
+
+        Args:
+            namespace (str): Cache namespace, e.g. 'response'
+            key (str): Key within the namespace
+
+        Returns:
+            Optional[Any]: Stored value, or None on a miss, expired entry or backend error
+        """
+        try:
+            raw = self._get(namespace, key)
+        except Exception as e:
+            self._error('get', e)
+            raw = None
+        self._count('_hits' if raw is not None else '_misses')
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, namespace: str, key: str, value: Any, ttl_seconds: float):
+        """
+        Store an entry.
+
+        Args:
+            namespace (str): Cache namespace
+            key (str): Key within the namespace
+            value (Any): JSON-serializable value
+            ttl_seconds (float): Seconds the entry stays valid
+        """
+        try:
+            self._set(namespace, key, json.dumps(value), ttl_seconds)
+            self._count('_sets')
+        except Exception as e:
+            self._error('set', e)
+
+    def delete(self, namespace: str, key: str):
+        """Remove a single entry from the store without broadcasting."""
+        try:
+            self._delete(namespace, key)
+        except Exception as e:
+            self._error('delete', e)
+
+    def clear(self, namespace: str):
+        """Remove every entry of a namespace from the store without broadcasting."""
+        try:
+            self._clear(namespace)
+        except Exception as e:
+            self._error('clear', e)
+
+    def invalidate(self, namespace: str, key: Optional[str] = None):
+        """
+        Remove an entry, or a whole namespace, and tell the other workers.
+
+        Args:
+            namespace (str): Cache namespace
+            key (str): Key to remove, None for the whole namespace
+        """
+        if key is None:
+            self.clear(namespace)
+        else:
+            self.delete(namespace, key)
+        self._send(namespace, key, None)
+
+    def publish(self, namespace: str, key: str, data: Any):
+        """
+        Tell the other workers about an update of an entry without touching the store.
+
+        Args:
+            namespace (str): Cache namespace
+            key (str): Key the update applies to
+            data (Any): JSON-serializable update passed to the handlers
+        """
+        self._send(namespace, key, data)
+
+    def _send(self, namespace: str, key: Optional[str], data: Any):
+        message = {'origin': self.origin, 'namespace': namespace, 'key': key}
+        if data is not None:
+            message['data'] = data
+        try:
+            self._publish(json.dumps(message))
+            self._count('_published')
+        except Exception as e:
+            self._error('publish', e)
+
+    def subscribe(self, namespace: str, handler: Callable[[Optional[str], Any], None]):
+        """
+        Register a handler for invalidations and updates broadcast by other workers.
+
+        Args:
+            namespace (str): Namespace to listen to
+            handler (Callable): Called with the key, or None when the whole namespace
+                was cleared, and the data given to publish(), or None for an invalidation
+        """
+        with self._stats_lock:
+            self._handlers.setdefault(namespace, []).append(handler)
+        self._start_listener()
+
+    def _dispatch(self, payload: str):
+        """Deliver one broadcast received from the transport to local handlers."""
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        if message.get('origin') == self.origin:
+            return
+
+        self._count('_received')
+        for handler in list(self._handlers.get(message.get('namespace'), ())):
+            try:
+                handler(message.get('key'), message.get('data'))
+            except Exception as e:
+                self.logger.error(f"Error in cache invalidation handler: {str(e)}")
+
+    def _count(self, counter: str):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _error(self, operation: str, error: Exception):
+        with self._stats_lock:
+            self._errors += 1
+            errors = self._errors
+        # Power-of-two sampling keeps an outage of the cache store from flooding the log
+        if errors & (errors - 1) == 0:
+            self.logger.warning(f"Cache backend {self.kind} {operation} failed ({errors} errors so far): {str(error)}")
+
+    @abstractmethod
+    def _get(self, namespace: str, key: str) -> Optional[str]:
+        """Return the raw stored value, or None when missing or expired."""
+
+    @abstractmethod
+    def _set(self, namespace: str, key: str, raw: str, ttl_seconds: float):
+        """Store a raw value with its TTL."""
+
+    @abstractmethod
+    def _delete(self, namespace: str, key: str):
+        """Remove one entry."""
+
+    @abstractmethod
+    def _clear(self, namespace: str):
+        """Remove every entry of a namespace."""
+
+    @abstractmethod
+    def _publish(self, payload: str):
+        """Send a broadcast payload to the other workers."""
+
+    def _start_listener(self):
+        """Start receiving broadcasts; called on every subscribe() and must be idempotent."""
+
+    def get_stats(self) -> Dict:
+        """
+        Get a snapshot of backend counters.
+
+        Returns:
+            Dict: Backend kind, hit/miss/set counts, errors and invalidations sent/received
+        """
+        with self._stats_lock:
+            lookups = self._hits + self._misses
+            return {
+                'backend': self.kind,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'sets': self._sets,
+                'errors': self._errors,
+                'invalidations_published': self._published,
+                'invalidations_received': self._received,
+                'subscribed_namespaces': sorted(self._handlers)
+            }
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU store; broadcasts reach nobody, so use it with one worker."""
+
+    kind = 'memory'
+
+    def __init__(self, max_entries: int):
+        """
+        Initialize the backend.
+
+        Args:
+            max_entries (int): Maximum entries across all namespaces
+        """
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._evictions = 0
+        self._expirations = 0
+
+    def _get(self, namespace: str, key: str) -> Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return None
+            raw, expires_at = entry
+            if expires_at <= now:
+                del self._entries[(namespace, key)]
+                self._expirations += 1
+                return None
+            self._entries.move_to_end((namespace, key))
+            return raw
+
+    def _set(self, namespace: str, key: str, raw: str, ttl_seconds: float):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[(namespace, key)] = (raw, time.monotonic() + ttl_seconds)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def _delete(self, namespace: str, key: str):
+        with self._lock:
+            self._entries.pop((namespace, key), None)
+
+    def _clear(self, namespace: str):
+        with self._lock:
+            for entry_key in [k for k in self._entries if k[0] == namespace]:
+                del self._entries[entry_key]
+
+    def _publish(self, payload: str):
+        pass
+
+    def get_stats(self) -> Dict:
+        stats = super().get_stats()
+        with self._lock:
+            stats.update({
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'evictions': self._evictions,
+                'expirations': self._expirations
+            })
+        return stats
+
+
+class SQLiteBackend(CacheBackend):
+    """Store shared by the workers of one host through a SQLite file.
+
+    Entries live in a WAL-mode database that every worker opens, and
+    invalidations are appended to a log table that a background thread in
+    each worker polls every ``poll_seconds``. Expired entries are purged,
+    and the store trimmed to ``max_entries`` by soonest expiry, every
+    ``maintenance_every`` writes; invalidations older than
+    ``invalidation_retention_seconds`` are pruned every
+    ``prune_invalidations_every`` broadcasts.
+    """
+
+    kind = 'sqlite'
+    maintenance_every = 256
+    prune_invalidations_every = 64
+    invalidation_retention_seconds = 60.0
+
+    def __init__(self, path: str, max_entries: int, poll_seconds: float):
+        """
+        Initialize the backend.
+
+        Args:
+            path (str): Database file shared by the workers
+            max_entries (int): Maximum entries across all namespaces
+            poll_seconds (float): Seconds between polls of the invalidation log
+        """
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.poll_seconds = poll_seconds
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._listener = None
+        self._writes = 0
+        self._broadcasts = 0
+
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entries ('
+                'namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, '
+                'expires_at REAL NOT NULL, PRIMARY KEY (namespace, key))'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at ON cache_entries (expires_at)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache_invalidations ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT NOT NULL, '
+                'payload TEXT NOT NULL, created_at REAL NOT NULL)'
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=2.0, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _get(self, namespace: str, key: str) -> Optional[str]:
+        row = self._connect().execute(
+            'SELECT value FROM cache_entries WHERE namespace = ? AND key = ? AND expires_at > ?',
+            (namespace, key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, namespace: str, key: str, raw: str, ttl_seconds: float):
+        if self.max_entries <= 0:
+            return
+        conn = self._connect()
+        conn.execute(
+            'INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)',
+            (namespace, key, raw, time.time() + ttl_seconds)
+        )
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.maintenance_every == 0
+        if due:
+            self._maintain(conn)
+
+    def _maintain(self, conn: sqlite3.Connection):
+        now = time.time()
+        conn.execute('DELETE FROM cache_entries WHERE expires_at <= ?', (now,))
+        conn.execute(
+            'DELETE FROM cache_entries WHERE rowid IN ('
+            'SELECT rowid FROM cache_entries ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        )
+
+    def _delete(self, namespace: str, key: str):
+        self._connect().execute('DELETE FROM cache_entries WHERE namespace = ? AND key = ?', (namespace, key))
+
+    def _clear(self, namespace: str):
+        self._connect().execute('DELETE FROM cache_entries WHERE namespace = ?', (namespace,))
+
+    def _publish(self, payload: str):
+        conn = self._connect()
+        conn.execute(
+            'INSERT INTO cache_invalidations (origin, payload, created_at) VALUES (?, ?, ?)',
+            (self.origin, payload, time.time())
+        )
+        # The log only grows here, so it is pruned at the rate it grows
+        with self._lock:
+            self._broadcasts += 1
+            due = self._broadcasts % self.prune_invalidations_every == 0
+        if due:
+            conn.execute(
+                'DELETE FROM cache_invalidations WHERE created_at < ?',
+                (time.time() - self.invalidation_retention_seconds,)
+            )
+
+    def _start_listener(self):
+        with self._lock:
+            if self._listener is not None:
+                return
+            # Only invalidations written after the first subscription are relevant
+            row = self._connect().execute('SELECT COALESCE(MAX(id), 0) FROM cache_invalidations').fetchone()
+            self._listener = threading.Thread(
+                target=self._poll, args=(row[0],), name='cache-invalidations', daemon=True
+            )
+            self._listener.start()
+
+    def _poll(self, last_id: int):
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                rows = self._connect().execute(
+                    'SELECT id, payload FROM cache_invalidations WHERE id > ? AND origin != ? ORDER BY id',
+                    (last_id, self.origin)
+                ).fetchall()
+            except Exception as e:
+                self._error('poll', e)
+                continue
+            for row_id, payload in rows:
+                last_id = row_id
+                self._dispatch(payload)
+
+    def get_stats(self) -> Dict:
+        stats = super().get_stats()
+        stats.update({
+            'path': self.path,
+            'max_entries': self.max_entries,
+            'poll_seconds': self.poll_seconds
+        })
+        try:
+            stats['size'] = self._connect().execute(
+                'SELECT COUNT(*) FROM cache_entries WHERE expires_at > ?', (time.time(),)
+            ).fetchone()[0]
+        except Exception as e:
+            self._error('stats', e)
+        return stats
+
+
+class RedisBackend(CacheBackend):
+    """Store shared by every worker on every host through a Redis-protocol server.
+
+    Keys are ``<prefix>:<namespace>:<key>`` with the TTL set on the server,
+    and invalidations are published on the ``<prefix>:invalidate`` channel.
+    Any client with the redis-py interface can be passed in, e.g. a
+    ``fakeredis`` instance in place of a real server.
+    """
+
+    kind = 'redis'
+
+    def __init__(self, url: Optional[str] = None, prefix: str = 'chatbot', client=None):
+        """
+        Initialize the backend.
+
+        Args:
+            url (str): Server URL, e.g. redis://localhost:6379/0; ignored when client is given
+            prefix (str): Prefix of every key and of the invalidation channel
+            client: Ready-made redis-py compatible client
+
+        Raises:
+            ImportError: If no client is given and the redis package is not installed
+        """
+        super().__init__()
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+        self.client = client
+        self.prefix = prefix
+        self.channel = f"{prefix}:invalidate"
+
+        self._lock = threading.Lock()
+        self._listener = None
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def _get(self, namespace: str, key: str) -> Optional[str]:
+        raw = self.client.get(self._key(namespace, key))
+        return raw.decode('utf-8') if isinstance(raw, bytes) else raw
+
+    def _set(self, namespace: str, key: str, raw: str, ttl_seconds: float):
+        self.client.set(self._key(namespace, key), raw, px=max(1, int(ttl_seconds * 1000)))
+
+    def _delete(self, namespace: str, key: str):
+        self.client.delete(self._key(namespace, key))
+
+    def _clear(self, namespace: str):
+        batch = []
+        for name in self.client.scan_iter(match=self._key(namespace, '*'), count=500):
+            batch.append(name)
+            if len(batch) >= 500:
+                self.client.delete(*batch)
+                batch = []
+        if batch:
+            self.client.delete(*batch)
+
+    def _publish(self, payload: str):
+        self.client.publish(self.channel, payload)
+
+    def _start_listener(self):
+        with self._lock:
+            if self._listener is not None:
+                return
+            self._listener = threading.Thread(target=self._listen, name='cache-invalidations', daemon=True)
+            self._listener.start()
+
+    def _listen(self):
+        while True:
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get('type') == 'message':
+                        data = message['data']
+                        self._dispatch(data.decode('utf-8') if isinstance(data, bytes) else data)
+            except Exception as e:
+                self._error('subscribe', e)
+                # Invalidations sent while disconnected are lost; entry TTLs bound the staleness
+                time.sleep(1.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def get_stats(self) -> Dict:
+        stats = super().get_stats()
+        stats.update({'prefix': self.prefix, 'channel': self.channel})
+        return stats
+
+
+BACKEND_KINDS: List[str] = ['memory', 'sqlite', 'redis']
+
+
+def build_cache_backend(kind: str) -> CacheBackend:
+    """
+    Build a cache backend from Config.
+
+    Args:
+        kind (str): One of BACKEND_KINDS
+
+    Returns:
+        CacheBackend: New backend instance
+
+    Raises:
+        ValueError: If the kind is unknown
+    """
+    kind = (kind or 'memory').strip().lower()
+    if kind == 'memory':
+        return MemoryBackend(max_entries=Config.CACHE_MAX_ENTRIES)
+    if kind == 'sqlite':
+        return SQLiteBackend(
+            path=Config.CACHE_SQLITE_PATH,
+            max_entries=Config.CACHE_MAX_ENTRIES,
+            poll_seconds=Config.CACHE_INVALIDATION_POLL_SECONDS
+        )
+    if kind == 'redis':
+        return RedisBackend(url=Config.CACHE_REDIS_URL, prefix=Config.CACHE_KEY_PREFIX)
+    raise ValueError(f"Unknown cache backend '{kind}', expected one of {', '.join(BACKEND_KINDS)}")
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_cache_backend() -> CacheBackend:
+    """Return the process-wide cache backend, creating it from Config on first use.
+
+    Falls back to the in-memory backend if the configured one cannot be built.
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                try:
+                    _backend = build_cache_backend(Config.CACHE_BACKEND)
+                except Exception as e:
+                    logging.getLogger(__name__).error(
+                        f"Cache backend '{Config.CACHE_BACKEND}' unavailable, using memory: {str(e)}"
+                    )
+                    _backend = MemoryBackend(max_entries=Config.CACHE_MAX_ENTRIES)
+    return _backend
@@ -0,0 +1,263 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from config import Config
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is refused because the circuit is open."""
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker for an upstream dependency.
+
+    While closed, outcomes of the last ``window_size`` calls are tracked; once
+    at least ``min_calls`` are recorded and either the failure rate or the
+    slow-call rate crosses its threshold, the circuit opens and callers fail
+    fast. While open, a background probe checks the upstream every
+    ``open_seconds``; a successful probe moves the circuit to half-open, where
+    a few trial calls decide whether it closes again or re-opens.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_rate_threshold: float, slow_call_seconds: float,
+                 slow_call_rate_threshold: float, window_size: int, min_calls: int,
+                 open_seconds: float, half_open_max_calls: int, probe: Optional[Callable[[], bool]] = None):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            name (str): Name of the protected upstream
+            failure_rate_threshold (float): Failure share (0..1) that opens the circuit
+            slow_call_seconds (float): Calls slower than this count as slow
+            slow_call_rate_threshold (float): Slow-call share (0..1) that opens the circuit
+            window_size (int): Number of recent calls evaluated
+            min_calls (int): Calls needed in the window before rates are evaluated
+            open_seconds (float): Time between recovery probes while open
+            half_open_max_calls (int): Trial calls allowed (and needed to close) while half-open
+            probe (Callable): Cheap upstream check returning True when healthy
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.probe = probe
+
+        self._state = self.CLOSED
+        self._window = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+        self._opened_at = None
+        self._changed_at = datetime.utcnow()
+        self._trial_calls = 0
+        self._trial_successes = 0
+        self._probe_timer = None
+        self._rejected = 0
+        self._times_opened = 0
+        self._successes = 0
+        self._failures = 0
+
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def state(self) -> str:
+        """Current state: 'closed', 'open' or 'half_open'."""
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may go to the upstream.
+
+        Returns:
+            bool: True if the call may proceed; False means fail fast
+        """
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._trial_permit_free():
+                self._trial_calls += 1
+                return True
+            self._rejected += 1
+            return False
+
+    def can_attempt(self) -> bool:
+        """
+        Check whether allow_request() would let a call through now, without taking a permit.
+
+        Returns:
+            bool: True if closed, or half-open with a trial call left
+        """
+        with self._lock:
+            self._maybe_half_open()
+            return self._state == self.CLOSED or self._trial_permit_free()
+
+    def _trial_permit_free(self) -> bool:
+        return self._state == self.HALF_OPEN and self._trial_calls < self.half_open_max_calls
+
+    def record_success(self, duration: float):
+        """
+        Record a completed upstream call.
+
+        Args:
+            duration (float): Call duration in seconds; slow calls count against the circuit
+        """
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            self._successes += 1
+            if self._state == self.HALF_OPEN:
+                if slow:
+                    self._open('slow trial call')
+                    return
+                self._trial_successes += 1
+                if self._trial_successes >= self.half_open_max_calls:
+                    self._close()
+                return
+            self._window.append((False, slow))
+            self._evaluate()
+
+    def record_failure(self):
+        """Record a failed upstream call."""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN:
+                self._open('failed trial call')
+                return
+            self._window.append((True, False))
+            self._evaluate()
+
+    def _evaluate(self):
+        if self._state != self.CLOSED or len(self._window) < self.min_calls:
+            return
+        calls = len(self._window)
+        failure_rate = sum(1 for failed, _ in self._window if failed) / calls
+        slow_rate = sum(1 for _, slow in self._window if slow) / calls
+        if failure_rate >= self.failure_rate_threshold:
+            self._open(f'failure rate {failure_rate:.0%}')
+        elif slow_rate >= self.slow_call_rate_threshold:
+            self._open(f'slow call rate {slow_rate:.0%}')
+
+    def _open(self, reason: str):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._changed_at = datetime.utcnow()
+        self._times_opened += 1
+        self._window.clear()
+        self.logger.warning(f"Circuit '{self.name}' opened: {reason}")
+        self._schedule_probe()
+
+    def _close(self):
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._changed_at = datetime.utcnow()
+        self._window.clear()
+        self.logger.info(f"Circuit '{self.name}' closed")
+
+    def _half_open(self):
+        self._state = self.HALF_OPEN
+        self._changed_at = datetime.utcnow()
+        self._trial_calls = 0
+        self._trial_successes = 0
+        self.logger.info(f"Circuit '{self.name}' half-open")
+
+    def _maybe_half_open(self):
+        # Without a background probe, recovery is tried by live calls after the open period
+        if (self.probe is None and self._state == self.OPEN
+                and time.monotonic() - self._opened_at >= self.open_seconds):
+            self._half_open()
+
+    def _schedule_probe(self):
+        if self.probe is None:
+            return
+        if self._probe_timer is not None:
+            self._probe_timer.cancel()
+        self._probe_timer = threading.Timer(self.open_seconds, self._run_probe)
+        self._probe_timer.daemon = True
+        self._probe_timer.start()
+
+    def _run_probe(self):
+        try:
+            healthy = bool(self.probe())
+        except Exception as e:
+            self.logger.warning(f"Circuit '{self.name}' probe failed: {str(e)}")
+            healthy = False
+
+        with self._lock:
+            if self._state != self.OPEN:
+                return
+            if healthy:
+                self._half_open()
+            else:
+                self._opened_at = time.monotonic()
+                self._schedule_probe()
+
+    def get_stats(self) -> Dict:
+        """
+        Get a snapshot of the circuit state.
+
+        Returns:
+            Dict: State, thresholds and recent-window figures
+        """
+        with self._lock:
+            self._maybe_half_open()
+            calls = len(self._window)
+            return {
+                'name': self.name,
+                'state': self._state,
+                'since': self._changed_at.isoformat(),
+                'window_calls': calls,
+                'failure_rate': round(sum(1 for f, _ in self._window if f) / calls, 4) if calls else 0.0,
+                'slow_call_rate': round(sum(1 for _, s in self._window if s) / calls, 4) if calls else 0.0,
+                'failure_rate_threshold': self.failure_rate_threshold,
+                'slow_call_seconds': self.slow_call_seconds,
+                'slow_call_rate_threshold': self.slow_call_rate_threshold,
+                'successes': self._successes,
+                'failures': self._failures,
+                'rejected': self._rejected,
+                'times_opened': self._times_opened
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str, probe: Optional[Callable[[], bool]] = None) -> CircuitBreaker:
+    """
+    Return the process-wide circuit breaker for an upstream, creating it from Config on first use.
+
+    Args:
+        name (str): Name of the protected upstream
+        probe (Callable): Recovery probe used when the breaker is first created
+
+    Returns:
+        CircuitBreaker: Shared breaker for that upstream
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name=name,
+                failure_rate_threshold=Config.CIRCUIT_BREAKER_FAILURE_RATE,
+                slow_call_seconds=Config.CIRCUIT_BREAKER_SLOW_CALL_SECONDS,
+                slow_call_rate_threshold=Config.CIRCUIT_BREAKER_SLOW_CALL_RATE,
+                window_size=Config.CIRCUIT_BREAKER_WINDOW_SIZE,
+                min_calls=Config.CIRCUIT_BREAKER_MIN_CALLS,
+                open_seconds=Config.CIRCUIT_BREAKER_OPEN_SECONDS,
+                half_open_max_calls=Config.CIRCUIT_BREAKER_HALF_OPEN_CALLS,
+                probe=probe
+            )
+            _breakers[name] = breaker
+        return breaker
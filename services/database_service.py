@@ -1,6 +1,15 @@
-from models import User, Conversation, Message, SystemLog, db
-from datetime import datetime
-from typing import List, Optional, Dict
+from models import User, Conversation, Message, MessageArchive, SystemLog, ConversationSummary, db
+from services.db_health import get_db_health_monitor
+from services.log_writer import get_log_writer
+from services.history_cache import get_history_cache
+from services.replica_router import get_replica_router
+from services.message_archive import get_message_archiver
+from services.message_search import get_message_search
+from config import Config
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterator, List, Optional, Dict, Tuple
+from sqlalchemy import update, func, bindparam, and_, or_, select
+import base64
 import logging
 import secrets
 import hashlib
@@ -12,38 +21,65 @@ class DatabaseService:
     def __init__(self):
         """Initialize database service."""
         self.logger = logging.getLogger(__name__)
-        self._check_db_connection()
+        
+        # Availability is tracked by the background monitor, not probed per call
+        self.health = get_db_health_monitor()
+        
+        # Audit events are written behind the request in batches
+        self.log_writer = get_log_writer()
+        
+        # Recent messages per conversation, so a chat turn needs no history query
+        self.history_cache = get_history_cache()
+        
+        # Read-only queries go to replicas when configured and fresh enough
+        self.replicas = get_replica_router()
+        
+        # Messages of idle conversations live in compressed archive rows
+        self.archive = get_message_archiver()
+        
+        # Full-text search over message content
+        self.search = get_message_search()
     
-    def _check_db_connection(self):
-        """Check if database connection is available."""
-        try:
-            from flask import current_app
-            self.db_available = getattr(current_app, 'db_working', False)
-            
-            # If Flask app context doesn't indicate db is working, test directly
-            if not self.db_available:
-                # Try a simple database query to test connection
-                from models import User
-                User.query.limit(1).first()
-                self.db_available = True
-                # Update app context if we're in one
-                if current_app:
-                    current_app.db_working = True
-        except Exception as e:
-            self.db_available = False
-            # Update app context if we're in one
-            try:
-                from flask import current_app
-                if current_app:
-                    current_app.db_working = False
-            except:
-                pass
+    @property
+    def db_available(self) -> bool:
+        """Last known database availability from the background monitor."""
+        return self.health.is_available()
     
     def _handle_db_error(self, operation: str, error: Exception):
         """Handle database errors gracefully."""
         self.logger.error(f"Database error in {operation}: {str(error)}")
-        self.db_available = False
+        self.health.report_failure(error)
         return None
+    
+    def _read(self, query_fn: Callable, *args, user_id: int = None) -> Any:
+        """
+        Run a read-only query function on a replica when one is fit to serve it.
+        
+        A failure on the replica takes it out of rotation and the function is
+        run again on the primary, so callers see replica errors only as latency.
+        
+        Args:
+            query_fn (Callable): Function issuing only SELECTs through db.session. It
+                must build its queries when called: a query built beforehand is
+                bound to the primary session and would not move to the replica's
+            *args: Arguments for query_fn
+            user_id (int): User the read is for, for read-your-writes stickiness
+            
+        Returns:
+            Any: Result of query_fn
+        """
+        bind_key = self.replicas.choose(user_id)
+        if bind_key is None:
+            return query_fn(*args)
+        try:
+            with self.replicas.route(bind_key):
+                return query_fn(*args)
+        except ValueError:
+            raise
+        except Exception as e:
+            # The replica session is already closed; the primary session is untouched
+            self.replicas.report_failure(bind_key, e)
+            return query_fn(*args)
 
     # User operations
     def hash_password(self, password: str) -> str:
@@ -75,6 +111,7 @@ class DatabaseService:
             user = User(username=username, email=email, password=hashed_pw, is_active=True)
             db.session.add(user)
             db.session.commit()
+            self.replicas.mark_write()
             self.logger.info(f"Successfully created user: {username}")
             return user
         except Exception as e:
@@ -93,10 +130,11 @@ class DatabaseService:
             self.logger.error(f"Error authenticating user: {str(e)}")
             return None
 
-    def get_user_by_username(self, username: str) -> Optional[User]:
-        """Get user by username."""
+    def get_user_by_username(self, username: str, primary: bool = False) -> Optional[User]:
+        """Get user by username (from the primary when primary is set, for checks that must see every write)."""
         try:
-            return User.query.filter_by(username=username).first()
+            query = lambda: User.query.filter_by(username=username).first()
+            return query() if primary else self._read(query)
         except Exception as e:
             self.logger.error(f"Error getting user by username: {str(e)}")
             return None
@@ -104,7 +142,7 @@ class DatabaseService:
     def get_user_by_id(self, user_id: int) -> Optional[User]:
         """Get user by ID."""
         try:
-            return User.query.get(user_id)
+            return self._read(lambda: User.query.get(user_id), user_id=user_id)
         except Exception as e:
             self.logger.error(f"Error getting user by ID: {str(e)}")
             return None
@@ -112,7 +150,7 @@ class DatabaseService:
     def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email."""
         try:
-            return User.query.filter_by(email=email).first()
+            return self._read(lambda: User.query.filter_by(email=email).first())
         except Exception as e:
             self.logger.error(f"Error getting user by email: {str(e)}")
             return None
@@ -140,6 +178,7 @@ class DatabaseService:
             )
             db.session.add(conversation)
             db.session.commit()
+            self.replicas.mark_write(user_id)
             self.logger.info(f"Created conversation for user {user_id}")
             return conversation
         except Exception as e:
@@ -150,19 +189,113 @@ class DatabaseService:
     def get_conversation(self, conversation_id: int) -> Optional[Conversation]:
         """Get conversation by ID."""
         try:
-            return Conversation.query.get(conversation_id)
+            return self._read(lambda: Conversation.query.get(conversation_id))
         except Exception as e:
             self.logger.error(f"Error getting conversation: {str(e)}")
             return None
     
+    # Keyset pagination
+    @staticmethod
+    def encode_cursor(timestamp: datetime, row_id: int) -> str:
+        """Encode a (timestamp, id) position as an opaque URL-safe cursor."""
+        raw = f"{timestamp.isoformat()}|{row_id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        """
+        Decode a cursor produced by encode_cursor.
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            raw = base64.urlsafe_b64decode((cursor + '=' * (-len(cursor) % 4)).encode()).decode()
+            timestamp, row_id = raw.rsplit('|', 1)
+            return datetime.fromisoformat(timestamp), int(row_id)
+        except Exception:
+            raise ValueError(f"Invalid cursor: {cursor}")
+    
+    def _keyset_page(self, query, timestamp_column, id_column, limit: int,
+                     before: Optional[str] = None, after: Optional[str] = None) -> Tuple[list, bool]:
+        """
+        Fetch one newest-first page of a query ordered by (timestamp, id).
+        
+        Without a cursor the newest rows are returned. ``before`` pages
+        towards older rows and ``after`` towards newer ones; either way only
+        limit + 1 rows are read, so the cost does not depend on how far in
+        the list the page is.
+        
+        Returns:
+            Tuple[list, bool]: Rows, newest first, and whether more rows exist
+            beyond the page in the direction of travel
+            
+        Raises:
+            ValueError: If a cursor is malformed or both cursors are given
+        """
+        if before and after:
+            raise ValueError("Use either 'before' or 'after', not both")
+        
+        if after:
+            timestamp, row_id = self.decode_cursor(after)
+            rows = (
+                query.filter(or_(timestamp_column > timestamp,
+                                 and_(timestamp_column == timestamp, id_column > row_id)))
+                .order_by(timestamp_column.asc(), id_column.asc())
+                .limit(limit + 1)
+                .all()
+            )
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            rows.reverse()
+            return rows, has_more
+        
+        if before:
+            timestamp, row_id = self.decode_cursor(before)
+            query = query.filter(or_(timestamp_column < timestamp,
+                                     and_(timestamp_column == timestamp, id_column < row_id)))
+        rows = query.order_by(timestamp_column.desc(), id_column.desc()).limit(limit + 1).all()
+        return rows[:limit], len(rows) > limit
+    
+    def get_user_conversations_page(self, user_id: int, limit: int, before: str = None,
+                                    after: str = None) -> Tuple[List[Conversation], bool]:
+        """
+        Get one page of a user's conversations, most recently updated first.
+        
+        Args:
+            user_id (int): User ID
+            limit (int): Page size
+            before (str): Cursor of the last conversation seen, to page towards older ones
+            after (str): Cursor of the first conversation seen, to page towards newer ones
+            
+        Returns:
+            Tuple[List[Conversation], bool]: Conversations and whether more exist
+            
+        Raises:
+            ValueError: If a cursor is invalid
+        """
+        def page():
+            query = Conversation.query.filter_by(user_id=user_id)
+            return self._keyset_page(query, Conversation.updated_at, Conversation.id, limit, before, after)
+        
+        try:
+            return self._read(page, user_id=user_id)
+        except ValueError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error getting user conversations page: {str(e)}")
+            return [], False
+    
     def get_user_conversations(self, user_id: int, limit: int = None) -> List[Conversation]:
         """Get only the user's own conversations."""
         try:
-            query = Conversation.query.filter_by(user_id=user_id).order_by(Conversation.updated_at.desc())
-            if limit is not None:
-                conversations = query.limit(limit).all()
-            else:
-                conversations = query.all()
+            def fetch():
+                query = Conversation.query.filter_by(user_id=user_id).order_by(Conversation.updated_at.desc())
+                if limit is not None:
+                    query = query.limit(limit)
+                return query.all()
+            
+            conversations = self._read(fetch, user_id=user_id)
             self.logger.info(f"get_user_conversations: user_id={user_id}, count={len(conversations)}, titles={[c.title for c in conversations]}")
             return conversations
         except Exception as e:
@@ -177,6 +310,8 @@ class DatabaseService:
                 conversation.title = title
                 conversation.updated_at = datetime.utcnow()
                 db.session.commit()
+                self.replicas.mark_write()
+                self.history_cache.invalidate(conversation_id)
                 return True
             return False
         except Exception as e:
@@ -195,48 +330,491 @@ class DatabaseService:
                 sender_type=sender_type,
                 token_count=token_count
             )
-            db.session.add(message)
             
-            # Update conversation timestamp
-            conversation = Conversation.query.get(conversation_id)
-            if conversation:
-                conversation.updated_at = datetime.utcnow()
+            # Update conversation timestamp and message stats without loading the row,
+            # before the INSERT so the conversation row is locked first
+            self._bump_conversation(conversation_id, [message], datetime.utcnow())
+            db.session.add(message)
             
+            db.session.flush()
+            cached = message.to_dict()
             db.session.commit()
+            self.replicas.mark_write()
+            self.history_cache.append(conversation_id, [cached])
             return message
         except Exception as e:
             db.session.rollback()
             self.logger.error(f"Error adding message: {str(e)}")
             return None
     
-    def get_conversation_messages(self, conversation_id: int, limit: int = 50) -> List[Message]:
-        """Get messages for a conversation."""
+    def _bump_conversation(self, conversation_id: int, messages: List[Message], now: datetime):
+        """
+        Advance a conversation's updated_at and message stats with a single UPDATE.
+        
+        Must run before the new messages are inserted: the UPDATE locks the
+        conversation row (waiting for an archive batch holding it), and an
+        archived conversation then gets its messages restored first.
+        """
+        last = messages[-1]
+        db.session.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(
+                updated_at=now,
+                message_count=Conversation.message_count + len(messages),
+                last_message_at=last.timestamp or now,
+                last_message_preview=Conversation.make_preview(last.content),
+                archived_at=None
+            )
+        )
+        self.archive.restore(conversation_id)
+    
+    def save_chat_turn(self, user_id: int, conversation_id: Optional[int], user_content: str,
+                       bot_content: Optional[str], user_token_count: int = 0, bot_token_count: int = 0,
+                       user_timestamp: datetime = None, log_message: str = 'Chat interaction completed',
+                       module: str = 'chat_routes') -> Optional[Tuple[int, int, Optional[int]]]:
+        """
+        Write a whole chat turn in a single transaction.
+        
+        Creates the conversation when conversation_id is None, inserts the user
+        and bot messages, advances the conversation's updated_at and message
+        stats with one UPDATE instead of re-fetching the row, and commits once.
+        The audit log entry goes to the write-behind log sink after the
+        commit, so it never holds up the turn.
+        
+        Args:
+            user_id (int): Owner of the conversation
+            conversation_id (int): Existing conversation, or None to create one
+            user_content (str): User message
+            bot_content (str): Bot reply, or None/empty to store only the user message
+            user_token_count (int): Token count of the user message
+            bot_token_count (int): Token count of the bot reply
+            user_timestamp (datetime): When the user message was received (UTC), defaults to now
+            log_message (str): Audit log message
+            module (str): Audit log module
+            
+        Returns:
+            Optional[Tuple[int, int, Optional[int]]]: Conversation ID, user message ID
+            and bot message ID (None without a reply), or None if the turn was not saved
+        """
         try:
-            return Message.query.filter_by(
-                conversation_id=conversation_id
-            ).order_by(Message.timestamp.asc()).limit(limit).all()
+            now = datetime.utcnow()
+            
+            user_msg = Message(
+                content=user_content,
+                sender_type='user',
+                token_count=user_token_count,
+                timestamp=user_timestamp or now
+            )
+            bot_msg = None
+            if bot_content:
+                bot_msg = Message(content=bot_content, sender_type='bot', token_count=bot_token_count, timestamp=now)
+            messages = [msg for msg in (user_msg, bot_msg) if msg is not None]
+            
+            if conversation_id is None:
+                conversation = Conversation(
+                    user_id=user_id,
+                    title=f"Chat {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+                    created_at=now,
+                    updated_at=now,
+                    message_count=len(messages),
+                    last_message_at=messages[-1].timestamp,
+                    last_message_preview=Conversation.make_preview(messages[-1].content)
+                )
+                db.session.add(conversation)
+            else:
+                conversation = None
+                self._bump_conversation(conversation_id, messages, now)
+            
+            for msg in messages:
+                if conversation is not None:
+                    msg.conversation = conversation
+                else:
+                    msg.conversation_id = conversation_id
+                db.session.add(msg)
+            
+            # Read generated IDs after the flush; after commit they would be expired and re-selected
+            db.session.flush()
+            turn = (
+                conversation.id if conversation is not None else conversation_id,
+                user_msg.id,
+                bot_msg.id if bot_msg is not None else None
+            )
+            cached = [msg.to_dict() for msg in messages]
+            db.session.commit()
+            self.replicas.mark_write(user_id)
         except Exception as e:
-            self.logger.error(f"Error getting conversation messages: {str(e)}")
-            return []
+            db.session.rollback()
+            self.logger.error(f"Error saving chat turn: {str(e)}")
+            return None
+        
+        # Write-through: a new conversation is cached whole, an existing one only if already cached
+        if Config.HISTORY_CACHE_ENABLED:
+            if conversation is not None:
+                self.history_cache.fill(turn[0], cached, complete=True)
+            else:
+                self.history_cache.append(turn[0], cached)
+        
+        self.log_system_event('INFO', log_message, module, user_id)
+        return turn
+    
+    def backfill_conversation_stats(self, batch_size: int = 500) -> int:
+        """
+        Recompute the denormalized message stats of every conversation from its messages.
+        
+        Conversations are walked in ID order, batch_size at a time, with one
+        bulk UPDATE and commit per batch. Archived conversations keep their
+        stats, since their messages are not in the messages table.
+        
+        Args:
+            batch_size (int): Conversations per batch
+            
+        Returns:
+            int: Number of conversations updated
+        """
+        table = Conversation.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam('b_id'))
+            .values(
+                message_count=bindparam('b_message_count'),
+                last_message_at=bindparam('b_last_message_at'),
+                last_message_preview=bindparam('b_last_message_preview'),
+                # Keep updated_at as is instead of letting onupdate bump it
+                updated_at=table.c.updated_at
+            )
+        )
+        
+        # Migration 0002 runs this before migration 0005 adds archived_at
+        from migrations.runner import column_exists
+        skip_archived = column_exists('conversations', 'archived_at')
+        
+        updated = 0
+        last_id = 0
+        while True:
+            query = db.session.query(Conversation.id).filter(Conversation.id > last_id)
+            if skip_archived:
+                query = query.filter(Conversation.archived_at.is_(None))
+            ids = [row.id for row in query.order_by(Conversation.id).limit(batch_size)]
+            if not ids:
+                break
+            
+            counts = dict(
+                db.session.query(Message.conversation_id, func.count(Message.id))
+                .filter(Message.conversation_id.in_(ids))
+                .group_by(Message.conversation_id)
+                .all()
+            )
+            latest_ids = (
+                db.session.query(func.max(Message.id))
+                .filter(Message.conversation_id.in_(ids))
+                .group_by(Message.conversation_id)
+            )
+            latest = {
+                row.conversation_id: row
+                for row in db.session.query(Message.conversation_id, Message.timestamp, Message.content)
+                .filter(Message.id.in_(latest_ids))
+            }
+            
+            rows = []
+            for conversation_id in ids:
+                last = latest.get(conversation_id)
+                rows.append({
+                    'b_id': conversation_id,
+                    'b_message_count': counts.get(conversation_id, 0),
+                    'b_last_message_at': last.timestamp if last else None,
+                    'b_last_message_preview': Conversation.make_preview(last.content) if last else None
+                })
+            
+            try:
+                # One executemany UPDATE per batch
+                db.session.execute(statement, rows)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                self.logger.error(f"Error backfilling conversation stats: {str(e)}")
+                raise
+            
+            updated += len(ids)
+            last_id = ids[-1]
+            self.logger.info(f"Backfilled conversation stats up to conversation {last_id}")
+        
+        return updated
+    
+    def get_conversation_messages_page(self, conversation_id: int, limit: int, before: str = None,
+                                       after: str = None, archived: bool = False) -> Tuple[List[Message], bool]:
+        """
+        Get one page of a conversation's messages, newest first.
+        
+        Args:
+            conversation_id (int): Conversation ID
+            limit (int): Page size
+            before (str): Cursor of the oldest message seen, to page towards older ones
+            after (str): Cursor of the newest message seen, to page towards newer ones
+            archived (bool): Whether the conversation's ``archived_at`` is set; its
+                messages are then paged from the archive
+            
+        Returns:
+            Tuple[List[Message], bool]: Messages and whether more exist
+            
+        Raises:
+            ValueError: If a cursor is invalid
+        """
+        try:
+            return self._read(self._messages_page, conversation_id, limit, before, after, archived)
+        except ValueError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error getting conversation messages page: {str(e)}")
+            return [], False
+    
+    def _messages_page(self, conversation_id: int, limit: int, before: Optional[str],
+                       after: Optional[str], archived: bool) -> Tuple[List[Message], bool]:
+        if archived:
+            messages = self.archive.load(conversation_id)
+            # None means it was restored since the caller read the conversation
+            if messages is not None:
+                return self._keyset_page_list(messages, limit, before, after)
+        query = Message.query.filter_by(conversation_id=conversation_id)
+        return self._keyset_page(query, Message.timestamp, Message.id, limit, before, after)
+    
+    def _keyset_page_list(self, messages: List[Message], limit: int, before: Optional[str] = None,
+                          after: Optional[str] = None) -> Tuple[List[Message], bool]:
+        """_keyset_page over messages already in memory, oldest first."""
+        if before and after:
+            raise ValueError("Use either 'before' or 'after', not both")
+        
+        if after:
+            position = self.decode_cursor(after)
+            newer = [msg for msg in messages if (msg.timestamp, msg.id) > position]
+            page = newer[:limit]
+            page.reverse()
+            return page, len(newer) > limit
+        
+        if before:
+            position = self.decode_cursor(before)
+            messages = [msg for msg in messages if (msg.timestamp, msg.id) < position]
+        older = messages[::-1]
+        return older[:limit], len(older) > limit
+    
+    def get_conversation_messages(self, conversation_id: int, limit: int = 50,
+                                  archived: bool = False) -> List[Message]:
+        """Get the newest messages of a conversation, oldest first."""
+        messages, _ = self.get_conversation_messages_page(conversation_id, limit, archived=archived)
+        messages.reverse()
+        return messages
+    
+    # Export
+    @staticmethod
+    def _export_time(value: Optional[datetime]) -> Optional[str]:
+        return value.isoformat() + 'Z' if value else None
+    
+    def iter_export_records(self, user_id: int = None, conversation_id: int = None,
+                            batch_size: int = None) -> Iterator[Dict]:
+        """
+        Stream conversations with their messages as export records.
+        
+        Each conversation yields a ``conversation`` record followed by its
+        ``message`` records in chat order; timestamps are ISO-8601 UTC. Rows
+        come from one Core query over a dedicated connection fetched
+        ``batch_size`` at a time (server-side cursor where the driver has
+        one), so memory stays constant however many messages are exported;
+        an archived conversation's messages come from its single archive row.
+        The query runs on a replica when one is fit to serve it, falling back
+        to the primary if it fails before the first row.
+        
+        Args:
+            user_id (int): Only this user's conversations; all users when None
+            conversation_id (int): Only this conversation
+            batch_size (int): Rows fetched per round trip (default EXPORT_BATCH_SIZE)
+            
+        Returns:
+            Iterator[Dict]: Export records
+        """
+        conversations = Conversation.__table__
+        messages = Message.__table__
+        archives = MessageArchive.__table__
+        stmt = (
+            select(
+                conversations.c.id, conversations.c.user_id, conversations.c.title,
+                conversations.c.created_at, conversations.c.updated_at, conversations.c.is_active,
+                messages.c.id.label('message_id'), messages.c.sender_type, messages.c.content,
+                messages.c.timestamp, messages.c.token_count, archives.c.payload.label('archive')
+            )
+            .select_from(
+                conversations
+                .outerjoin(messages, messages.c.conversation_id == conversations.c.id)
+                .outerjoin(archives, archives.c.conversation_id == conversations.c.id)
+            )
+            .order_by(conversations.c.id, messages.c.timestamp, messages.c.id)
+        )
+        if user_id is not None:
+            stmt = stmt.where(conversations.c.user_id == user_id)
+        if conversation_id is not None:
+            stmt = stmt.where(conversations.c.id == conversation_id)
+        batch_size = batch_size or Config.EXPORT_BATCH_SIZE
+        
+        bind_key = self.replicas.choose(user_id)
+        emitted = 0
+        try:
+            for record in self._stream_export(db.engines[bind_key] if bind_key else db.engine, stmt, batch_size):
+                emitted += 1
+                yield record
+        except Exception as e:
+            if bind_key is None or emitted:
+                raise
+            self.replicas.report_failure(bind_key, e)
+            yield from self._stream_export(db.engine, stmt, batch_size)
+    
+    def _stream_export(self, engine, stmt, batch_size: int) -> Iterator[Dict]:
+        current = None
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(stmt)
+            for row in result:
+                if row.id != current:
+                    current = row.id
+                    yield {
+                        'type': 'conversation',
+                        'id': row.id,
+                        'user_id': row.user_id,
+                        'title': row.title,
+                        'created_at': self._export_time(row.created_at),
+                        'updated_at': self._export_time(row.updated_at),
+                        'is_active': row.is_active
+                    }
+                    if row.archive is not None:
+                        for msg in self.archive.iter_unpack(row.id, row.archive):
+                            yield self._export_message(row.id, msg.id, msg)
+                if row.message_id is not None:
+                    yield self._export_message(row.id, row.message_id, row)
+    
+    def _export_message(self, conversation_id: int, message_id: int, row) -> Dict:
+        return {
+            'type': 'message',
+            'id': message_id,
+            'conversation_id': conversation_id,
+            'sender_type': row.sender_type,
+            'content': row.content,
+            'timestamp': self._export_time(row.timestamp),
+            'token_count': row.token_count
+        }
     
     def get_conversation_history(self, conversation_id: int, limit: int = 10) -> List[Dict]:
-        """Get formatted conversation history for AI context."""
+        """Get formatted conversation history for AI context (served from the history cache when possible)."""
+        generation = None
+        if Config.HISTORY_CACHE_ENABLED:
+            cached = self.history_cache.get(conversation_id, limit)
+            if cached is not None:
+                return cached
+            # Taken before the query, so a write landing meanwhile voids the fill below
+            generation = self.history_cache.generation(conversation_id)
+        
         try:
             messages = Message.query.filter_by(
                 conversation_id=conversation_id
-            ).order_by(Message.timestamp.desc()).limit(limit).all()
+            ).order_by(Message.timestamp.desc(), Message.id.desc()).limit(limit).all()
             
             # Reverse to get chronological order
             messages.reverse()
             
-            return [msg.to_dict() for msg in messages]
+            if not messages and db.session.query(Conversation.archived_at).filter_by(
+                    id=conversation_id).scalar() is not None:
+                # Archived conversations are read from the archive without restoring them
+                messages = (self.archive.load(conversation_id) or [])[-limit:]
+            
+            history = [msg.to_dict() for msg in messages]
+            if Config.HISTORY_CACHE_ENABLED:
+                # Fewer rows than asked for means this is the whole conversation
+                self.history_cache.fill(conversation_id, history, complete=len(history) < limit,
+                                        generation=generation)
+            return history
         except Exception as e:
             self.logger.error(f"Error getting conversation history: {str(e)}")
             return []
     
+    def search_messages(self, user_id: int, query: str, limit: int, offset: int = 0) -> Tuple[List[Dict], bool]:
+        """
+        Full-text search over the messages of a user's conversations, best match first.
+        
+        Args:
+            user_id (int): User whose conversations are searched
+            query (str): Words to find
+            limit (int): Page size
+            offset (int): Results to skip
+            
+        Returns:
+            Tuple[List[Dict], bool]: Results with highlighted snippets and whether more exist
+        """
+        try:
+            return self._read(self.search.search, user_id, query, limit, offset, user_id=user_id)
+        except Exception as e:
+            self.logger.error(f"Error searching messages: {str(e)}")
+            return [], False
+    
+    def count_messages_after(self, conversation_id: int, after_message_id: int) -> int:
+        """Count messages in a conversation newer than a given message ID."""
+        try:
+            return Message.query.filter(
+                Message.conversation_id == conversation_id,
+                Message.id > after_message_id
+            ).count()
+        except Exception as e:
+            self.logger.error(f"Error counting conversation messages: {str(e)}")
+            return 0
+    
+    def get_messages_after(self, conversation_id: int, after_message_id: int, limit: int) -> List[Message]:
+        """Get the oldest messages of a conversation newer than a given message ID."""
+        try:
+            return Message.query.filter(
+                Message.conversation_id == conversation_id,
+                Message.id > after_message_id
+            ).order_by(Message.id.asc()).limit(limit).all()
+        except Exception as e:
+            self.logger.error(f"Error getting conversation messages: {str(e)}")
+            return []
+    
+    # Conversation summary operations
+    def get_conversation_summary(self, conversation_id: int) -> Optional[ConversationSummary]:
+        """Get the rolling summary of a conversation, if any."""
+        try:
+            return ConversationSummary.query.filter_by(conversation_id=conversation_id).first()
+        except Exception as e:
+            self.logger.error(f"Error getting conversation summary: {str(e)}")
+            return None
+    
+    def save_conversation_summary(self, conversation_id: int, content: str, last_message_id: int,
+                                  message_count: int, token_count: int = 0) -> Optional[ConversationSummary]:
+        """Create or replace the rolling summary of a conversation."""
+        try:
+            summary = ConversationSummary.query.filter_by(conversation_id=conversation_id).first()
+            if summary is None:
+                summary = ConversationSummary(conversation_id=conversation_id)
+                db.session.add(summary)
+            
+            summary.content = content
+            summary.last_message_id = last_message_id
+            summary.message_count = message_count
+            summary.token_count = token_count
+            summary.updated_at = datetime.utcnow()
+            
+            db.session.commit()
+            self.replicas.mark_write()
+            return summary
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"Error saving conversation summary: {str(e)}")
+            return None
+    
     # System log operations
     def log_system_event(self, level: str, message: str, module: str = None, user_id: int = None) -> bool:
-        """Log a system event."""
+        """Log a system event.
+        
+        Events are handed to the write-behind log sink when it is running and
+        written synchronously otherwise (e.g. in scripts without the app).
+        """
+        if self.log_writer.is_running():
+            return self.log_writer.enqueue(level, message, module, user_id)
+        
         try:
             log_entry = SystemLog(
                 level=level,
@@ -252,24 +830,130 @@ class DatabaseService:
             self.logger.error(f"Error logging system event: {str(e)}")
             return False
     
-    def get_system_logs(self, level: str = None, limit: int = 100) -> List[SystemLog]:
-        """Get system logs."""
-        try:
-            query = SystemLog.query
+    # Admin listings: projected columns, keyset-paginated
+    LOG_FIELDS = ('id', 'level', 'message', 'module', 'user_id', 'timestamp')
+    USER_FIELDS = ('id', 'username', 'email', 'created_at', 'is_active')
+    
+    @staticmethod
+    def _projection(model, allowed: Tuple[str, ...], fields: Optional[List[str]], required: Tuple[str, ...]) -> list:
+        """Columns of model to select: the requested fields plus the required ones, in allowed order."""
+        if fields:
+            unknown = set(fields) - set(allowed)
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return [getattr(model, name) for name in allowed if not fields or name in fields or name in required]
+    
+    @staticmethod
+    def row_to_dict(row) -> Dict:
+        """Serialize a projected row, converting UTC timestamps to UTC+3 for display."""
+        return {
+            key: (value + timedelta(hours=3)).isoformat() if isinstance(value, datetime) else value
+            for key, value in row._mapping.items()
+        }
+    
+    def get_system_logs_page(self, limit: int, before: str = None, after: str = None, level: str = None,
+                             module: str = None, user_id: int = None, since: datetime = None,
+                             until: datetime = None, fields: List[str] = None) -> Tuple[list, bool]:
+        """
+        Get one page of system logs, newest first.
+        
+        Each filter narrows the query onto one of the system_logs indexes;
+        only the requested columns are selected.
+        
+        Args:
+            limit (int): Page size
+            before (str): Cursor of the oldest log seen, to page towards older ones
+            after (str): Cursor of the newest log seen, to page towards newer ones
+            level (str): Only this level
+            module (str): Only this module
+            user_id (int): Only events of this user
+            since (datetime): Only events at or after this time (UTC)
+            until (datetime): Only events before this time (UTC)
+            fields (List[str]): Columns to return (LOG_FIELDS); id and timestamp are always included
+            
+        Returns:
+            Tuple[list, bool]: Rows and whether more exist
+            
+        Raises:
+            ValueError: If a cursor or field name is invalid
+        """
+        columns = self._projection(SystemLog, self.LOG_FIELDS, fields, ('id', 'timestamp'))
+        
+        def page():
+            query = db.session.query(*columns)
             if level:
-                query = query.filter_by(level=level)
-            return query.order_by(SystemLog.timestamp.desc()).limit(limit).all()
+                query = query.filter(SystemLog.level == level)
+            if module:
+                query = query.filter(SystemLog.module == module)
+            if user_id is not None:
+                query = query.filter(SystemLog.user_id == user_id)
+            if since is not None:
+                query = query.filter(SystemLog.timestamp >= since)
+            if until is not None:
+                query = query.filter(SystemLog.timestamp < until)
+            return self._keyset_page(query, SystemLog.timestamp, SystemLog.id, limit, before, after)
+        
+        try:
+            return self._read(page)
+        except ValueError:
+            raise
         except Exception as e:
             self.logger.error(f"Error getting system logs: {str(e)}")
-            return []
+            return [], False
     
-    # Database maintenance
-    def test_connection(self) -> bool:
-        """Test database connection."""
+    # Admin operations
+    def get_users_page(self, limit: int, before: str = None, after: str = None, username_prefix: str = None,
+                       since: datetime = None, until: datetime = None,
+                       fields: List[str] = None) -> Tuple[list, bool]:
+        """
+        Get one page of users, most recently created first.
+        
+        Args:
+            limit (int): Page size
+            before (str): Cursor of the oldest user seen, to page towards older ones
+            after (str): Cursor of the newest user seen, to page towards newer ones
+            username_prefix (str): Only usernames starting with this (a seek on the unique username index)
+            since (datetime): Only users created at or after this time (UTC)
+            until (datetime): Only users created before this time (UTC)
+            fields (List[str]): Columns to return (USER_FIELDS); id and created_at are always included
+            
+        Returns:
+            Tuple[list, bool]: Rows and whether more exist
+            
+        Raises:
+            ValueError: If a cursor or field name is invalid
+        """
+        columns = self._projection(User, self.USER_FIELDS, fields, ('id', 'created_at'))
+        
+        def page():
+            query = db.session.query(*columns)
+            if username_prefix:
+                escaped = username_prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                query = query.filter(User.username.like(escaped + '%', escape='\\'))
+            if since is not None:
+                query = query.filter(User.created_at >= since)
+            if until is not None:
+                query = query.filter(User.created_at < until)
+            return self._keyset_page(query, User.created_at, User.id, limit, before, after)
+        
         try:
-            # Use the existing _check_db_connection method which is more reliable
-            self._check_db_connection()
-            return self.db_available
+            return self._read(page)
+        except ValueError:
+            raise
         except Exception as e:
-            self.logger.error(f"Database connection test failed: {str(e)}")
-            return False
+            self.logger.error(f"Error getting users: {str(e)}")
+            return [], False
+    
+    # Database maintenance
+    def ping(self) -> bool:
+        """Run a trivial query against the database; raises if it is unreachable."""
+        from sqlalchemy import text
+        try:
+            db.session.execute(text('SELECT 1'))
+            return True
+        finally:
+            db.session.rollback()
+    
+    def test_connection(self) -> bool:
+        """Report database availability as last seen by the background monitor."""
+        return self.health.is_available()
@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import text
+
+from config import Config
+
+
+class DatabaseHealthMonitor:
+    """Process-wide database availability, kept current by a background timer.
+
+    A daemon thread runs ``SELECT 1`` every ``interval`` seconds and publishes
+    the outcome; request paths read it with :meth:`is_available` instead of
+    probing the database themselves, so an outage never costs a request the
+    connect timeout. Requests that hit a database error can ask for an early
+    re-check with :meth:`report_failure`.
+    """
+
+    def __init__(self, interval: float, min_recheck_seconds: float):
+        """
+        Initialize the monitor.
+
+        Args:
+            interval (float): Seconds between scheduled checks
+            min_recheck_seconds (float): Minimum gap between checks triggered by report_failure()
+        """
+        self.interval = interval
+        self.min_recheck_seconds = min_recheck_seconds
+
+        self._app = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+        self._available = False
+        self._checked_at = None
+        self._latency_ms = None
+        self._last_error = None
+        self._consecutive_failures = 0
+        self._last_check = 0.0
+
+        self.logger = logging.getLogger(__name__)
+
+    def start(self, app, available: Optional[bool] = None):
+        """
+        Start the background check loop, or rebind it to another app.
+
+        The loop is started once per process and checks right away; every
+        call binds the following checks to ``app``, so a later app (e.g. the
+        next test's) is checked instead of the first one.
+
+        Args:
+            app (Flask): Application whose context the checks run in
+            available (bool): Initial status, e.g. from the startup check
+        """
+        with self._lock:
+            self._app = app
+            if available is not None:
+                self._available = available
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='db-health', daemon=True)
+                self._thread.start()
+
+    def is_available(self) -> bool:
+        """Last known database availability; never touches the database."""
+        return self._available
+
+    def report_failure(self, error: Optional[Exception] = None):
+        """
+        Ask for an early re-check after a request hit a database error.
+
+        Args:
+            error (Exception): Error seen by the caller, for logging
+        """
+        if error is not None:
+            self.logger.warning(f"Database error reported by request: {str(error)}")
+        self._wakeup.set()
+
+    def get_status(self) -> Dict:
+        """
+        Get the last check result.
+
+        Returns:
+            Dict: Availability, check time, latency, consecutive failures and last error
+        """
+        with self._lock:
+            return {
+                'available': self._available,
+                'checked_at': self._checked_at.isoformat() if self._checked_at else None,
+                'latency_ms': self._latency_ms,
+                'consecutive_failures': self._consecutive_failures,
+                'last_error': self._last_error,
+                'interval_seconds': self.interval
+            }
+
+    def check(self) -> bool:
+        """
+        Run one check now and publish its result.
+
+        Returns:
+            bool: True if the database answered
+        """
+        from models import db
+
+        started = time.perf_counter()
+        error = None
+        try:
+            with self._app.app_context():
+                try:
+                    db.session.execute(text('SELECT 1'))
+                finally:
+                    db.session.rollback()
+        except Exception as e:
+            error = str(e)
+
+        with self._lock:
+            was_available = self._available
+            self._available = error is None
+            self._checked_at = datetime.utcnow()
+            self._latency_ms = round((time.perf_counter() - started) * 1000, 1)
+            self._last_error = error
+            self._consecutive_failures = 0 if error is None else self._consecutive_failures + 1
+            self._last_check = time.monotonic()
+
+        if was_available and error is not None:
+            self.logger.error(f"Database became unavailable: {error}")
+        elif not was_available and error is None:
+            self.logger.info("Database is available")
+        return error is None
+
+    def _run(self):
+        while True:
+            try:
+                self.check()
+            except Exception as e:
+                self.logger.error(f"Database health check failed: {str(e)}")
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            # Debounce bursts of report_failure() calls during an outage
+            gap = self.min_recheck_seconds - (time.monotonic() - self._last_check)
+            if gap > 0:
+                time.sleep(gap)
+
+
+_monitor = None
+_monitor_lock = threading.Lock()
+
+
+def get_db_health_monitor() -> DatabaseHealthMonitor:
+    """Return the process-wide database health monitor, creating it from Config on first use."""
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                _monitor = DatabaseHealthMonitor(
+                    interval=Config.DB_HEALTH_CHECK_INTERVAL_SECONDS,
+                    min_recheck_seconds=Config.DB_HEALTH_MIN_RECHECK_SECONDS
+                )
+    return _monitor
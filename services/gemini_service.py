@@ -1,61 +1,385 @@
-import google.generativeai as genai
 from config import Config
+from services.llm_providers import build_providers
+from services.llm_executor import get_llm_executor, LLMQueueFullError, LLMTimeoutError
+from services.response_cache import get_response_cache
+from services.semantic_cache import get_semantic_cache
+from services.token_counter import get_token_counter
+from services.single_flight import get_single_flight
+from services.circuit_breaker import get_circuit_breaker, CircuitOpenError
+from concurrent.futures import Future
 import logging
-from typing import List, Dict, Optional
+import queue
+import threading
+import time
+from typing import List, Dict, Optional, Iterator, Tuple
 
 class GeminiService:
-    """Service class for handling Gemini AI interactions."""
+    """Service class for handling AI interactions.
     
-    def __init__(self):
-        """Initialize Gemini AI service."""
-        self.api_key = Config.GEMINI_API_KEY
-        if not self.api_key:
-            raise ValueError("GEMINI_API_KEY not found in environment variables")
+    Generation goes through the provider chain configured in LLM_PROVIDERS
+    (Gemini models, an OpenAI-compatible endpoint or the offline stub), in
+    order: a provider that errors, times out or has an open circuit is
+    skipped for the next one.
+    """
+    
+    def __init__(self, providers: str = None):
+        """
+        Initialize the AI service.
+        
+        Args:
+            providers (str): Provider spec overriding Config.LLM_PROVIDERS
+        """
+        # Provider chain in failover order; raises if none can be built
+        self.providers = build_providers(providers or Config.LLM_PROVIDERS)
+        
+        # The primary provider names the cache namespace
+        self.model_name = self.providers[0].name
+        
+        # Shared bounded pool for upstream calls
+        self.executor = get_llm_executor()
+        
+        # Shared exact-match and near-duplicate response caches
+        self.response_cache = get_response_cache()
+        self.semantic_cache = get_semantic_cache()
         
-        # Configure Gemini
-        genai.configure(api_key=self.api_key)
+        # Calibrated local token counting
+        self.token_counter = get_token_counter()
         
-        # Initialize the model - using the latest Gemini 2.0 Flash model
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
+        # Coalesces identical concurrent generations into one upstream call
+        self.single_flight = get_single_flight()
+        
+        # One breaker per provider; an open one sends calls to the next provider
+        self.circuit_breakers = [
+            get_circuit_breaker(provider.name, probe=provider.probe) for provider in self.providers
+        ]
         
         # Set up logging
         self.logger = logging.getLogger(__name__)
     
-    def generate_response(self, message: str, conversation_history: List[Dict] = None) -> str:
+    def generate_response(self, message: str, conversation_history: List[Dict] = None,
+                          use_cache: bool = True, summary: str = None) -> str:
         """
-        Generate a response using Gemini AI.
+        Generate a response through the LLM provider chain.
         
         Args:
             message (str): User's message
             conversation_history (List[Dict]): Previous conversation messages
+            use_cache (bool): Whether to serve and store the response via the response cache
+            summary (str): Rolling summary of turns older than conversation_history
             
         Returns:
             str: Generated response from Gemini
         """
         try:
             # Prepare the prompt with context
-            prompt = self._prepare_prompt(message, conversation_history)
+            prompt = self._prepare_prompt(message, conversation_history, summary)
             
-            # Generate response
-            response = self.model.generate_content(prompt)
+            first_turn = self._is_first_turn(conversation_history, summary)
+            cached, cache_key = self._cache_lookup(prompt, message, first_turn, use_cache)
+            if cached is not None:
+                return cached
             
-            if response.text:
-                return response.text.strip()
-            else:
-                self.logger.warning("Empty response from Gemini AI")
-                return Config.DEFAULT_RESPONSE
-                
+            # Generate response on the bounded LLM pool, sharing identical in-flight calls
+            response = self.executor.wait(self._submit_generation(prompt))
+            self._cache_store(cache_key, message, first_turn, response, use_cache)
+            return response
+            
+        except CircuitOpenError:
+            return Config.DEFAULT_RESPONSE
+        except LLMQueueFullError as e:
+            self.logger.warning(f"Rejected generation: {str(e)}")
+            return Config.DEFAULT_RESPONSE
+        except LLMTimeoutError as e:
+            self.logger.warning(f"Generation timed out: {str(e)}")
+            return Config.DEFAULT_RESPONSE
         except Exception as e:
             self.logger.error(f"Error generating response: {str(e)}")
             return Config.DEFAULT_RESPONSE
     
-    def _prepare_prompt(self, message: str, conversation_history: List[Dict] = None) -> str:
+    def submit_response(self, message: str, conversation_history: List[Dict] = None,
+                        use_cache: bool = True, summary: str = None) -> Future:
+        """
+        Schedule a generation without blocking the caller.
+        
+        Args:
+            message (str): User's message
+            conversation_history (List[Dict]): Previous conversation messages
+            use_cache (bool): Whether to serve and store the response via the response cache
+            summary (str): Rolling summary of turns older than conversation_history
+            
+        Returns:
+            Future: Future resolving to the generated response text
+            
+        Raises:
+            LLMQueueFullError: If the LLM pool has no free slot
+            CircuitOpenError: If the upstream circuit is open
+        """
+        prompt = self._prepare_prompt(message, conversation_history, summary)
+        
+        first_turn = self._is_first_turn(conversation_history, summary)
+        cached, cache_key = self._cache_lookup(prompt, message, first_turn, use_cache)
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+            return future
+        
+        future = self._submit_generation(prompt)
+        if use_cache:
+            future.add_done_callback(
+                lambda f: self._cache_store(cache_key, message, first_turn, f.result(), use_cache)
+                if not f.cancelled() and not f.exception() else None
+            )
+        return future
+    
+    async def generate_response_async(self, message: str, conversation_history: List[Dict] = None,
+                                      use_cache: bool = True, summary: str = None) -> str:
+        """
+        Awaitable variant of generate_response for asyncio callers.
+        
+        Args:
+            message (str): User's message
+            conversation_history (List[Dict]): Previous conversation messages
+            use_cache (bool): Whether to serve and store the response via the response cache
+            summary (str): Rolling summary of turns older than conversation_history
+            
+        Returns:
+            str: Generated response from Gemini
+        """
+        try:
+            prompt = self._prepare_prompt(message, conversation_history, summary)
+            
+            first_turn = self._is_first_turn(conversation_history, summary)
+            cached, cache_key = self._cache_lookup(prompt, message, first_turn, use_cache)
+            if cached is not None:
+                return cached
+            
+            response = await self.executor.wait_async(self._submit_generation(prompt))
+            self._cache_store(cache_key, message, first_turn, response, use_cache)
+            return response
+        except CircuitOpenError:
+            return Config.DEFAULT_RESPONSE
+        except (LLMQueueFullError, LLMTimeoutError) as e:
+            self.logger.warning(f"Generation not completed: {str(e)}")
+            return Config.DEFAULT_RESPONSE
+        except Exception as e:
+            self.logger.error(f"Error generating response: {str(e)}")
+            return Config.DEFAULT_RESPONSE
+    
+    def _submit_generation(self, prompt: str) -> Future:
+        """Start a generation for a prompt, or join an identical one already in flight."""
+        if not Config.SINGLE_FLIGHT_ENABLED:
+            return self._start_generation(prompt)
+        key = self.response_cache.make_key(self.model_name, prompt)
+        return self.single_flight.submit(key, self._start_generation, prompt)
+    
+    def _start_generation(self, prompt: str) -> Future:
+        """Submit a generation to the LLM pool unless every provider's circuit is open."""
+        self._ensure_provider_available()
+        return self.executor.submit(self._generate, prompt)
+    
+    def _ensure_provider_available(self):
+        """Fail fast, before taking a pool slot, when no provider can be tried."""
+        # Half-open circuits whose trial calls are all taken would refuse the attempt too
+        if not any(breaker.can_attempt() for breaker in self.circuit_breakers):
+            raise CircuitOpenError("No LLM provider circuit accepts calls")
+    
+    def _attempts(self) -> Iterator[Tuple[int, float]]:
+        """
+        Yield (provider index, attempt timeout) for each provider that may be tried.
+        
+        Providers are tried in order within LLM_TIMEOUT_SECONDS overall; each
+        attempt gets at most LLM_FAILOVER_TIMEOUT_SECONDS so a slow primary
+        leaves time for the next provider. Every yielded attempt holds a
+        circuit permit that the caller must settle with record_success or
+        record_failure.
+        """
+        deadline = time.monotonic() + Config.LLM_TIMEOUT_SECONDS
+        for index, breaker in enumerate(self.circuit_breakers):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if not breaker.allow_request():
+                continue
+            yield index, min(Config.LLM_FAILOVER_TIMEOUT_SECONDS, remaining)
+    
+    def _record_failure(self, index: int, error: Exception):
+        """Count a failed attempt against its provider."""
+        self.circuit_breakers[index].record_failure()
+        self.logger.warning(f"LLM provider '{self.providers[index].name}' failed: {str(error)}")
+    
+    def _generate(self, prompt: str) -> str:
+        """Generate a response through the provider chain; runs on the LLM pool."""
+        last_error = None
+        for index, timeout in self._attempts():
+            started = time.monotonic()
+            try:
+                text = self.providers[index].generate(prompt, timeout)
+            except Exception as e:
+                self._record_failure(index, e)
+                last_error = e
+                continue
+            self.circuit_breakers[index].record_success(time.monotonic() - started)
+            
+            if text:
+                return text
+            
+            self.logger.warning(f"Empty response from LLM provider '{self.providers[index].name}'")
+            return Config.DEFAULT_RESPONSE
+        
+        if last_error is not None:
+            raise last_error
+        raise CircuitOpenError("No LLM provider accepted the call")
+    
+    def generate_response_stream(self, message: str, conversation_history: List[Dict] = None,
+                                 use_cache: bool = True, summary: str = None) -> Iterator[str]:
+        """
+        Stream a response from the LLM provider chain as it is generated.
+        
+        Args:
+            message (str): User's message
+            conversation_history (List[Dict]): Previous conversation messages
+            use_cache (bool): Whether to serve and store the response via the response cache
+            summary (str): Rolling summary of turns older than conversation_history
+            
+        Yields:
+            str: Successive text chunks of the generated response
+        """
+        produced = False
+        parts = []
+        chunks = queue.Queue()
+        cancelled = threading.Event()
+        
+        try:
+            prompt = self._prepare_prompt(message, conversation_history, summary)
+            
+            first_turn = self._is_first_turn(conversation_history, summary)
+            cached, cache_key = self._cache_lookup(prompt, message, first_turn, use_cache)
+            if cached is not None:
+                yield cached
+                return
+            
+            self._ensure_provider_available()
+            self.executor.submit(self._pump_stream, prompt, chunks, cancelled)
+            
+            while True:
+                kind, payload = chunks.get(timeout=Config.LLM_TIMEOUT_SECONDS)
+                if kind == 'chunk':
+                    produced = True
+                    parts.append(payload)
+                    yield payload
+                elif kind == 'error':
+                    raise payload
+                else:
+                    # Only complete streams are cached
+                    self._cache_store(cache_key, message, first_turn, ''.join(parts).strip(), use_cache)
+                    break
+                    
+        except CircuitOpenError:
+            pass
+        except LLMQueueFullError as e:
+            self.logger.warning(f"Rejected streamed generation: {str(e)}")
+        except queue.Empty:
+            self.logger.warning("Streamed generation stalled past the LLM timeout")
+        except Exception as e:
+            self.logger.error(f"Error streaming response: {str(e)}")
+        finally:
+            # Tell the producer to stop if the consumer went away early
+            cancelled.set()
+        
+        if not produced:
+            self.logger.warning("Empty streamed response from LLM providers")
+            yield Config.DEFAULT_RESPONSE
+    
+    def _pump_stream(self, prompt: str, chunks: queue.Queue, cancelled: threading.Event):
+        """Feed streamed chunks into a queue; runs on the LLM pool.
+        
+        Fails over to the next provider only while nothing has been sent;
+        once chunks are out, an error ends the stream.
+        """
+        try:
+            last_error = None
+            for index, timeout in self._attempts():
+                started = time.monotonic()
+                first_chunk_after = None
+                try:
+                    for text in self.providers[index].stream(prompt, timeout):
+                        if cancelled.is_set():
+                            break
+                        if first_chunk_after is None:
+                            first_chunk_after = time.monotonic() - started
+                        chunks.put(('chunk', text))
+                except Exception as e:
+                    self._record_failure(index, e)
+                    if first_chunk_after is not None:
+                        raise
+                    last_error = e
+                    continue
+                
+                # Streams are judged on time to first token
+                self.circuit_breakers[index].record_success(
+                    first_chunk_after if first_chunk_after is not None else time.monotonic() - started
+                )
+                return
+            
+            raise last_error or CircuitOpenError("No LLM provider accepted the call")
+        except Exception as e:
+            chunks.put(('error', e))
+        finally:
+            chunks.put(('end', None))
+    
+    @staticmethod
+    def _is_first_turn(conversation_history: Optional[List[Dict]], summary: Optional[str]) -> bool:
+        """A message is first-turn when it has neither history nor a summary behind it."""
+        return not conversation_history and not summary
+    
+    def _cache_lookup(self, prompt: str, message: str, first_turn: bool,
+                      use_cache: bool) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Look a prompt up in the exact-match cache, then the semantic cache.
+        
+        Returns:
+            Tuple[Optional[str], Optional[str]]: Cached response (or None) and the
+            exact-match cache key (None when caching is off for this call)
+        """
+        if not use_cache:
+            return None, None
+        
+        cache_key = None
+        if Config.RESPONSE_CACHE_ENABLED:
+            cache_key = self.response_cache.make_key(self.model_name, prompt)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached, cache_key
+        
+        # Only first-turn messages are answered from near-duplicates
+        if Config.SEMANTIC_CACHE_ENABLED and first_turn:
+            cached = self.semantic_cache.get(self.model_name, message)
+            if cached is not None:
+                if cache_key:
+                    self.response_cache.set(cache_key, cached)
+                return cached, cache_key
+        
+        return None, cache_key
+    
+    def _cache_store(self, cache_key: Optional[str], message: str, first_turn: bool,
+                     response: str, use_cache: bool = True):
+        """Cache a successful response; fallback responses are never cached."""
+        if not use_cache or not response or response == Config.DEFAULT_RESPONSE:
+            return
+        if cache_key:
+            self.response_cache.set(cache_key, response)
+        if Config.SEMANTIC_CACHE_ENABLED and first_turn:
+            self.semantic_cache.set(self.model_name, message, response)
+    
+    def _prepare_prompt(self, message: str, conversation_history: List[Dict] = None,
+                        summary: str = None) -> str:
         """
         Prepare the prompt with conversation context.
         
         Args:
             message (str): Current user message
             conversation_history (List[Dict]): Previous messages
+            summary (str): Rolling summary of turns older than conversation_history
             
         Returns:
             str: Formatted prompt
@@ -69,9 +393,12 @@ class GeminiService:
         # Build conversation context
         context = [system_prompt]
         
+        if summary:
+            context.append(f"Summary of the earlier conversation:\n{summary}")
+        
         if conversation_history:
-            # Add recent conversation history (limited by MAX_CONVERSATION_HISTORY)
-            recent_history = conversation_history[-Config.MAX_CONVERSATION_HISTORY:]
+            # Add the newest history that fits the token budget
+            recent_history = self._pack_history(conversation_history, Config.HISTORY_TOKEN_BUDGET)
             for msg in recent_history:
                 if msg['sender_type'] == 'user':
                     context.append(f"User: {msg['content']}")
@@ -84,20 +411,102 @@ class GeminiService:
         
         return "\n".join(context)
     
-    def check_api_status(self) -> bool:
+    def summarize_conversation(self, previous_summary: Optional[str], messages: List[Dict]) -> Optional[str]:
         """
-        Check if the Gemini API is accessible.
+        Extend a rolling conversation summary with newly folded messages.
         
+        Args:
+            previous_summary (str): Current summary, or None for the first one
+            messages (List[Dict]): Messages to fold in, oldest first
+            
         Returns:
-            bool: True if API is accessible, False otherwise
+            Optional[str]: Updated summary, or None if it could not be generated
         """
+        lines = []
+        for msg in messages:
+            speaker = 'User' if msg['sender_type'] == 'user' else 'Assistant'
+            lines.append(f"{speaker}: {msg['content']}")
+        
+        prompt = "\n".join([
+            "Update the running summary of a chat between a user and an AI assistant.",
+            "Keep facts, decisions, user preferences, names and open questions; drop small talk.",
+            f"Write plain prose of at most {Config.SUMMARY_MAX_WORDS} words.",
+            "",
+            "Current summary:",
+            previous_summary or "(none yet)",
+            "",
+            "New messages:",
+            *lines,
+            "",
+            "Updated summary:"
+        ])
+        
         try:
-            # Test with a simple prompt
-            test_response = self.model.generate_content("Hello")
-            return test_response.text is not None
+            content = self.executor.wait(self._start_generation(prompt), cancel_on_timeout=True)
         except Exception as e:
-            self.logger.error(f"API status check failed: {str(e)}")
-            return False
+            self.logger.error(f"Error summarizing conversation: {str(e)}")
+            return None
+        
+        if not content or content == Config.DEFAULT_RESPONSE:
+            return None
+        return content
+    
+    def _pack_history(self, conversation_history: List[Dict], budget: int) -> List[Dict]:
+        """
+        Select the newest history messages that fit a token budget.
+        
+        Messages are taken newest-first until the budget is spent. A message
+        that does not fit is cut down to the remaining budget when enough of
+        it is left to be useful, and packing stops there.
+        
+        Args:
+            conversation_history (List[Dict]): Previous messages, oldest first
+            budget (int): Maximum tokens of history to include
+            
+        Returns:
+            List[Dict]: Packed messages, oldest first
+        """
+        packed = []
+        remaining = budget
+        
+        for msg in reversed(conversation_history[-Config.MAX_CONVERSATION_HISTORY:]):
+            tokens = msg.get('token_count') or self.count_tokens(msg['content'])
+            if tokens <= remaining:
+                packed.append(msg)
+                remaining -= tokens
+                continue
+            
+            if remaining >= Config.HISTORY_MIN_PARTIAL_TOKENS:
+                keep_chars = max(1, len(msg['content']) * remaining // tokens)
+                packed.append({**msg, 'content': msg['content'][:keep_chars] + ' ...[truncated]'})
+            break
+        
+        packed.reverse()
+        return packed
+    
+    def check_api_status(self) -> bool:
+        """
+        Check if any LLM provider is accessible.
+        
+        Returns:
+            bool: True if a provider answered a minimal prompt, False otherwise
+        """
+        for provider in self.providers:
+            try:
+                if provider.probe():
+                    return True
+            except Exception as e:
+                self.logger.error(f"API status check failed for '{provider.name}': {str(e)}")
+        return False
+    
+    def get_provider_stats(self) -> List[Dict]:
+        """
+        Get each provider's circuit state and call totals, in failover order.
+        
+        Returns:
+            List[Dict]: One circuit breaker snapshot per provider
+        """
+        return [breaker.get_stats() for breaker in self.circuit_breakers]
     
     def count_tokens(self, text: str) -> int:
         """
@@ -110,8 +519,8 @@ class GeminiService:
             int: Estimated token count
         """
         try:
-            # Simple token estimation (roughly 4 characters per token)
-            return len(text) // 4
+            # Local approximation calibrated against Gemini usage metadata
+            return self.token_counter.count(text)
         except Exception as e:
             self.logger.error(f"Error counting tokens: {str(e)}")
             return 0
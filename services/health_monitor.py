@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: every worker probes for itself
+    fcntl = None
+
+
+class HealthMonitor:
+    """Background prober for dependency health with a cached, shared result.
+
+    One worker per host (whichever holds an exclusive lock on
+    ``status_file + '.lock'``) runs the checks on a schedule, in parallel, and
+    writes the results to ``status_file``. Every worker serves reads from its
+    in-memory copy and re-reads the shared file when it goes stale, so a
+    status poll never waits on the database or the LLM upstream.
+    """
+
+    def __init__(self, checks: Dict[str, Callable[[], bool]], interval: float, timeout: float,
+                 status_file: str):
+        """
+        Initialize the monitor.
+
+        Args:
+            checks (Dict[str, Callable]): Check name to callable returning True when healthy
+            interval (float): Seconds between probe rounds
+            timeout (float): Seconds before a single check counts as failed
+            status_file (str): Path of the per-host shared status file
+        """
+        self.checks = checks
+        self.interval = interval
+        self.timeout = timeout
+        self.status_file = status_file
+
+        self._app = None
+        self._results = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._first_result = threading.Event()
+        self._thread = None
+        self._lock_handle = None
+        self._is_leader = False
+
+        self.logger = logging.getLogger(__name__)
+
+    def start(self, app):
+        """
+        Start the background probe loop, or rebind it to another app.
+
+        The loop is started once per monitor and probes right away; every
+        call binds the following rounds to ``app``, so a later app (e.g. the
+        next test's) is probed instead of the first one.
+
+        Args:
+            app (Flask): Application whose context the checks run in
+        """
+        with self._lock:
+            self._app = app
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='health-monitor', daemon=True)
+                self._thread.start()
+
+    def get_status(self, wait_for_first: float = 0.0) -> Dict[str, Dict]:
+        """
+        Get the cached results, scheduling a refresh when they are stale.
+
+        Args:
+            wait_for_first (float): Seconds to wait if no result exists yet (cold start)
+
+        Returns:
+            Dict[str, Dict]: Per-check ``healthy``, ``checked_at``, ``latency_ms``,
+            ``age_seconds`` and ``stale`` entries
+        """
+        if not self._first_result.is_set() and wait_for_first > 0:
+            self._first_result.wait(wait_for_first)
+
+        now = time.time()
+        with self._lock:
+            results = {name: dict(result) for name, result in self._results.items()}
+
+        stale = False
+        for name in self.checks:
+            result = results.setdefault(name, {'healthy': None, 'checked_at': None, 'latency_ms': None})
+            if result['checked_at'] is None:
+                result['age_seconds'] = None
+                result['stale'] = True
+            else:
+                result['age_seconds'] = round(now - result['checked_at'], 1)
+                result['stale'] = result['age_seconds'] > 2 * self.interval
+                result['checked_at'] = datetime.utcfromtimestamp(result['checked_at']).isoformat()
+            stale = stale or result['stale']
+
+        if stale:
+            # Serve what we have; the loop revalidates without blocking this request
+            self._wakeup.set()
+        return results
+
+    def is_leader(self) -> bool:
+        """Whether this worker is the host's prober."""
+        return self._is_leader
+
+    def _run(self):
+        while True:
+            try:
+                if self._try_lead():
+                    self._probe_round()
+                else:
+                    self._load_shared()
+            except Exception as e:
+                self.logger.error(f"Health monitor round failed: {str(e)}")
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+
+    def _try_lead(self) -> bool:
+        if self._is_leader:
+            return True
+        if fcntl is None:
+            self._is_leader = True
+            return True
+        handle = open(self.status_file + '.lock', 'a')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        # The lock is held for the life of the process and released by the OS on exit
+        self._lock_handle = handle
+        self._is_leader = True
+        self.logger.info(f"Health monitor: this worker (pid {os.getpid()}) is the host prober")
+        return True
+
+    def _probe_round(self):
+        # Daemon threads, so a hung check can neither block the round nor interpreter exit
+        results = {}
+        threads = []
+        for name, check in self.checks.items():
+            thread = threading.Thread(
+                target=lambda n=name, c=check: results.__setitem__(n, self._timed_check(c)),
+                name=f'health-{name}',
+                daemon=True
+            )
+            thread.start()
+            threads.append(thread)
+
+        deadline = time.monotonic() + self.timeout
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+
+        for name in self.checks:
+            if name not in results:
+                results[name] = {'healthy': False, 'checked_at': time.time(), 'latency_ms': self.timeout * 1000}
+
+        self._store(results)
+        self._write_shared(results)
+
+    def _timed_check(self, check: Callable[[], bool]) -> Dict:
+        started = time.perf_counter()
+        try:
+            with self._app.app_context():
+                healthy = bool(check())
+        except Exception as e:
+            self.logger.warning(f"Health check failed: {str(e)}")
+            healthy = False
+        return {
+            'healthy': healthy,
+            'checked_at': time.time(),
+            'latency_ms': round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    def _store(self, results: Dict[str, Dict]):
+        with self._lock:
+            self._results.update(results)
+        self._first_result.set()
+
+    def _write_shared(self, results: Dict[str, Dict]):
+        tmp_path = f"{self.status_file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as handle:
+                json.dump(results, handle)
+            os.replace(tmp_path, self.status_file)
+        except OSError as e:
+            self.logger.warning(f"Could not write shared health status: {str(e)}")
+
+    def _load_shared(self) -> Optional[Dict]:
+        try:
+            with open(self.status_file) as handle:
+                results = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        self._store(results)
+        return results
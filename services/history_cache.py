@@ -0,0 +1,258 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+from services.cache_backend import CacheBackend, get_cache_backend
+
+
+class _HistoryEntry:
+    """Newest messages of one conversation, oldest first."""
+
+    __slots__ = ('messages', 'complete', 'stored_at')
+
+    def __init__(self, messages: List[Dict], capacity: int, complete: bool):
+        self.messages = deque(messages[-capacity:], maxlen=capacity)
+        # True when the ring holds every message of the conversation
+        self.complete = complete and len(messages) <= capacity
+        self.stored_at = time.monotonic()
+
+
+class HistoryCache:
+    """Per-process cache of recent conversation history.
+
+    Conversations are kept in an LRU of at most ``max_conversations``
+    entries, each a ring of the newest ``messages_per_conversation``
+    messages. Reads fill it from the database on a miss (read-through) and
+    the write path appends new messages to entries already cached
+    (write-through), so a conversation that keeps chatting on one worker is
+    served without history queries. Appended messages are broadcast through
+    the cache backend and other workers append them to their copy too, while
+    invalidations make them drop it; ``ttl_seconds`` bounds staleness when a
+    broadcast is lost.
+
+    Every write bumps the conversation's generation. A reader takes
+    :meth:`generation` before querying the database and passes it to
+    :meth:`fill`, which drops the result if a write landed in between, so a
+    slow read never overwrites the messages a write just appended.
+    Generations are kept in ``generation_slots`` counters shared by
+    conversation id modulo; a collision only costs a skipped fill.
+    """
+
+    namespace = 'history'
+    generation_slots = 4096
+
+    def __init__(self, max_conversations: int, messages_per_conversation: int, ttl_seconds: float,
+                 backend: Optional[CacheBackend] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_conversations (int): Maximum number of cached conversations
+            messages_per_conversation (int): Newest messages kept per conversation
+            ttl_seconds (float): Seconds an entry stays valid after it was loaded
+            backend (CacheBackend): Transport for invalidations between workers, None for a single worker
+        """
+        self.max_conversations = max_conversations
+        self.messages_per_conversation = messages_per_conversation
+        self.ttl_seconds = ttl_seconds
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._remote_invalidations = 0
+        self._remote_appends = 0
+        self._stale_fills = 0
+        self._generations = [0] * self.generation_slots
+        self._epoch = 0
+
+        self.backend = backend
+        if backend is not None:
+            backend.subscribe(self.namespace, self._on_remote_write)
+
+        self.logger = logging.getLogger(__name__)
+
+    def get(self, conversation_id: int, limit: int) -> Optional[List[Dict]]:
+        """
+        Get the newest messages of a conversation if the cache can answer.
+
+        Args:
+            conversation_id (int): Conversation ID
+            limit (int): Number of newest messages wanted
+
+        Returns:
+            Optional[List[Dict]]: Up to limit messages, oldest first, or None on a miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(conversation_id)
+            if entry is not None and now - entry.stored_at > self.ttl_seconds:
+                del self._entries[conversation_id]
+                entry = None
+            # A ring shorter than the request only answers if it is the whole conversation
+            if entry is None or (len(entry.messages) < limit and not entry.complete):
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(conversation_id)
+            self._hits += 1
+            messages = list(entry.messages)
+        return [dict(msg) for msg in messages[-limit:]] if limit > 0 else []
+
+    def generation(self, conversation_id: int) -> Tuple[int, int]:
+        """
+        Get the conversation's current generation, to pass to fill().
+
+        Args:
+            conversation_id (int): Conversation ID
+
+        Returns:
+            Tuple[int, int]: Opaque token that changes with every write to the conversation
+        """
+        with self._lock:
+            return self._epoch, self._generations[conversation_id % self.generation_slots]
+
+    def _bump(self, conversation_id: int):
+        """Record a write to a conversation; the caller holds the lock."""
+        self._generations[conversation_id % self.generation_slots] += 1
+
+    def fill(self, conversation_id: int, messages: List[Dict], complete: bool,
+             generation: Optional[Tuple[int, int]] = None):
+        """
+        Store a conversation's newest messages as loaded from the database.
+
+        Args:
+            conversation_id (int): Conversation ID
+            messages (List[Dict]): Newest messages, oldest first
+            complete (bool): Whether messages are the whole conversation
+            generation (Tuple[int, int]): generation() taken before the messages were
+                read; the fill is dropped if the conversation was written to since.
+                None stores unconditionally, for callers holding the newest state
+        """
+        if self.max_conversations <= 0:
+            return
+        entry = _HistoryEntry(messages, self.messages_per_conversation, complete)
+        with self._lock:
+            if generation is not None and generation != (
+                    self._epoch, self._generations[conversation_id % self.generation_slots]):
+                self._stale_fills += 1
+                return
+            self._entries[conversation_id] = entry
+            self._entries.move_to_end(conversation_id)
+            while len(self._entries) > self.max_conversations:
+                self._entries.popitem(last=False)
+
+    def append(self, conversation_id: int, messages: List[Dict]):
+        """
+        Write newly stored messages through to a cached conversation, in every worker.
+
+        Conversations that are not cached are left alone; the next read loads them.
+
+        Args:
+            conversation_id (int): Conversation ID
+            messages (List[Dict]): New messages, oldest first
+        """
+        with self._lock:
+            self._extend(conversation_id, messages)
+        if self.backend is not None:
+            self.backend.publish(self.namespace, str(conversation_id), messages)
+
+    def _extend(self, conversation_id: int, messages: List[Dict]):
+        """Append messages to a cached conversation; the caller holds the lock."""
+        self._bump(conversation_id)
+        entry = self._entries.get(conversation_id)
+        if entry is None or not messages:
+            return
+        last_id = entry.messages[-1].get('id', 0) if entry.messages else 0
+        if messages[0].get('id', 0) <= last_id:
+            # A fill that read after the write's commit may already hold these
+            # messages; anything else means writes arrived out of order and the
+            # next read reloads the conversation
+            cached_ids = {msg.get('id') for msg in entry.messages}
+            if not all(msg.get('id') in cached_ids for msg in messages):
+                self._entries.pop(conversation_id)
+            return
+        entry.messages.extend(messages)
+        if len(entry.messages) == entry.messages.maxlen:
+            entry.complete = False
+
+    def invalidate(self, conversation_id: int):
+        """Drop a conversation from the cache in every worker."""
+        with self._lock:
+            self._bump(conversation_id)
+            if self._entries.pop(conversation_id, None) is not None:
+                self._invalidations += 1
+        self._broadcast(conversation_id)
+
+    def clear(self):
+        """Drop every cached conversation in every worker."""
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+        self._broadcast(None)
+
+    def _broadcast(self, conversation_id: Optional[int]):
+        if self.backend is not None:
+            self.backend.invalidate(self.namespace, None if conversation_id is None else str(conversation_id))
+
+    def _on_remote_write(self, key: Optional[str], messages: Optional[List[Dict]]):
+        """Apply a write made by another worker."""
+        with self._lock:
+            if messages is not None:
+                self._remote_appends += 1
+                self._extend(int(key), messages)
+                return
+            self._remote_invalidations += 1
+            if key is None:
+                self._epoch += 1
+                self._entries.clear()
+            else:
+                self._bump(int(key))
+                self._entries.pop(int(key), None)
+
+    def get_stats(self) -> Dict:
+        """
+        Get a snapshot of cache counters.
+
+        Returns:
+            Dict: Size, capacity, hits, misses, hit rate, local/remote invalidations,
+            appends received from other workers and fills dropped as stale
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'conversations': len(self._entries),
+                'max_conversations': self.max_conversations,
+                'messages_per_conversation': self.messages_per_conversation,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'invalidations': self._invalidations,
+                'remote_invalidations': self._remote_invalidations,
+                'remote_appends': self._remote_appends,
+                'stale_fills': self._stale_fills
+            }
+
+
+_history_cache = None
+_history_cache_lock = threading.Lock()
+
+
+def get_history_cache() -> HistoryCache:
+    """Return the process-wide history cache, creating it from Config on first use."""
+    global _history_cache
+    if _history_cache is None:
+        with _history_cache_lock:
+            if _history_cache is None:
+                _history_cache = HistoryCache(
+                    max_conversations=Config.HISTORY_CACHE_MAX_CONVERSATIONS,
+                    messages_per_conversation=max(Config.HISTORY_CACHE_MESSAGES, Config.MAX_CONVERSATION_HISTORY),
+                    ttl_seconds=Config.HISTORY_CACHE_TTL_SECONDS,
+                    backend=get_cache_backend()
+                )
+    return _history_cache
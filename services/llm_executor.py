@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Optional
+
+from config import Config
+
+
+class LLMQueueFullError(RuntimeError):
+    """Raised when the LLM executor has no free slot for another call."""
+
+
+class LLMTimeoutError(TimeoutError):
+    """Raised when an LLM call does not finish within its timeout."""
+
+
+class LLMExecutor:
+    """Bounded thread pool for upstream LLM calls.
+
+    At most ``max_concurrency`` calls run at once and at most ``queue_depth``
+    more wait for a worker; anything beyond that is rejected immediately with
+    :class:`LLMQueueFullError` instead of piling up behind a slow upstream.
+    """
+
+    def __init__(self, max_concurrency: int, queue_depth: int, timeout: float):
+        """
+        Initialize the executor.
+
+        Args:
+            max_concurrency (int): Number of calls allowed to run concurrently
+            queue_depth (int): Number of calls allowed to wait for a worker
+            timeout (float): Default per-call timeout in seconds
+        """
+        self.max_concurrency = max_concurrency
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='llm')
+        self._slots = threading.BoundedSemaphore(max_concurrency + queue_depth)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+        self.logger = logging.getLogger(__name__)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Schedule a call on the pool without waiting for it.
+
+        Args:
+            fn (Callable): Function to run
+
+        Returns:
+            Future: Future resolving to the function's return value
+
+        Raises:
+            LLMQueueFullError: If all running and queued slots are taken
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise LLMQueueFullError(
+                f"LLM executor is full ({self.max_concurrency} running, {self.queue_depth} queued)"
+            )
+
+        try:
+            future = self._pool.submit(fn, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_flight += 1
+            self._submitted += 1
+        future.add_done_callback(self._release_slot)
+        return future
+
+    def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs):
+        """
+        Run a call on the pool and wait for its result.
+
+        Args:
+            fn (Callable): Function to run
+            timeout (float): Seconds to wait, defaults to the executor timeout
+
+        Returns:
+            The function's return value
+
+        Raises:
+            LLMQueueFullError: If the executor is full
+            LLMTimeoutError: If the call does not finish in time
+        """
+        future = self.submit(fn, *args, **kwargs)
+        return self.wait(future, timeout=timeout, cancel_on_timeout=True)
+
+    def wait(self, future: Future, timeout: Optional[float] = None, cancel_on_timeout: bool = False):
+        """
+        Wait for a Future returned by :meth:`submit`.
+
+        Args:
+            future (Future): Future to wait for
+            timeout (float): Seconds to wait, defaults to the executor timeout
+            cancel_on_timeout (bool): Drop the call if it is still queued at the
+                timeout; leave False for Futures other callers also wait on
+
+        Returns:
+            The call's return value
+
+        Raises:
+            LLMTimeoutError: If the call does not finish in time
+        """
+        wait = self.timeout if timeout is None else timeout
+        try:
+            return future.result(timeout=wait)
+        except FutureTimeoutError:
+            if cancel_on_timeout:
+                # A queued call is dropped; a running one frees its slot when the SDK returns
+                future.cancel()
+            with self._lock:
+                self._timed_out += 1
+            raise LLMTimeoutError(f"LLM call did not finish within {wait}s")
+
+    async def run_async(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs):
+        """
+        Awaitable variant of :meth:`run` for asyncio callers.
+
+        Args:
+            fn (Callable): Function to run
+            timeout (float): Seconds to wait, defaults to the executor timeout
+
+        Returns:
+            The function's return value
+        """
+        return await self.wait_async(self.submit(fn, *args, **kwargs), timeout=timeout)
+
+    async def wait_async(self, future: Future, timeout: Optional[float] = None):
+        """
+        Awaitable variant of :meth:`wait`; never cancels the underlying call.
+
+        Args:
+            future (Future): Future to wait for
+            timeout (float): Seconds to wait, defaults to the executor timeout
+
+        Returns:
+            The call's return value
+        """
+        wait = self.timeout if timeout is None else timeout
+        try:
+            # shield() keeps a timeout here from cancelling a Future others share
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=wait)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._timed_out += 1
+            raise LLMTimeoutError(f"LLM call did not finish within {wait}s")
+
+    def _release_slot(self, future: Future):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def get_stats(self) -> Dict:
+        """
+        Get a snapshot of executor counters.
+
+        Returns:
+            Dict: Capacity settings and in-flight/submitted/rejected/timed-out counts
+        """
+        with self._lock:
+            return {
+                'max_concurrency': self.max_concurrency,
+                'queue_depth': self.queue_depth,
+                'timeout_seconds': self.timeout,
+                'in_flight': self._in_flight,
+                'submitted': self._submitted,
+                'rejected': self._rejected,
+                'timed_out': self._timed_out
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting calls and release the pool threads."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_llm_executor() -> LLMExecutor:
+    """Return the process-wide LLM executor, creating it from Config on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = LLMExecutor(
+                    max_concurrency=Config.LLM_MAX_CONCURRENCY,
+                    queue_depth=Config.LLM_QUEUE_DEPTH,
+                    timeout=Config.LLM_TIMEOUT_SECONDS
+                )
+    return _executor
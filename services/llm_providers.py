@@ -0,0 +1,264 @@
+import hashlib
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Iterator, List, Optional
+
+import requests
+
+from config import Config
+from services.token_counter import get_token_counter
+
+
+class LLMProvider(ABC):
+    """Base class for an LLM backend.
+
+    A provider turns a fully prepared prompt into text, either in one piece
+    or as a stream of chunks. Providers raise on transport and upstream
+    errors so the caller can fail over to the next one; an empty string
+    means the upstream answered without text (e.g. a safety block).
+    """
+
+    kind = 'base'
+
+    def __init__(self, model: str):
+        """
+        Initialize the provider.
+
+        Args:
+            model (str): Model name at the backend
+        """
+        self.model = model
+        self.name = f"{self.kind}:{model}"
+        self.logger = logging.getLogger(__name__)
+
+    @abstractmethod
+    def generate(self, prompt: str, timeout: float, max_output_tokens: Optional[int] = None) -> str:
+        """
+        Generate a complete response.
+
+        Args:
+            prompt (str): Prepared prompt
+            timeout (float): Seconds the request may take
+            max_output_tokens (int): Optional cap on generated tokens
+
+        Returns:
+            str: Generated text, '' if the upstream returned none
+        """
+
+    def stream(self, prompt: str, timeout: float) -> Iterator[str]:
+        """
+        Generate a response as successive text chunks.
+
+        Args:
+            prompt (str): Prepared prompt
+            timeout (float): Seconds the request may take
+
+        Yields:
+            str: Text chunks
+        """
+        text = self.generate(prompt, timeout)
+        if text:
+            yield text
+
+    def probe(self) -> bool:
+        """Minimal upstream call used for health checks and circuit recovery."""
+        self.generate("ping", timeout=Config.CIRCUIT_BREAKER_SLOW_CALL_SECONDS, max_output_tokens=1)
+        return True
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini model via google-generativeai."""
+
+    kind = 'gemini'
+
+    def __init__(self, model: str):
+        super().__init__(model)
+
+        if not Config.GEMINI_API_KEY:
+            raise ValueError("GEMINI_API_KEY not found in environment variables")
+
+        import google.generativeai as genai
+        genai.configure(api_key=Config.GEMINI_API_KEY)
+        self.client = genai.GenerativeModel(model)
+
+        # Gemini usage metadata calibrates the local token counter
+        self.token_counter = get_token_counter()
+
+    def generate(self, prompt: str, timeout: float, max_output_tokens: Optional[int] = None) -> str:
+        generation_config = {'max_output_tokens': max_output_tokens} if max_output_tokens else None
+        response = self.client.generate_content(
+            prompt,
+            generation_config=generation_config,
+            request_options={'timeout': timeout}
+        )
+        self._observe_usage(prompt, response)
+
+        try:
+            return (response.text or '').strip()
+        except ValueError:
+            # No text parts, e.g. the candidate was blocked
+            return ''
+
+    def stream(self, prompt: str, timeout: float) -> Iterator[str]:
+        response = self.client.generate_content(
+            prompt,
+            stream=True,
+            request_options={'timeout': timeout}
+        )
+        last_chunk = None
+        for chunk in response:
+            last_chunk = chunk
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. safety or finish metadata)
+                continue
+            if text:
+                yield text
+
+        # The final chunk carries usage metadata for the whole stream
+        if last_chunk is not None:
+            self._observe_usage(prompt, last_chunk)
+
+    def _observe_usage(self, prompt: str, response):
+        usage = getattr(response, 'usage_metadata', None)
+        prompt_tokens = getattr(usage, 'prompt_token_count', None) if usage else None
+        if prompt_tokens:
+            self.token_counter.observe(prompt, prompt_tokens)
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """Any server speaking the OpenAI chat completions API (vLLM, Ollama, llama.cpp, ...)."""
+
+    kind = 'openai'
+
+    def __init__(self, model: str):
+        super().__init__(model)
+        self.base_url = Config.OPENAI_COMPAT_BASE_URL.rstrip('/')
+        self.session = requests.Session()
+        if Config.OPENAI_COMPAT_API_KEY:
+            self.session.headers['Authorization'] = f"Bearer {Config.OPENAI_COMPAT_API_KEY}"
+
+    def _payload(self, prompt: str, stream: bool, max_output_tokens: Optional[int] = None) -> dict:
+        payload = {
+            'model': self.model,
+            'messages': [{'role': 'user', 'content': prompt}],
+            'stream': stream
+        }
+        if max_output_tokens:
+            payload['max_tokens'] = max_output_tokens
+        return payload
+
+    def generate(self, prompt: str, timeout: float, max_output_tokens: Optional[int] = None) -> str:
+        response = self.session.post(
+            f"{self.base_url}/chat/completions",
+            json=self._payload(prompt, False, max_output_tokens),
+            timeout=timeout
+        )
+        response.raise_for_status()
+        choices = response.json().get('choices') or [{}]
+        return (choices[0].get('message', {}).get('content') or '').strip()
+
+    def stream(self, prompt: str, timeout: float) -> Iterator[str]:
+        with self.session.post(
+            f"{self.base_url}/chat/completions",
+            json=self._payload(prompt, True),
+            timeout=timeout,
+            stream=True
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                # Server-sent events: "data: {...}" lines, terminated by "data: [DONE]"
+                if not line or not line.startswith('data:'):
+                    continue
+                data = line[len('data:'):].strip()
+                if data == '[DONE]':
+                    break
+                choices = json.loads(data).get('choices') or [{}]
+                text = choices[0].get('delta', {}).get('content')
+                if text:
+                    yield text
+
+
+class StubProvider(LLMProvider):
+    """Deterministic offline provider for load tests and CI.
+
+    Answers without network or quota: the same prompt always gets the same
+    reply, after an optional fixed latency (``LLM_STUB_LATENCY_MS``).
+    """
+
+    kind = 'stub'
+
+    def __init__(self, model: str = 'offline'):
+        super().__init__(model)
+        self.latency = Config.LLM_STUB_LATENCY_MS / 1000.0
+
+    def _reply(self, prompt: str) -> str:
+        # The current message is the last "User:" line of the prepared prompt
+        message = prompt
+        for line in reversed(prompt.splitlines()):
+            if line.startswith('User: '):
+                message = line[len('User: '):]
+                break
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+        return f"[offline {digest}] You said: {message.strip()}"
+
+    def generate(self, prompt: str, timeout: float, max_output_tokens: Optional[int] = None) -> str:
+        if self.latency:
+            time.sleep(min(self.latency, timeout))
+        return self._reply(prompt)
+
+    def stream(self, prompt: str, timeout: float) -> Iterator[str]:
+        if self.latency:
+            time.sleep(min(self.latency, timeout))
+        words = self._reply(prompt).split(' ')
+        for index, word in enumerate(words):
+            yield word if index == len(words) - 1 else word + ' '
+
+
+PROVIDER_TYPES = {
+    GeminiProvider.kind: GeminiProvider,
+    OpenAICompatibleProvider.kind: OpenAICompatibleProvider,
+    StubProvider.kind: StubProvider
+}
+
+
+def build_providers(spec: str) -> List[LLMProvider]:
+    """
+    Build the provider chain from a comma-separated spec.
+
+    Each entry is ``<kind>:<model>`` (``gemini:gemini-2.0-flash``,
+    ``openai:llama3.1``) or a bare ``stub``; the order is the failover order.
+    Entries that cannot be built (unknown kind, missing credentials) are
+    logged and skipped.
+
+    Args:
+        spec (str): Provider spec, e.g. Config.LLM_PROVIDERS
+
+    Returns:
+        List[LLMProvider]: Providers in failover order
+
+    Raises:
+        ValueError: If no provider could be built
+    """
+    logger = logging.getLogger(__name__)
+    providers = []
+
+    for entry in (part.strip() for part in spec.split(',')):
+        if not entry:
+            continue
+        kind, _, model = entry.partition(':')
+        provider_type = PROVIDER_TYPES.get(kind)
+        if provider_type is None:
+            logger.error(f"Unknown LLM provider '{kind}' in '{entry}'")
+            continue
+        try:
+            providers.append(provider_type(model) if model else provider_type())
+        except Exception as e:
+            logger.error(f"Could not initialize LLM provider '{entry}': {str(e)}")
+
+    if not providers:
+        raise ValueError(f"No usable LLM provider in LLM_PROVIDERS='{spec}'")
+    return providers
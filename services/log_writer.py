@@ -0,0 +1,305 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from config import Config
+
+
+class SystemLogWriter:
+    """Write-behind sink for ``system_logs`` rows.
+
+    Events are put on a bounded in-memory queue and a background thread
+    bulk-inserts them, one transaction per batch, when ``batch_size`` events
+    are waiting or ``flush_seconds`` have passed. When the queue is full,
+    callers wait at most ``enqueue_timeout`` seconds and the event is then
+    dropped and counted, so request latency never depends on the log table.
+    A failed batch is retried on the next cycles before it is dropped, and
+    whatever is queued at interpreter exit is flushed.
+    """
+
+    def __init__(self, queue_size: int, batch_size: int, flush_seconds: float,
+                 enqueue_timeout: float, max_retries: int):
+        """
+        Initialize the writer.
+
+        Args:
+            queue_size (int): Maximum events waiting to be written
+            batch_size (int): Events written per insert batch
+            flush_seconds (float): Maximum time an event waits before its batch is written
+            enqueue_timeout (float): Seconds a caller waits for room when the queue is full
+            max_retries (int): Attempts for a failed batch before it is dropped
+        """
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.enqueue_timeout = enqueue_timeout
+        self.max_retries = max_retries
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._app = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._write_lock = threading.Lock()
+
+        self._enqueued = 0
+        self._written = 0
+        self._dropped = 0
+        self._failed_batches = 0
+        self._batches = 0
+
+        self.logger = logging.getLogger(__name__)
+
+    def start(self, app):
+        """
+        Start the background flusher, or rebind it to another app.
+
+        The flusher is started once per process; each call makes the inserts
+        run in ``app``, so events of a later app (e.g. the next test's) do not
+        go to the first one.
+
+        Args:
+            app (Flask): Application whose context the inserts run in
+        """
+        with self._lock:
+            self._app = app
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='system-log-writer', daemon=True)
+            self._thread.start()
+            atexit.register(self.shutdown)
+
+    def is_running(self) -> bool:
+        """Whether events are being accepted for background writing."""
+        return self._thread is not None and not self._stopping.is_set()
+
+    def enqueue(self, level: str, message: str, module: str = None, user_id: int = None) -> bool:
+        """
+        Queue an event for the next batch.
+
+        Args:
+            level (str): Log level, e.g. 'INFO'
+            message (str): Log message
+            module (str): Originating module
+            user_id (int): Related user
+
+        Returns:
+            bool: True if queued, False if dropped because the queue stayed full
+        """
+        event = {
+            'level': level,
+            'message': message,
+            'module': module,
+            'user_id': user_id,
+            'timestamp': datetime.utcnow()
+        }
+        try:
+            if self.enqueue_timeout > 0:
+                self._queue.put(event, timeout=self.enqueue_timeout)
+            else:
+                self._queue.put_nowait(event)
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+                dropped = self._dropped
+            # Power-of-two sampling keeps a sustained overflow from flooding the log
+            if dropped & (dropped - 1) == 0:
+                self.logger.warning(f"System log queue full; {dropped} events dropped so far")
+            return False
+
+        with self._lock:
+            self._enqueued += 1
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> int:
+        """
+        Write everything queued right now, synchronously.
+
+        While the flusher thread runs, a marker is queued and the call waits
+        until the thread has written everything before it, including the batch
+        it was still collecting. Otherwise the queue is drained on the caller.
+
+        Args:
+            timeout (float): Stop after this many seconds, None for no limit
+
+        Returns:
+            int: Number of events written
+        """
+        if self.is_running():
+            with self._lock:
+                written = self._written
+            flushed = threading.Event()
+            try:
+                self._queue.put(flushed, timeout=timeout)
+            except queue.Full:
+                return 0
+            flushed.wait(timeout)
+            with self._lock:
+                return self._written - written
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        written = 0
+        while deadline is None or time.monotonic() < deadline:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                break
+            if self._write(batch):
+                written += len(batch)
+            else:
+                self._drop_batch(batch)
+                break
+        return written
+
+    def shutdown(self, timeout: float = 5.0):
+        """Stop the flusher and write what is still queued."""
+        if self._stopping.is_set():
+            return
+        self._stopping.set()
+        if self._thread is not None:
+            # Wake the flusher instead of waiting out its collection interval
+            try:
+                self._queue.put_nowait(threading.Event())
+            except queue.Full:
+                pass
+            self._thread.join(timeout)
+        self.flush(timeout)
+
+    def _run(self):
+        pending = []
+        flushed = None
+        attempts = 0
+        while not self._stopping.is_set():
+            if not pending:
+                pending, flushed = self._collect()
+                attempts = 0
+
+            if pending and not self._write(pending):
+                attempts += 1
+                if attempts < self.max_retries:
+                    self._stopping.wait(self.flush_seconds)
+                    continue
+                self._drop_batch(pending)
+
+            pending = []
+            if flushed is not None:
+                flushed.set()
+                flushed = None
+
+        if pending and not self._write(pending):
+            self._drop_batch(pending)
+        if flushed is not None:
+            flushed.set()
+
+    def _collect(self) -> Tuple[List[Dict], Optional[threading.Event]]:
+        """
+        Wait for the first event, then gather a batch until it is full, the
+        flush interval ends or a flush() marker arrives.
+
+        Returns:
+            Tuple[List[Dict], Optional[threading.Event]]: The batch and the marker that cut it short
+        """
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            remaining = self.flush_seconds if deadline is None else deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                event = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if isinstance(event, threading.Event):
+                return batch, event
+            batch.append(event)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_seconds
+        return batch, None
+
+    def _drain(self, limit: int) -> List[Dict]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            # A flush() that raced with shutdown: its events are being written here
+            if isinstance(event, threading.Event):
+                event.set()
+            else:
+                batch.append(event)
+        return batch
+
+    def _write(self, batch: List[Dict]) -> bool:
+        from models import SystemLog, db
+
+        # The flusher thread and a shutdown flush must not interleave batches
+        with self._write_lock:
+            try:
+                with self._app.app_context():
+                    try:
+                        db.session.execute(insert(SystemLog), batch)
+                        db.session.commit()
+                    except Exception:
+                        db.session.rollback()
+                        raise
+            except Exception as e:
+                with self._lock:
+                    self._failed_batches += 1
+                self.logger.error(f"Error writing {len(batch)} system log events: {str(e)}")
+                return False
+
+        with self._lock:
+            self._written += len(batch)
+            self._batches += 1
+        return True
+
+    def _drop_batch(self, batch: List[Dict]):
+        with self._lock:
+            self._dropped += len(batch)
+        self.logger.error(f"Dropped {len(batch)} system log events after failed writes")
+
+    def get_stats(self) -> Dict:
+        """
+        Get a snapshot of writer counters.
+
+        Returns:
+            Dict: Queue depth and capacity, enqueued/written/dropped events, batches and failed batches
+        """
+        with self._lock:
+            return {
+                'running': self.is_running(),
+                'queued': self._queue.qsize(),
+                'queue_size': self._queue.maxsize,
+                'batch_size': self.batch_size,
+                'flush_seconds': self.flush_seconds,
+                'enqueued': self._enqueued,
+                'written': self._written,
+                'dropped': self._dropped,
+                'batches': self._batches,
+                'failed_batches': self._failed_batches
+            }
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_log_writer() -> SystemLogWriter:
+    """Return the process-wide system log writer, creating it from Config on first use."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = SystemLogWriter(
+                    queue_size=Config.SYSTEM_LOG_QUEUE_SIZE,
+                    batch_size=Config.SYSTEM_LOG_BATCH_SIZE,
+                    flush_seconds=Config.SYSTEM_LOG_FLUSH_SECONDS,
+                    enqueue_timeout=Config.SYSTEM_LOG_ENQUEUE_TIMEOUT_SECONDS,
+                    max_retries=Config.SYSTEM_LOG_MAX_RETRIES
+                )
+    return _writer
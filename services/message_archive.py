@@ -0,0 +1,365 @@
+import gzip
+import io
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import delete, func, insert, select, update
+
+from config import Config
+
+
+class MessageArchiver:
+    """Moves the messages of idle conversations to cold storage and back.
+
+    A conversation whose ``updated_at`` is older than ``idle_days`` has its
+    messages packed into one gzipped row of ``message_archives`` and removed
+    from ``messages``, so the hot table and its indexes only hold live
+    conversations. Archiving runs in batches of ``batch_size`` conversations,
+    one transaction each.
+
+    Reads hydrate archived messages transparently (see :meth:`load`); a write
+    to an archived conversation first moves its messages back with their
+    original ids (see :meth:`restore`).
+    """
+
+    def __init__(self, idle_days: int, batch_size: int):
+        """
+        Initialize the archiver.
+
+        Args:
+            idle_days (int): Days without activity before a conversation is archived
+            batch_size (int): Conversations archived per transaction
+        """
+        self.idle_days = idle_days
+        self.batch_size = batch_size
+
+        self._lock = threading.Lock()
+        self._archived_conversations = 0
+        self._archived_messages = 0
+        self._restored_conversations = 0
+        self._hydrations = 0
+        self._last_run = None
+
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def pack(rows: List) -> bytes:
+        """Encode message rows (id, sender_type, content, timestamp, token_count) as an archive payload."""
+        data = [
+            [row.id, row.sender_type, row.content, row.timestamp.isoformat() if row.timestamp else None,
+             row.token_count]
+            for row in rows
+        ]
+        return gzip.compress(json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+    @staticmethod
+    def unpack(conversation_id: int, payload: bytes) -> List:
+        """
+        Decode an archive payload.
+
+        Args:
+            conversation_id (int): Conversation the payload belongs to
+            payload (bytes): Payload produced by pack()
+
+        Returns:
+            List[Message]: Transient messages, oldest first
+        """
+        return list(MessageArchiver.iter_unpack(conversation_id, payload))
+
+    @staticmethod
+    def iter_unpack(conversation_id: int, payload: bytes, chunk_size: int = 64 * 1024) -> Iterator:
+        """
+        Decode an archive payload incrementally.
+
+        The payload is decompressed and parsed ``chunk_size`` characters at a
+        time and each message is yielded as soon as it is decoded, so exporting
+        a large archived conversation never holds it decoded in memory.
+
+        Args:
+            conversation_id (int): Conversation the payload belongs to
+            payload (bytes): Payload produced by pack()
+            chunk_size (int): Characters decompressed per read
+
+        Yields:
+            Message: Transient messages, oldest first
+
+        Raises:
+            ValueError: If the payload is not a complete JSON array
+        """
+        from models import Message
+
+        decoder = json.JSONDecoder()
+        with io.TextIOWrapper(gzip.GzipFile(fileobj=io.BytesIO(payload)), encoding='utf-8') as stream:
+            buffer = stream.read(chunk_size).lstrip()
+            if not buffer.startswith('['):
+                raise ValueError('Archive payload is not a JSON array')
+            pos = 1
+            while True:
+                while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ','):
+                    pos += 1
+                if pos < len(buffer):
+                    if buffer[pos] == ']':
+                        return
+                    try:
+                        item, pos = decoder.raw_decode(buffer, pos)
+                    except json.JSONDecodeError:
+                        # The item continues in the next chunk
+                        item = None
+                    if item is not None:
+                        message_id, sender_type, content, timestamp, token_count = item
+                        yield Message(id=message_id, conversation_id=conversation_id, sender_type=sender_type,
+                                      content=content,
+                                      timestamp=datetime.fromisoformat(timestamp) if timestamp else None,
+                                      token_count=token_count)
+                        continue
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    raise ValueError('Archive payload is truncated')
+                buffer = buffer[pos:] + chunk
+                pos = 0
+
+    def load(self, conversation_id: int) -> Optional[List]:
+        """
+        Read the archived messages of a conversation without restoring them.
+
+        Only issues a SELECT, so it can run on a read replica.
+
+        Args:
+            conversation_id (int): Conversation ID
+
+        Returns:
+            Optional[List[Message]]: Transient messages, oldest first, or None if
+            the conversation is not archived
+        """
+        from models import MessageArchive, db
+
+        payload = db.session.execute(
+            select(MessageArchive.payload).where(MessageArchive.conversation_id == conversation_id)
+        ).scalar()
+        if payload is None:
+            return None
+        with self._lock:
+            self._hydrations += 1
+        return self.unpack(conversation_id, payload)
+
+    def restore(self, conversation_id: int) -> int:
+        """
+        Move a conversation's archived messages back into the messages table.
+
+        Runs inside the caller's transaction and does not commit. Callers
+        update the conversation row first (clearing ``archived_at``), which
+        locks it against a concurrent archive batch.
+
+        Args:
+            conversation_id (int): Conversation ID
+
+        Returns:
+            int: Messages restored, 0 if the conversation was not archived
+        """
+        from models import Message, MessageArchive, db
+
+        messages = self.load(conversation_id)
+        if messages is None:
+            return 0
+        if messages:
+            # Original ids are kept, so cursors, summaries and caches stay valid
+            db.session.execute(insert(Message.__table__), [
+                {
+                    'id': msg.id,
+                    'conversation_id': conversation_id,
+                    'sender_type': msg.sender_type,
+                    'content': msg.content,
+                    'timestamp': msg.timestamp,
+                    'token_count': msg.token_count
+                }
+                for msg in messages
+            ])
+        db.session.execute(delete(MessageArchive.__table__).where(MessageArchive.conversation_id == conversation_id))
+        with self._lock:
+            self._restored_conversations += 1
+        self.logger.info(f"Restored {len(messages)} archived messages of conversation {conversation_id}")
+        return len(messages)
+
+    def _candidates(self, cutoff: datetime):
+        from models import Conversation
+
+        return (
+            select(Conversation.id)
+            .where(Conversation.archived_at.is_(None),
+                   Conversation.updated_at < cutoff,
+                   Conversation.message_count > 0)
+        )
+
+    def count_idle(self, idle_days: int = None) -> int:
+        """Count the conversations an archive run would move."""
+        from models import db
+
+        cutoff = datetime.utcnow() - timedelta(days=idle_days or self.idle_days)
+        return db.session.execute(
+            select(func.count()).select_from(self._candidates(cutoff).subquery())
+        ).scalar() or 0
+
+    def archive_idle(self, idle_days: int = None, batch_size: int = None,
+                     max_batches: int = None) -> Dict:
+        """
+        Archive idle conversations, one batch per transaction.
+
+        Args:
+            idle_days (int): Override of the idle threshold in days
+            batch_size (int): Override of the conversations per batch
+            max_batches (int): Stop after this many batches; None runs until none are left
+
+        Returns:
+            Dict: Conversations and messages archived, batches run and payload bytes written
+        """
+        cutoff = datetime.utcnow() - timedelta(days=idle_days or self.idle_days)
+        batch_size = batch_size or self.batch_size
+        totals = {'conversations': 0, 'messages': 0, 'batches': 0, 'bytes': 0}
+
+        while max_batches is None or totals['batches'] < max_batches:
+            conversations, messages, size = self._archive_batch(cutoff, batch_size)
+            if conversations is None:
+                break
+            totals['batches'] += 1
+            totals['conversations'] += conversations
+            totals['messages'] += messages
+            totals['bytes'] += size
+
+        with self._lock:
+            self._archived_conversations += totals['conversations']
+            self._archived_messages += totals['messages']
+            self._last_run = datetime.utcnow()
+        return totals
+
+    def _archive_batch(self, cutoff: datetime, batch_size: int):
+        """Archive up to batch_size conversations; returns (None, 0, 0) when none are idle."""
+        from models import Conversation, Message, MessageArchive, db
+        from services.history_cache import get_history_cache
+
+        ids = list(db.session.execute(
+            self._candidates(cutoff).order_by(Conversation.updated_at, Conversation.id).limit(batch_size)
+        ).scalars())
+        if not ids:
+            return None, 0, 0
+
+        now = datetime.utcnow()
+        try:
+            # Claim each conversation with a conditional UPDATE; one written to since
+            # the SELECT no longer matches and is left alone. The row lock also holds
+            # off writers until the batch commits.
+            claimed = []
+            for conversation_id in ids:
+                result = db.session.execute(
+                    update(Conversation)
+                    .where(Conversation.id == conversation_id,
+                           Conversation.archived_at.is_(None),
+                           Conversation.updated_at < cutoff)
+                    .values(archived_at=now, updated_at=Conversation.updated_at)
+                )
+                if result.rowcount == 1:
+                    claimed.append(conversation_id)
+
+            rows = db.session.execute(
+                select(Message.conversation_id, Message.id, Message.sender_type, Message.content,
+                       Message.timestamp, Message.token_count)
+                .where(Message.conversation_id.in_(claimed))
+                .order_by(Message.conversation_id, Message.timestamp, Message.id)
+            ).all() if claimed else []
+
+            by_conversation = {conversation_id: [] for conversation_id in claimed}
+            for row in rows:
+                by_conversation[row.conversation_id].append(row)
+
+            archives = []
+            for conversation_id, messages in by_conversation.items():
+                archives.append({
+                    'conversation_id': conversation_id,
+                    'payload': self.pack(messages),
+                    'message_count': len(messages),
+                    'first_message_id': min((m.id for m in messages), default=None),
+                    'last_message_id': max((m.id for m in messages), default=None),
+                    'archived_at': now
+                })
+            if archives:
+                db.session.execute(insert(MessageArchive.__table__), archives)
+                db.session.execute(delete(Message.__table__).where(Message.conversation_id.in_(claimed)))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"Error archiving conversations: {str(e)}")
+            raise
+
+        history_cache = get_history_cache()
+        for conversation_id in claimed:
+            history_cache.invalidate(conversation_id)
+
+        size = sum(len(archive['payload']) for archive in archives)
+        self.logger.info(f"Archived {len(claimed)} conversations ({len(rows)} messages, {size} bytes)")
+        return len(claimed), len(rows), size
+
+    def restore_conversation(self, conversation_id: int) -> int:
+        """
+        Restore an archived conversation on demand and commit.
+
+        Its ``updated_at`` is kept, so a later archive run may archive it again.
+
+        Args:
+            conversation_id (int): Conversation ID
+
+        Returns:
+            int: Messages restored
+        """
+        from models import Conversation, db
+
+        try:
+            db.session.execute(
+                update(Conversation)
+                .where(Conversation.id == conversation_id)
+                .values(archived_at=None, updated_at=Conversation.updated_at)
+            )
+            restored = self.restore(conversation_id)
+            db.session.commit()
+            return restored
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"Error restoring conversation {conversation_id}: {str(e)}")
+            raise
+
+    def get_stats(self) -> Dict:
+        """
+        Get archive counters of this process.
+
+        Returns:
+            Dict: Idle threshold, batch size, conversations and messages archived,
+            conversations restored, archived reads and the last run time
+        """
+        with self._lock:
+            return {
+                'idle_days': self.idle_days,
+                'batch_size': self.batch_size,
+                'archived_conversations': self._archived_conversations,
+                'archived_messages': self._archived_messages,
+                'restored_conversations': self._restored_conversations,
+                'hydrations': self._hydrations,
+                'last_run': self._last_run.isoformat() if self._last_run else None
+            }
+
+
+_archiver = None
+_archiver_lock = threading.Lock()
+
+
+def get_message_archiver() -> MessageArchiver:
+    """Return the process-wide message archiver, creating it from Config on first use."""
+    global _archiver
+    if _archiver is None:
+        with _archiver_lock:
+            if _archiver is None:
+                _archiver = MessageArchiver(
+                    idle_days=Config.ARCHIVE_IDLE_DAYS,
+                    batch_size=Config.ARCHIVE_BATCH_SIZE
+                )
+    return _archiver
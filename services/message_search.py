@@ -0,0 +1,352 @@
+import html
+import logging
+import re
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, List, Tuple
+
+from sqlalchemy import DateTime, and_, select, text
+
+from config import Config
+
+# Snippet markers: control characters never found in chat text, turned into <mark> after escaping
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+class MessageSearch:
+    """Full-text search over message content, scoped to one user's conversations.
+
+    The index depends on the database:
+
+    - ``fts5`` (SQLite): an external-content FTS5 table ``messages_fts`` kept
+      in step with ``messages`` by insert/update/delete triggers, ranked by
+      bm25 with snippets from FTS5 itself.
+    - ``mssql``: a full-text index on ``messages.content`` with automatic
+      change tracking, queried with CONTAINSTABLE and ranked by its RANK.
+    - ``like``: fallback when neither is available; LIKE over the user's own
+      conversations only, newest first.
+
+    Every query word must match; the last word also matches as a prefix, so
+    results follow the user while typing. Archived conversations are not
+    searched until they are restored.
+    """
+
+    FTS_TABLE = 'messages_fts'
+    MSSQL_CATALOG = 'chat_catalog'
+    # While on LIKE, how often to look again for an index created since (e.g. by a migration)
+    REDETECT_SECONDS = 300
+
+    def __init__(self, max_results: int, snippet_tokens: int = 16):
+        """
+        Initialize search.
+
+        Args:
+            max_results (int): Deepest result reachable by paging, bounds the cost of a query
+            snippet_tokens (int): Approximate snippet length in words
+        """
+        self.max_results = max_results
+        self.snippet_tokens = snippet_tokens
+        self.mode = None
+        self._detected_at = 0.0
+
+        self._lock = threading.Lock()
+        self._searches = 0
+        self._failures = 0
+        self._total_ms = 0.0
+
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def tokenize(query: str) -> List[str]:
+        """Split a search query into words, dropping punctuation and operators."""
+        return _TOKEN.findall(query or '')[:16]
+
+    # Index maintenance
+    def detect(self, engine) -> str:
+        """
+        Pick the search mode from the index that exists, without creating anything.
+
+        Args:
+            engine (Engine): Primary database engine
+
+        Returns:
+            str: 'fts5', 'mssql' or 'like'
+
+        Raises:
+            Exception: If the database cannot be queried
+        """
+        with engine.connect() as conn:
+            mode = self._existing_mode(conn)
+        self._set_mode(mode)
+        return mode
+
+    def _existing_mode(self, conn) -> str:
+        dialect = conn.dialect.name
+        if dialect == 'sqlite':
+            # The table is only usable with all three triggers keeping it in step
+            table = self.FTS_TABLE
+            found = conn.execute(text(
+                "SELECT COUNT(*) FROM sqlite_master WHERE name IN (:table, :ai, :ad, :au)"
+            ), {'table': table, 'ai': f'{table}_ai', 'ad': f'{table}_ad', 'au': f'{table}_au'}).scalar()
+            return 'fts5' if found == 4 else 'like'
+        if dialect == 'mssql':
+            exists = conn.execute(text(
+                "SELECT 1 FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('messages')"
+            )).scalar()
+            return 'mssql' if exists else 'like'
+        return 'like'
+
+    def _set_mode(self, mode: str):
+        with self._lock:
+            self.mode = mode
+            self._detected_at = time.monotonic()
+
+    def ensure_index(self, engine) -> str:
+        """
+        Create the full-text index if missing and pick the search mode (idempotent).
+
+        Runs on its own autocommit connection: MSSQL refuses full-text DDL
+        inside a transaction. The index is maintained incrementally from
+        then on, by triggers (SQLite) or change tracking (MSSQL). A worker
+        that loses the race to create it uses the index the winner created.
+
+        Args:
+            engine (Engine): Primary database engine
+
+        Returns:
+            str: 'fts5', 'mssql' or 'like' (databases without full-text support)
+
+        Raises:
+            Exception: If the index is missing and cannot be created
+        """
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            mode = self._existing_mode(conn)
+            if mode == 'like' and conn.dialect.name in ('sqlite', 'mssql'):
+                try:
+                    mode = self._create_fts5(conn) if conn.dialect.name == 'sqlite' else self._create_mssql(conn)
+                except Exception:
+                    mode = self._existing_mode(conn)
+                    if mode == 'like':
+                        raise
+        self._set_mode(mode)
+        return mode
+
+    def _create_fts5(self, conn) -> str:
+        # IF NOT EXISTS throughout, so a half-finished earlier attempt is completed
+        table = self.FTS_TABLE
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(content, content='messages', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2')"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON messages BEGIN "
+            f"INSERT INTO {table}(rowid, content) VALUES (new.id, new.content); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON messages BEGIN "
+            f"INSERT INTO {table}({table}, rowid, content) VALUES ('delete', old.id, old.content); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_au AFTER UPDATE OF content ON messages BEGIN "
+            f"INSERT INTO {table}({table}, rowid, content) VALUES ('delete', old.id, old.content); "
+            f"INSERT INTO {table}(rowid, content) VALUES (new.id, new.content); END"
+        ))
+        # Index the messages written before the table existed
+        conn.execute(text(f"INSERT INTO {table}({table}) VALUES ('rebuild')"))
+        self.logger.info(f"Created full-text table {table}")
+        return 'fts5'
+
+    def _create_mssql(self, conn) -> str:
+        if not conn.execute(text("SELECT CAST(SERVERPROPERTY('IsFullTextInstalled') AS int)")).scalar():
+            raise RuntimeError("Full-text search is not installed on this SQL Server instance")
+
+        catalog = self.MSSQL_CATALOG
+        conn.execute(text(
+            f"IF NOT EXISTS (SELECT 1 FROM sys.fulltext_catalogs WHERE name = '{catalog}') "
+            f"CREATE FULLTEXT CATALOG {catalog}"
+        ))
+        key_index = conn.execute(text(
+            "SELECT name FROM sys.indexes WHERE object_id = OBJECT_ID('messages') AND is_primary_key = 1"
+        )).scalar()
+        # Neutral word breaker: messages mix Turkish and English. Population runs in the background.
+        conn.execute(text(
+            f"CREATE FULLTEXT INDEX ON messages (content LANGUAGE 0) KEY INDEX {key_index} "
+            f"ON {catalog} WITH CHANGE_TRACKING AUTO"
+        ))
+        self.logger.info("Created full-text index on messages.content")
+        return 'mssql'
+
+    def _current_mode(self) -> str:
+        """The search mode, detected on first use and re-checked while falling back to LIKE."""
+        with self._lock:
+            mode = self.mode
+            due = mode is None or (mode == 'like' and time.monotonic() - self._detected_at >= self.REDETECT_SECONDS)
+        if not due:
+            return mode
+        from models import db
+        try:
+            return self.detect(db.engine)
+        except Exception as e:
+            self.logger.warning(f"Could not detect the full-text index, searching with LIKE: {str(e)}")
+            return mode or 'like'
+
+    # Queries
+    def search(self, user_id: int, query: str, limit: int, offset: int = 0) -> Tuple[List[Dict], bool]:
+        """
+        Search the messages of one user's conversations, best match first.
+
+        Issues only SELECTs through db.session, so it can run on a read replica.
+
+        Args:
+            user_id (int): User whose conversations are searched
+            query (str): Words to find
+            limit (int): Page size
+            offset (int): Results to skip; limit + offset is capped at max_results
+
+        Returns:
+            Tuple[List[Dict], bool]: Results and whether more exist
+        """
+        tokens = self.tokenize(query)
+        limit = max(0, min(limit, self.max_results - offset))
+        if not tokens or limit <= 0:
+            return [], False
+
+        mode = self._current_mode()
+        started = time.perf_counter()
+        try:
+            if mode == 'fts5':
+                rows = self._search_fts5(user_id, tokens, limit + 1, offset)
+            elif mode == 'mssql':
+                rows = self._search_mssql(user_id, tokens, limit + 1, offset)
+            else:
+                rows = self._search_like(user_id, tokens, limit + 1, offset)
+        except Exception:
+            with self._lock:
+                self._failures += 1
+            raise
+        with self._lock:
+            self._searches += 1
+            self._total_ms += (time.perf_counter() - started) * 1000
+
+        has_more = len(rows) > limit and offset + limit < self.max_results
+        return [self._result(row, tokens) for row in rows[:limit]], has_more
+
+    def _search_fts5(self, user_id: int, tokens: List[str], limit: int, offset: int) -> list:
+        from models import db
+
+        # Quoted words are matched literally; the last is a prefix
+        match = ' '.join(f'"{token}"' for token in tokens) + '*'
+        table = self.FTS_TABLE
+        return db.session.execute(text(
+            f"SELECT m.id, m.conversation_id, m.sender_type, m.timestamp, c.title, "
+            f"snippet({table}, 0, :start, :end, '…', :tokens) AS snippet, bm25({table}) AS score "
+            f"FROM {table} JOIN messages m ON m.id = {table}.rowid "
+            f"JOIN conversations c ON c.id = m.conversation_id "
+            f"WHERE {table} MATCH :match AND c.user_id = :user_id "
+            f"ORDER BY score, m.id DESC LIMIT :limit OFFSET :offset"
+        ).columns(timestamp=DateTime), {
+            'start': _MARK_START, 'end': _MARK_END, 'tokens': self.snippet_tokens,
+            'match': match, 'user_id': user_id, 'limit': limit, 'offset': offset
+        }).all()
+
+    def _search_mssql(self, user_id: int, tokens: List[str], limit: int, offset: int) -> list:
+        from models import db
+
+        terms = [f'"{token}"' for token in tokens[:-1]] + [f'"{tokens[-1]}*"']
+        return db.session.execute(text(
+            "SELECT m.id, m.conversation_id, m.sender_type, m.timestamp, m.content, c.title, ft.[RANK] AS score "
+            "FROM CONTAINSTABLE(messages, content, :match) AS ft "
+            "JOIN messages m ON m.id = ft.[KEY] "
+            "JOIN conversations c ON c.id = m.conversation_id "
+            "WHERE c.user_id = :user_id "
+            "ORDER BY ft.[RANK] DESC, m.id DESC "
+            "OFFSET :offset ROWS FETCH NEXT :limit ROWS ONLY"
+        ).columns(timestamp=DateTime), {'match': ' AND '.join(terms), 'user_id': user_id, 'limit': limit, 'offset': offset}).all()
+
+    def _search_like(self, user_id: int, tokens: List[str], limit: int, offset: int) -> list:
+        from models import Conversation, Message, db
+
+        conditions = [
+            Message.content.ilike('%' + token.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%',
+                                  escape='\\')
+            for token in tokens
+        ]
+        return db.session.execute(
+            select(Message.id, Message.conversation_id, Message.sender_type, Message.timestamp,
+                   Message.content, Conversation.title)
+            .join(Conversation, Conversation.id == Message.conversation_id)
+            .where(Conversation.user_id == user_id, and_(*conditions))
+            .order_by(Message.timestamp.desc(), Message.id.desc())
+            .offset(offset)
+            .limit(limit)
+        ).all()
+
+    def _result(self, row, tokens: List[str]) -> Dict:
+        mapping = row._mapping
+        if 'snippet' in mapping:
+            snippet = self._highlight(mapping['snippet'])
+        else:
+            snippet = self._make_snippet(mapping['content'], tokens)
+        score = mapping.get('score')
+        return {
+            'message_id': row.id,
+            'conversation_id': row.conversation_id,
+            'conversation_title': row.title,
+            'sender_type': row.sender_type,
+            # Convert UTC timestamp to UTC+3 for display
+            'timestamp': (row.timestamp + timedelta(hours=3)).isoformat() if row.timestamp else None,
+            'snippet': snippet,
+            # bm25 is lower-is-better; report higher-is-better like the MSSQL rank
+            'score': round(-score if 'snippet' in mapping else score, 4) if score is not None else None
+        }
+
+    @staticmethod
+    def _highlight(marked: str) -> str:
+        """HTML-escape a snippet and turn the match markers into <mark> tags."""
+        return html.escape(marked or '').replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+    def _make_snippet(self, content: str, tokens: List[str]) -> str:
+        """Cut a snippet around the first matching word, for engines without a snippet function."""
+        content = content or ''
+        pattern = re.compile('|'.join(re.escape(token) for token in tokens), re.IGNORECASE)
+        first = pattern.search(content)
+        width = self.snippet_tokens * 8
+        start = max(0, (first.start() if first else 0) - width // 3)
+        end = min(len(content), start + width)
+        window = content[start:end]
+        marked = pattern.sub(lambda m: f'{_MARK_START}{m.group(0)}{_MARK_END}', window)
+        return ('…' if start > 0 else '') + self._highlight(marked) + ('…' if end < len(content) else '')
+
+    def get_stats(self) -> Dict:
+        """
+        Get search counters of this process.
+
+        Returns:
+            Dict: Search mode, searches, failures and average latency
+        """
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'max_results': self.max_results,
+                'searches': self._searches,
+                'failures': self._failures,
+                'avg_ms': round(self._total_ms / self._searches, 3) if self._searches else 0.0
+            }
+
+
+_search = None
+_search_lock = threading.Lock()
+
+
+def get_message_search() -> MessageSearch:
+    """Return the process-wide message search, creating it from Config on first use."""
+    global _search
+    if _search is None:
+        with _search_lock:
+            if _search is None:
+                _search = MessageSearch(max_results=Config.SEARCH_MAX_RESULTS)
+    return _search
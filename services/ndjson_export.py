@@ -0,0 +1,65 @@
+import json
+import zlib
+from typing import Dict, Iterable, Iterator
+
+from flask import Response, stream_with_context
+
+
+def ndjson_chunks(records: Iterable[Dict], compress: bool = False, chunk_bytes: int = 64 * 1024) -> Iterator[bytes]:
+    """
+    Encode records as newline-delimited JSON, in chunks of about chunk_bytes.
+
+    Only one chunk is buffered at a time, so memory does not grow with the
+    number of records.
+
+    Args:
+        records (Iterable[Dict]): JSON-serializable records
+        compress (bool): Gzip the stream
+        chunk_bytes (int): Uncompressed bytes gathered before a chunk is emitted
+
+    Returns:
+        Iterator[bytes]: Encoded (and optionally gzipped) chunks
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer = []
+    size = 0
+    for record in records:
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            data = b''.join(buffer)
+            buffer, size = [], 0
+            data = compressor.compress(data) if compressor else data
+            if data:
+                yield data
+
+    data = b''.join(buffer)
+    if compressor:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
+
+
+def ndjson_response(records: Iterable[Dict], filename: str, compress: bool = False) -> Response:
+    """
+    Stream records to the client as an NDJSON download.
+
+    Args:
+        records (Iterable[Dict]): Records, typically a generator reading from the database
+        filename (str): Download name without extension
+        compress (bool): Gzip the body and name the file .ndjson.gz
+
+    Returns:
+        Response: Streaming response that runs the generator inside the request context
+    """
+    extension = 'ndjson.gz' if compress else 'ndjson'
+    return Response(
+        stream_with_context(ndjson_chunks(records, compress)),
+        mimetype='application/gzip' if compress else 'application/x-ndjson',
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}.{extension}"',
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
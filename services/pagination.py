@@ -0,0 +1,52 @@
+from typing import Dict, Optional, Sequence, Tuple
+
+from flask import request
+
+from services.database_service import DatabaseService
+
+
+def page_args(default_limit: int, max_limit: int) -> Tuple[int, Optional[str], Optional[str]]:
+    """
+    Read ?limit=, ?before= and ?after= for a keyset-paginated list.
+
+    Args:
+        default_limit (int): Page size when ?limit= is missing
+        max_limit (int): Largest page size a client may ask for
+
+    Returns:
+        Tuple[int, Optional[str], Optional[str]]: Page size clamped to 1..max_limit,
+        before cursor and after cursor
+    """
+    limit = request.args.get('limit', default_limit, type=int)
+    limit = max(1, min(limit, max_limit))
+    return limit, request.args.get('before'), request.args.get('after')
+
+
+def pagination(rows: Sequence, has_more: bool, limit: int, after: Optional[str], timestamp_attr: str) -> Dict:
+    """
+    Build the pagination block for a newest-first page.
+
+    ``before_cursor`` continues towards older rows and ``after_cursor``
+    towards newer ones; on an empty page the request's cursor is kept.
+
+    Args:
+        rows (Sequence): Page rows, newest first, each with ``id`` and the timestamp attribute
+        has_more (bool): Whether more rows exist in the paging direction
+        limit (int): Page size used
+        after (str): The request's after cursor, if any
+        timestamp_attr (str): Attribute the list is ordered by
+
+    Returns:
+        Dict: limit, has_more, direction, before_cursor and after_cursor
+    """
+    newest = rows[0] if rows else None
+    oldest = rows[-1] if rows else None
+    return {
+        'limit': limit,
+        'has_more': has_more,
+        'direction': 'newer' if after else 'older',
+        'before_cursor': (DatabaseService.encode_cursor(getattr(oldest, timestamp_attr), oldest.id)
+                          if oldest else None),
+        'after_cursor': (DatabaseService.encode_cursor(getattr(newest, timestamp_attr), newest.id)
+                         if newest else after)
+    }
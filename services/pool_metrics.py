@@ -0,0 +1,257 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, List
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+
+# Upper bounds (ms) of the checkout wait histogram buckets; the last bucket is unbounded
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection.
+
+    Pool events fire only once a connection has been handed out, so the wait
+    (queue wait plus connect time for a new connection) is measured here and
+    reported to the attached :class:`PoolMetrics`, along with checkouts that
+    timed out.
+    """
+
+    metrics = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.observe_timeout(time.perf_counter() - started)
+            raise
+        if self.metrics is not None:
+            self.metrics.observe_wait(time.perf_counter() - started)
+        return record
+
+    def recreate(self):
+        # Engine.dispose() replaces the pool; keep reporting to the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class PoolMetrics:
+    """Connection pool counters for one engine, gathered from SQLAlchemy pool events."""
+
+    def __init__(self, name: str, engine):
+        """
+        Attach to an engine's pool.
+
+        Args:
+            name (str): Label in reports, e.g. 'primary' or a replica bind key
+            engine (Engine): Engine whose pool is observed
+        """
+        self.name = name
+        self.engine = engine
+
+        self._lock = threading.Lock()
+        self._checked_out = 0
+        self._peak_checked_out = 0
+        self._checkouts = 0
+        self._checkins = 0
+        self._connects = 0
+        self._closes = 0
+        self._invalidations = 0
+        self._soft_invalidations = 0
+        self._timeouts = 0
+        self._wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._wait_count = 0
+        self._wait_sum_ms = 0.0
+        self._wait_max_ms = 0.0
+
+        pool = engine.pool
+        if isinstance(pool, TimedQueuePool):
+            pool.metrics = self
+        event.listen(pool, 'connect', self._on_connect)
+        event.listen(pool, 'checkout', self._on_checkout)
+        event.listen(pool, 'checkin', self._on_checkin)
+        event.listen(pool, 'invalidate', self._on_invalidate)
+        event.listen(pool, 'soft_invalidate', self._on_soft_invalidate)
+        event.listen(pool, 'close', self._on_close)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self._connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self._checkouts += 1
+            self._checked_out += 1
+            self._peak_checked_out = max(self._peak_checked_out, self._checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self._checkins += 1
+            self._checked_out = max(0, self._checked_out - 1)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self._invalidations += 1
+
+    def _on_soft_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self._soft_invalidations += 1
+
+    def _on_close(self, dbapi_connection, connection_record):
+        with self._lock:
+            self._closes += 1
+
+    def observe_wait(self, seconds: float):
+        """Record the time one checkout waited for its connection."""
+        wait_ms = seconds * 1000
+        bucket = next((i for i, bound in enumerate(WAIT_BUCKETS_MS) if wait_ms <= bound), len(WAIT_BUCKETS_MS))
+        with self._lock:
+            self._wait_buckets[bucket] += 1
+            self._wait_count += 1
+            self._wait_sum_ms += wait_ms
+            self._wait_max_ms = max(self._wait_max_ms, wait_ms)
+
+    def observe_timeout(self, seconds: float):
+        """Record a checkout that gave up after waiting for the pool timeout."""
+        with self._lock:
+            self._timeouts += 1
+        self.observe_wait(seconds)
+
+    def get_stats(self) -> Dict:
+        """
+        Get a snapshot of pool state and counters.
+
+        Returns:
+            Dict: Pool size, checked-out/idle/overflow connections, event counts,
+            timeouts and the checkout wait histogram (cumulative, by upper bound in ms)
+        """
+        pool = self.engine.pool
+        with self._lock:
+            cumulative = 0
+            histogram = []
+            for bound, count in zip(list(WAIT_BUCKETS_MS) + ['+Inf'], self._wait_buckets):
+                cumulative += count
+                histogram.append({'le_ms': bound, 'count': cumulative})
+            return {
+                'pool_class': type(pool).__name__,
+                'size': pool.size() if hasattr(pool, 'size') else None,
+                'max_overflow': getattr(pool, '_max_overflow', None),
+                'timeout_seconds': pool.timeout() if hasattr(pool, 'timeout') else None,
+                'checked_out': pool.checkedout() if hasattr(pool, 'checkedout') else self._checked_out,
+                'idle': pool.checkedin() if hasattr(pool, 'checkedin') else None,
+                'overflow': max(0, pool.overflow()) if hasattr(pool, 'overflow') else None,
+                'peak_checked_out': self._peak_checked_out,
+                'checkouts': self._checkouts,
+                'checkins': self._checkins,
+                'connects': self._connects,
+                'closes': self._closes,
+                'invalidations': self._invalidations,
+                'soft_invalidations': self._soft_invalidations,
+                'timeouts': self._timeouts,
+                'checkout_wait_ms': {
+                    'count': self._wait_count,
+                    'avg': round(self._wait_sum_ms / self._wait_count, 3) if self._wait_count else 0.0,
+                    'max': round(self._wait_max_ms, 3),
+                    'histogram': histogram
+                }
+            }
+
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def instrument_engines(engines: Dict) -> List[PoolMetrics]:
+    """
+    Attach pool metrics to engines not instrumented yet.
+
+    Args:
+        engines (Dict): Flask-SQLAlchemy ``db.engines``, bind key (None for the primary) to engine
+
+    Returns:
+        List[PoolMetrics]: Metrics of every given engine
+    """
+    attached = []
+    with _metrics_lock:
+        for bind_key, engine in engines.items():
+            name = bind_key or 'primary'
+            metrics = _metrics.get(name)
+            if metrics is None or metrics.engine is not engine:
+                metrics = _metrics[name] = PoolMetrics(name, engine)
+            attached.append(metrics)
+    return attached
+
+
+def get_pool_stats() -> Dict[str, Dict]:
+    """Return the pool metrics of every instrumented engine, keyed by name."""
+    with _metrics_lock:
+        metrics = list(_metrics.values())
+    return {m.name: m.get_stats() for m in metrics}
+
+
+def warm_up(engine, connections: int) -> int:
+    """
+    Open pool connections ahead of the first requests.
+
+    Args:
+        engine (Engine): Engine whose pool is filled
+        connections (int): Connections to open; capped at the pool size
+
+    Returns:
+        int: Connections opened and returned to the pool
+    """
+    size = engine.pool.size() if hasattr(engine.pool, 'size') else 1
+    opened = []
+    try:
+        for _ in range(max(0, min(connections, size))):
+            opened.append(engine.connect())
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Pool warm-up stopped after {len(opened)} connections: {str(e)}")
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
+
+
+def warm_up_on_first_request(app, connections: int):
+    """
+    Warm up every engine's pool in each worker process, after its first request.
+
+    Connections opened in the app factory would be inherited by every worker a
+    pre-forking server (e.g. gunicorn --preload) forks from it, sharing one
+    socket between processes. The warm-up is therefore deferred to the first
+    request a process serves, and runs in a background thread so that request
+    does not wait for it.
+
+    Args:
+        app (Flask): Application whose engines are warmed up
+        connections (int): Connections to open per engine; 0 disables the warm-up
+    """
+    if connections <= 0:
+        return
+    lock = threading.Lock()
+    warmed = {'pid': None}
+
+    @app.before_request
+    def _warm_up_pools():
+        pid = os.getpid()
+        if warmed['pid'] == pid:
+            return
+        with lock:
+            if warmed['pid'] == pid:
+                return
+            warmed['pid'] = pid
+        from models import db
+
+        engines = list(db.engines.values())
+        threading.Thread(
+            target=lambda: [warm_up(engine, connections) for engine in engines],
+            name='pool-warm-up', daemon=True
+        ).start()
@@ -0,0 +1,305 @@
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from flask import g, has_app_context, has_request_context, session
+from sqlalchemy import func, select
+
+from config import Config
+from services.cache_backend import CacheBackend, get_cache_backend
+
+
+class _ReplicaState:
+    """Last check result of one replica bind."""
+
+    __slots__ = ('bind_key', 'available', 'lag_seconds', 'checked_at', 'last_error',
+                 'pending', 'reads', 'failures')
+
+    def __init__(self, bind_key: str):
+        self.bind_key = bind_key
+        self.available = False
+        self.lag_seconds = None
+        self.checked_at = None
+        self.last_error = None
+        # (monotonic time, primary watermark) samples the replica has not reached yet
+        self.pending = deque(maxlen=1024)
+        self.reads = 0
+        self.failures = 0
+
+
+class ReplicaRouter:
+    """Routes read-only queries to read-replica binds.
+
+    Each replica is a Flask-SQLAlchemy bind. A background thread checks every
+    ``interval`` seconds that each replica answers and how far it lags: the
+    primary's newest message id is sampled on every check, and a replica's
+    lag is the age of the oldest sample it has not replicated yet. Reads are
+    spread round-robin over replicas that answer and lag at most
+    ``max_lag_seconds``, and go to the primary when none does.
+
+    A user who just wrote reads from the primary for ``sticky_seconds``
+    (read-your-writes). The mark is kept in the shared cache backend, so it
+    holds whichever worker serves the user's next request.
+    """
+
+    sticky_namespace = 'db_writes'
+
+    def __init__(self, bind_keys: List[str], max_lag_seconds: float, interval: float,
+                 sticky_seconds: float, backend: Optional[CacheBackend] = None):
+        """
+        Initialize the router.
+
+        Args:
+            bind_keys (List[str]): Flask-SQLAlchemy bind keys of the replicas
+            max_lag_seconds (float): Replication lag above which a replica gets no reads
+            interval (float): Seconds between replica checks
+            sticky_seconds (float): Seconds a user's reads stay on the primary after a write
+            backend (CacheBackend): Store for the read-your-writes marks
+        """
+        self.max_lag_seconds = max_lag_seconds
+        self.interval = interval
+        self.sticky_seconds = sticky_seconds
+        self.backend = backend
+
+        self._replicas = [_ReplicaState(key) for key in bind_keys]
+        self._round_robin = itertools.cycle(range(len(self._replicas))) if self._replicas else None
+        self._app = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+        self._primary_reads = 0
+        self._sticky_reads = 0
+        self._fallbacks = 0
+
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any replica is configured."""
+        return bool(self._replicas)
+
+    def start(self, app):
+        """
+        Start the background replica checks, or rebind them to another app.
+
+        No-op without replicas. The check loop is started once per process;
+        every call binds the checks to ``app`` and runs one right away.
+
+        Args:
+            app (Flask): Application whose binds are checked
+        """
+        with self._lock:
+            if not self._replicas:
+                return
+            self._app = app
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='replica-router', daemon=True)
+                self._thread.start()
+                return
+        self._wakeup.set()
+
+    def choose(self, user_id: Optional[int] = None) -> Optional[str]:
+        """
+        Pick the replica for a read.
+
+        Args:
+            user_id (int): User the read is for; defaults to the user of the current request
+
+        Returns:
+            Optional[str]: Bind key of the replica, or None to read from the primary
+        """
+        if not self._replicas:
+            return None
+        if self.is_sticky(user_id):
+            with self._lock:
+                self._sticky_reads += 1
+            return None
+
+        with self._lock:
+            for _ in range(len(self._replicas)):
+                state = self._replicas[next(self._round_robin)]
+                if state.available and state.lag_seconds is not None and state.lag_seconds <= self.max_lag_seconds:
+                    state.reads += 1
+                    return state.bind_key
+            self._primary_reads += 1
+        return None
+
+    @contextmanager
+    def route(self, bind_key: str):
+        """
+        Send the queries of the block to a replica; only reads may run inside it.
+
+        The block runs in a session of its own, swapped in for ``db.session``,
+        so the replica connection never joins the request's primary transaction
+        and a failed replica read is discarded with that session alone. Objects
+        loaded in the block come back detached, with their columns loaded.
+
+        Args:
+            bind_key (str): Replica to read from
+        """
+        from models import db, read_engine
+
+        registry = db.session.registry
+        primary = registry()
+        replica = db.session.session_factory()
+        registry.set(replica)
+        token = read_engine.set(db.engines[bind_key])
+        try:
+            yield
+        finally:
+            read_engine.reset(token)
+            registry.set(primary)
+            replica.close()
+
+    def report_failure(self, bind_key: str, error: Exception):
+        """
+        Take a replica out of rotation after a read failed on it.
+
+        It is put back by the next successful check.
+
+        Args:
+            bind_key (str): Replica that failed
+            error (Exception): Error seen by the caller
+        """
+        self.logger.warning(f"Read on replica {bind_key} failed, using primary: {str(error)}")
+        with self._lock:
+            self._fallbacks += 1
+            for state in self._replicas:
+                if state.bind_key == bind_key:
+                    state.available = False
+                    state.failures += 1
+                    state.last_error = str(error)
+        self._wakeup.set()
+
+    def mark_write(self, user_id: Optional[int] = None):
+        """
+        Pin a user's reads to the primary after a write.
+
+        Args:
+            user_id (int): User who wrote; defaults to the user of the current request
+        """
+        if not self._replicas:
+            return
+        if has_app_context():
+            g._db_wrote = True
+        user_id = user_id or self._request_user_id()
+        if user_id is not None and self.backend is not None:
+            self.backend.set(self.sticky_namespace, str(user_id), True, self.sticky_seconds)
+
+    def is_sticky(self, user_id: Optional[int] = None) -> bool:
+        """Whether reads for this request or user must see the primary."""
+        if has_app_context() and g.get('_db_wrote'):
+            return True
+        user_id = user_id or self._request_user_id()
+        if user_id is None or self.backend is None:
+            return False
+        return self.backend.get(self.sticky_namespace, str(user_id)) is not None
+
+    @staticmethod
+    def _request_user_id() -> Optional[int]:
+        return session.get('user_id') if has_request_context() else None
+
+    def check(self):
+        """Check every replica now: reachability and replication lag."""
+        from models import Message, db
+
+        watermark = select(func.max(Message.id))
+        with self._app.app_context():
+            try:
+                with db.engine.connect() as conn:
+                    primary_max = conn.execute(watermark).scalar() or 0
+            except Exception as e:
+                # Without the primary's position lag cannot be judged; keep the last results
+                self.logger.warning(f"Replica check could not read the primary: {str(e)}")
+                return
+            sampled_at = time.monotonic()
+
+            for state in self._replicas:
+                error = None
+                replica_max = None
+                try:
+                    with db.engines[state.bind_key].connect() as conn:
+                        replica_max = conn.execute(watermark).scalar() or 0
+                except Exception as e:
+                    error = str(e)
+
+                with self._lock:
+                    was_available = state.available
+                    state.checked_at = datetime.utcnow()
+                    state.last_error = error
+                    state.available = error is None
+                    if error is None:
+                        state.pending.append((sampled_at, primary_max))
+                        while state.pending and state.pending[0][1] <= replica_max:
+                            state.pending.popleft()
+                        state.lag_seconds = round(time.monotonic() - state.pending[0][0], 3) if state.pending else 0.0
+
+                if was_available and error is not None:
+                    self.logger.error(f"Replica {state.bind_key} became unavailable: {error}")
+                elif not was_available and error is None:
+                    self.logger.info(f"Replica {state.bind_key} is available")
+
+    def _run(self):
+        while True:
+            try:
+                self.check()
+            except Exception as e:
+                self.logger.error(f"Replica check failed: {str(e)}")
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+
+    def get_stats(self) -> Dict:
+        """
+        Get a snapshot of routing counters and replica states.
+
+        Returns:
+            Dict: Per-replica availability, lag, reads and failures, plus reads kept
+            on the primary and fallbacks after replica errors
+        """
+        with self._lock:
+            return {
+                'enabled': bool(self._replicas),
+                'max_lag_seconds': self.max_lag_seconds,
+                'sticky_seconds': self.sticky_seconds,
+                'primary_reads': self._primary_reads,
+                'sticky_reads': self._sticky_reads,
+                'fallbacks': self._fallbacks,
+                'replicas': [
+                    {
+                        'bind_key': state.bind_key,
+                        'available': state.available,
+                        'lag_seconds': state.lag_seconds,
+                        'checked_at': state.checked_at.isoformat() if state.checked_at else None,
+                        'last_error': state.last_error,
+                        'reads': state.reads,
+                        'failures': state.failures
+                    }
+                    for state in self._replicas
+                ]
+            }
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_replica_router() -> ReplicaRouter:
+    """Return the process-wide replica router, creating it from Config on first use."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ReplicaRouter(
+                    bind_keys=sorted(Config.SQLALCHEMY_BINDS),
+                    max_lag_seconds=Config.REPLICA_MAX_LAG_SECONDS,
+                    interval=Config.REPLICA_CHECK_INTERVAL_SECONDS,
+                    sticky_seconds=Config.REPLICA_STICKY_SECONDS,
+                    backend=get_cache_backend()
+                )
+    return _router
@@ -0,0 +1,130 @@
+import hashlib
+import logging
+import re
+import threading
+from typing import Dict, Optional
+
+from config import Config
+from services.cache_backend import CacheBackend, get_cache_backend
+
+
+class ResponseCache:
+    """Exact-match cache of generated responses, stored in the shared cache backend.
+
+    Keys are derived from the model name and the fully prepared prompt, so two
+    requests share an entry only when system prompt, history and message all
+    match after whitespace normalization; case is kept, since it can change
+    the right answer (code, acronyms, "uppercase this"). Entries live in the
+    ``response`` namespace of the backend, so with a shared backend a
+    response generated by one worker is served by all of them; capacity is
+    the backend's, and entries expire after ``ttl_seconds``.
+    """
+
+    namespace = 'response'
+    _whitespace = re.compile(r'\s+')
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: float):
+        """
+        Initialize the cache.
+
+        Args:
+            backend (CacheBackend): Store the entries are kept in
+            ttl_seconds (float): Seconds an entry stays valid after being stored
+        """
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def normalize(cls, text: str) -> str:
+        """Collapse whitespace so trivially different prompts share a key."""
+        return cls._whitespace.sub(' ', text).strip()
+
+    def make_key(self, model_name: str, prompt: str) -> str:
+        """
+        Build a cache key for a prepared prompt.
+
+        Args:
+            model_name (str): Name of the model that will answer the prompt
+            prompt (str): Prompt as produced by GeminiService._prepare_prompt
+
+        Returns:
+            str: Hex digest identifying the normalized prompt
+        """
+        raw = f"{model_name}\x00{self.normalize(prompt)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): Key from make_key
+
+        Returns:
+            Optional[str]: Cached response, or None on a miss or expired entry
+        """
+        value = self.backend.get(self.namespace, key)
+        with self._lock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return value
+
+    def set(self, key: str, value: str):
+        """
+        Store a response.
+
+        Args:
+            key (str): Key from make_key
+            value (str): Response text to cache
+        """
+        self.backend.set(self.namespace, key, value, self.ttl_seconds)
+
+    def delete(self, key: str):
+        """Remove a single entry in every worker."""
+        self.backend.invalidate(self.namespace, key)
+
+    def clear(self):
+        """Drop every cached entry in every worker."""
+        self.backend.invalidate(self.namespace)
+
+    def get_stats(self) -> Dict:
+        """
+        Get a snapshot of cache counters.
+
+        Returns:
+            Dict: Backend kind, TTL and this worker's hit/miss counts
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'backend': self.backend.kind,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0
+            }
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide response cache, creating it from Config on first use."""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache(
+                    backend=get_cache_backend(),
+                    ttl_seconds=Config.RESPONSE_CACHE_TTL_SECONDS
+                )
+    return _response_cache
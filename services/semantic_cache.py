@@ -0,0 +1,253 @@
+import logging
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np
+
+from config import Config
+from services.cache_backend import CacheBackend, get_cache_backend
+
+
+class HashingVectorizer:
+    """Local text embedder using the hashing trick over words and character trigrams.
+
+    Produces L2-normalized float32 vectors so cosine similarity is a dot
+    product. Hashing uses CRC32, so vectors are stable across processes.
+    """
+
+    _token = re.compile(r'[\w]+', re.UNICODE)
+    _stopwords = frozenset({
+        'a', 'an', 'the', 'i', 'me', 'my', 'you', 'your', 'we', 'our', 'it', 'is', 'are', 'am',
+        'do', 'does', 'did', 'to', 'of', 'in', 'on', 'for', 'and', 'or', 'can', 'could', 'would',
+        'please', 'pls', 'be', 'with', 'this', 'that'
+    })
+
+    def __init__(self, dimensions: int):
+        """
+        Initialize the vectorizer.
+
+        Args:
+            dimensions (int): Size of the hashed feature space
+        """
+        self.dimensions = dimensions
+
+    def tokens(self, text: str):
+        """Return the content words of a text, lowercased and without stopwords."""
+        words = self._token.findall(text.casefold())
+        content = [w for w in words if w not in self._stopwords]
+        # Fall back to all words for messages made only of stopwords ("can you?")
+        return content or words
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Embed a text into the hashed feature space.
+
+        Args:
+            text (str): Text to embed
+
+        Returns:
+            np.ndarray: Unit-length float32 vector (all zeros for empty text)
+        """
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for word in self.tokens(text):
+            self._add(vector, f"w:{word}", 1.0)
+            padded = f"<{word}>"
+            for i in range(len(padded) - 2):
+                self._add(vector, f"c:{padded[i:i + 3]}", 0.5)
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def _add(self, vector: np.ndarray, feature: str, weight: float):
+        digest = zlib.crc32(feature.encode('utf-8'))
+        sign = 1.0 if digest & 0x80000000 else -1.0
+        vector[digest % self.dimensions] += sign * weight
+
+
+class SemanticCache:
+    """Near-duplicate answer cache for first-turn messages.
+
+    Embeddings live in a preallocated ``(max_entries, dimensions)`` float32
+    matrix so a lookup is a single matrix-vector product. When full, the
+    least recently used slot is overwritten. The index stays in process
+    because the similarity search needs the matrix locally; clearing it is
+    broadcast through the cache backend so every worker drops its copy.
+    """
+
+    namespace = 'semantic'
+
+    def __init__(self, max_entries: int, ttl_seconds: float, threshold: float, dimensions: int = 1024,
+                 backend: Optional[CacheBackend] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of cached answers
+            ttl_seconds (float): Seconds an entry stays valid after being stored
+            threshold (float): Minimum cosine similarity for a hit (0..1)
+            dimensions (int): Embedding size
+            backend (CacheBackend): Transport for invalidations between workers, None for a single worker
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self.vectorizer = HashingVectorizer(dimensions)
+
+        self._vectors = np.zeros((max_entries, dimensions), dtype=np.float32)
+        self._expires_at = np.zeros(max_entries, dtype=np.float64)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._namespaces = np.full(max_entries, -1, dtype=np.int32)
+        self._namespace_ids = {}
+        self._responses = [None] * max_entries
+        self._size = 0
+
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+        self._latencies_ms = deque(maxlen=1000)
+
+        self.backend = backend
+        if backend is not None:
+            backend.subscribe(self.namespace, lambda key, data: self._reset())
+
+        self.logger = logging.getLogger(__name__)
+
+    def get(self, namespace: str, message: str) -> Optional[str]:
+        """
+        Find a cached answer for a message similar enough to one seen before.
+
+        Args:
+            namespace (str): Partition key, e.g. the model name
+            message (str): First-turn user message
+
+        Returns:
+            Optional[str]: Cached answer, or None if nothing is above the threshold
+        """
+        started = time.perf_counter()
+        query = self.vectorizer.embed(message)
+
+        with self._lock:
+            result = None
+            namespace_id = self._namespace_ids.get(namespace)
+            if self._size and namespace_id is not None and query.any():
+                now = time.monotonic()
+                scores = self._vectors[:self._size] @ query
+                # Expired slots and other namespaces never match
+                scores[self._expires_at[:self._size] <= now] = -1.0
+                scores[self._namespaces[:self._size] != namespace_id] = -1.0
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self._last_used[best] = now
+                    result = self._responses[best]
+
+            if result is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            self._latencies_ms.append((time.perf_counter() - started) * 1000)
+            return result
+
+    def set(self, namespace: str, message: str, response: str):
+        """
+        Store an answer for a first-turn message.
+
+        Args:
+            namespace (str): Partition key, e.g. the model name
+            message (str): First-turn user message
+            response (str): Answer to cache
+        """
+        if self.max_entries <= 0:
+            return
+
+        vector = self.vectorizer.embed(message)
+        if not vector.any():
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            if self._size < self.max_entries:
+                slot = self._size
+                self._size += 1
+            else:
+                # Prefer an expired slot, otherwise evict the least recently used one
+                expired = np.flatnonzero(self._expires_at <= now)
+                if expired.size:
+                    slot = int(expired[0])
+                else:
+                    slot = int(np.argmin(self._last_used))
+                    self._evictions += 1
+
+            self._vectors[slot] = vector
+            self._expires_at[slot] = now + self.ttl_seconds
+            self._last_used[slot] = now
+            self._namespaces[slot] = self._namespace_ids.setdefault(namespace, len(self._namespace_ids))
+            self._responses[slot] = response
+            self._stores += 1
+
+    def clear(self):
+        """Drop every cached entry in every worker."""
+        self._reset()
+        if self.backend is not None:
+            self.backend.invalidate(self.namespace)
+
+    def _reset(self):
+        with self._lock:
+            self._vectors.fill(0)
+            self._expires_at.fill(0)
+            self._last_used.fill(0)
+            self._namespaces.fill(-1)
+            self._responses = [None] * self.max_entries
+            self._size = 0
+
+    def get_stats(self) -> Dict:
+        """
+        Get a snapshot of cache counters.
+
+        Returns:
+            Dict: Size, threshold, hit rate and lookup latency figures
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            latencies = np.fromiter(self._latencies_ms, dtype=np.float64)
+            return {
+                'size': self._size,
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'threshold': self.threshold,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'stores': self._stores,
+                'evictions': self._evictions,
+                'upstream_calls_saved': self._hits,
+                'lookup_ms_avg': round(float(latencies.mean()), 3) if latencies.size else 0.0,
+                'lookup_ms_p95': round(float(np.percentile(latencies, 95)), 3) if latencies.size else 0.0
+            }
+
+
+_semantic_cache = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Return the process-wide semantic cache, creating it from Config on first use."""
+    global _semantic_cache
+    if _semantic_cache is None:
+        with _semantic_cache_lock:
+            if _semantic_cache is None:
+                _semantic_cache = SemanticCache(
+                    max_entries=Config.SEMANTIC_CACHE_MAX_ENTRIES,
+                    ttl_seconds=Config.SEMANTIC_CACHE_TTL_SECONDS,
+                    threshold=Config.SEMANTIC_CACHE_THRESHOLD,
+                    dimensions=Config.SEMANTIC_CACHE_DIMENSIONS,
+                    backend=get_cache_backend()
+                )
+    return _semantic_cache
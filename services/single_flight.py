@@ -0,0 +1,102 @@
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one upstream call.
+
+    The first caller for a key (the leader) starts the work; callers that
+    arrive while it is still running get the leader's Future instead of
+    starting their own. The key is released as soon as the work finishes, so
+    nothing is cached beyond the lifetime of the call.
+    """
+
+    def __init__(self):
+        """Initialize the single-flight group."""
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._leaders = 0
+        self._coalesced = 0
+
+        self.logger = logging.getLogger(__name__)
+
+    def submit(self, key: str, start: Callable[..., Future], *args, **kwargs) -> Future:
+        """
+        Join the in-flight call for a key, or start one.
+
+        Args:
+            key (str): Identity of the call, e.g. a hash of the prepared prompt
+            start (Callable): Function that starts the work and returns a Future
+
+        Returns:
+            Future: Future shared by every caller of the same key
+        """
+        with self._lock:
+            self._calls += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self._coalesced += 1
+                return future
+
+            self._leaders += 1
+            # Placeholder so concurrent callers join while start() runs
+            placeholder = Future()
+            self._inflight[key] = placeholder
+
+        try:
+            future = start(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            placeholder.set_exception(e)
+            raise
+
+        future.add_done_callback(lambda f: self._finish(key, placeholder, f))
+        return placeholder
+
+    def _finish(self, key: str, placeholder: Future, future: Future):
+        with self._lock:
+            if self._inflight.get(key) is placeholder:
+                del self._inflight[key]
+
+        if placeholder.done():
+            return
+        if future.cancelled():
+            placeholder.cancel()
+        elif future.exception() is not None:
+            placeholder.set_exception(future.exception())
+        else:
+            placeholder.set_result(future.result())
+
+    def get_stats(self) -> Dict:
+        """
+        Get a snapshot of coalescing counters.
+
+        Returns:
+            Dict: Total calls, upstream calls started, calls coalesced and keys in flight
+        """
+        with self._lock:
+            return {
+                'calls': self._calls,
+                'upstream_calls': self._leaders,
+                'coalesced': self._coalesced,
+                'coalesced_rate': round(self._coalesced / self._calls, 4) if self._calls else 0.0,
+                'in_flight': len(self._inflight)
+            }
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """Return the process-wide single-flight group for LLM calls."""
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight()
+    return _single_flight
@@ -0,0 +1,272 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from config import Config
+
+
+class StatsService:
+    """Admin statistics served from incrementally maintained counters.
+
+    Totals live in the ``stats_counters`` table and a background job
+    advances them every ``interval`` seconds by counting only the rows whose
+    primary key is above the counter's watermark, an index range seek rather
+    than a table scan. The 24h-active figure is recomputed every
+    ``active_refresh_seconds`` and every total is recounted in full every
+    ``reconcile_seconds``, to correct rows missed by out-of-order commits or
+    removed since. All workers run the job; updates are conditional on the
+    values they read, so concurrent workers never count a range twice and
+    only one of them claims each recompute.
+
+    :meth:`get_stats` answers from the last snapshot without touching the
+    database and reports how old it is.
+    """
+
+    # Totals advanced by primary key ranges
+    DELTA_COUNTERS = ('users', 'conversations', 'messages')
+    ACTIVE_COUNTER = 'active_conversations_24h'
+
+    def __init__(self, interval: float, active_refresh_seconds: float, reconcile_seconds: float):
+        """
+        Initialize the service.
+
+        Args:
+            interval (float): Seconds between counter updates
+            active_refresh_seconds (float): Seconds between recounts of conversations active in 24h
+            reconcile_seconds (float): Seconds between full recounts of the totals, 0 to disable
+        """
+        self.interval = interval
+        self.active_refresh_seconds = active_refresh_seconds
+        self.reconcile_seconds = reconcile_seconds
+
+        self._app = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._snapshot = None
+        self._refreshed_at = None
+        self._refreshed_monotonic = None
+        self._rows_ready = False
+        self._refreshes = 0
+        self._failures = 0
+
+        self.logger = logging.getLogger(__name__)
+
+    def start(self, app):
+        """
+        Start the background counter job, or rebind it to another app.
+
+        The job is started once per process; every call binds it to ``app``.
+        Rebinding drops the snapshot and re-checks the counter rows, since
+        the new app may use another database.
+
+        Args:
+            app (Flask): Application whose context the job runs in
+        """
+        with self._lock:
+            if app is not self._app:
+                self._app = app
+                self._snapshot = None
+                self._rows_ready = False
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='stats-counters', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                with self._app.app_context():
+                    self.refresh()
+            except Exception as e:
+                with self._lock:
+                    self._failures += 1
+                self.logger.error(f"Error refreshing stats counters: {str(e)}")
+            time.sleep(self.interval)
+
+    @staticmethod
+    def _models() -> Dict:
+        from models import Conversation, Message, User
+        return {'users': User, 'conversations': Conversation, 'messages': Message}
+
+    def refresh(self) -> Dict:
+        """
+        Bring the counters up to date and take a new snapshot; needs an app context.
+
+        Returns:
+            Dict: The new snapshot, as returned by get_stats()
+        """
+        from models import StatsCounter, db
+
+        table = StatsCounter.__table__
+        with self._refresh_lock:
+            try:
+                if not self._rows_ready:
+                    self._ensure_rows(table)
+                for name, model in self._models().items():
+                    self._advance(table, name, model)
+                self._refresh_active(table)
+                if self.reconcile_seconds > 0:
+                    for name, model in self._models().items():
+                        self._reconcile(table, name, model)
+
+                rows = db.session.execute(select(table.c.name, table.c.value, table.c.updated_at)).all()
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+            with self._lock:
+                self._snapshot = {row.name: (int(row.value), row.updated_at) for row in rows}
+                self._refreshed_at = datetime.utcnow()
+                self._refreshed_monotonic = time.monotonic()
+                self._refreshes += 1
+        return self.get_stats()
+
+    def _ensure_rows(self, table):
+        from models import db
+
+        existing = set(db.session.execute(select(table.c.name)).scalars())
+        # An old updated_at makes the first refresh compute the 24h figure immediately
+        for name in self.DELTA_COUNTERS + (self.ACTIVE_COUNTER,):
+            if name in existing:
+                continue
+            try:
+                db.session.execute(insert(table).values(
+                    name=name, value=0, watermark=0, updated_at=datetime(2000, 1, 1), reconciled_at=datetime.utcnow()
+                ))
+                db.session.commit()
+            except IntegrityError:
+                # Another worker created it first
+                db.session.rollback()
+        self._rows_ready = True
+
+    def _advance(self, table, name: str, model):
+        """Add the rows inserted since the watermark; the first run counts everything."""
+        from models import db
+
+        watermark = db.session.execute(select(table.c.watermark).where(table.c.name == name)).scalar() or 0
+        high = db.session.execute(select(func.max(model.id))).scalar() or 0
+        if high <= watermark:
+            return
+        delta = db.session.execute(
+            select(func.count()).select_from(model.__table__).where(model.id > watermark, model.id <= high)
+        ).scalar() or 0
+        db.session.execute(
+            update(table)
+            .where(table.c.name == name, table.c.watermark == watermark)
+            .values(value=table.c.value + delta, watermark=high, updated_at=datetime.utcnow())
+        )
+        db.session.commit()
+
+    def _claim(self, table, name: str, column, max_age: float) -> bool:
+        """Atomically mark a recompute as taken if the last one is older than max_age."""
+        from models import db
+
+        now = datetime.utcnow()
+        result = db.session.execute(
+            update(table)
+            .where(table.c.name == name,
+                   or_(column.is_(None), column < now - timedelta(seconds=max_age)))
+            .values({column: now})
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    def _refresh_active(self, table):
+        from models import Conversation, db
+
+        if not self._claim(table, self.ACTIVE_COUNTER, table.c.updated_at, self.active_refresh_seconds):
+            return
+        since = datetime.utcnow() - timedelta(days=1)
+        active = db.session.execute(
+            select(func.count()).select_from(Conversation.__table__).where(Conversation.updated_at >= since)
+        ).scalar() or 0
+        db.session.execute(update(table).where(table.c.name == self.ACTIVE_COUNTER).values(value=active))
+        db.session.commit()
+
+    def _reconcile(self, table, name: str, model):
+        """Recount a total up to its watermark, at most once per reconcile interval across workers."""
+        from models import db
+
+        if not self._claim(table, name, table.c.reconciled_at, self.reconcile_seconds):
+            return
+        watermark = db.session.execute(select(table.c.watermark).where(table.c.name == name)).scalar() or 0
+        total = db.session.execute(
+            select(func.count()).select_from(model.__table__).where(model.id <= watermark)
+        ).scalar() or 0
+        if name == 'messages':
+            # Archived messages left the messages table but still count
+            from models import MessageArchive
+            total += db.session.execute(select(func.sum(MessageArchive.message_count))).scalar() or 0
+        result = db.session.execute(
+            update(table)
+            .where(table.c.name == name, table.c.watermark == watermark)
+            .values(value=total)
+        )
+        db.session.commit()
+        if result.rowcount == 1:
+            self.logger.info(f"Reconciled stats counter {name}: {total}")
+
+    def get_stats(self) -> Optional[Dict]:
+        """
+        Get the counters from the last snapshot, without querying the database.
+
+        Returns:
+            Optional[Dict]: users, conversations, messages and active_conversations_24h,
+            with as_of/age_seconds for the snapshot and the time the 24h figure was
+            computed; None before the first refresh
+        """
+        with self._lock:
+            if self._snapshot is None:
+                return None
+            snapshot = self._snapshot
+            stats = {name: snapshot.get(name, (0, None))[0] for name in self.DELTA_COUNTERS + (self.ACTIVE_COUNTER,)}
+            active_at = snapshot.get(self.ACTIVE_COUNTER, (0, None))[1]
+            stats.update({
+                'as_of': self._refreshed_at.isoformat(),
+                'age_seconds': round(time.monotonic() - self._refreshed_monotonic, 1),
+                'active_conversations_24h_as_of': active_at.isoformat() if active_at else None
+            })
+            return stats
+
+    def get_job_stats(self) -> Dict:
+        """
+        Get counters about the background job itself.
+
+        Returns:
+            Dict: Intervals, refresh count, failures and last refresh time
+        """
+        with self._lock:
+            return {
+                'running': self._thread is not None,
+                'interval_seconds': self.interval,
+                'active_refresh_seconds': self.active_refresh_seconds,
+                'reconcile_seconds': self.reconcile_seconds,
+                'refreshes': self._refreshes,
+                'failures': self._failures,
+                'refreshed_at': self._refreshed_at.isoformat() if self._refreshed_at else None
+            }
+
+
+_stats_service = None
+_stats_service_lock = threading.Lock()
+
+
+def get_stats_service() -> StatsService:
+    """Return the process-wide stats service, creating it from Config on first use."""
+    global _stats_service
+    if _stats_service is None:
+        with _stats_service_lock:
+            if _stats_service is None:
+                _stats_service = StatsService(
+                    interval=Config.STATS_REFRESH_SECONDS,
+                    active_refresh_seconds=Config.STATS_ACTIVE_REFRESH_SECONDS,
+                    reconcile_seconds=Config.STATS_RECONCILE_SECONDS
+                )
+    return _stats_service
@@ -0,0 +1,145 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+
+
+class SummaryService:
+    """Maintains rolling summaries of long conversations.
+
+    Older turns are folded into a stored summary in the background, a batch at
+    a time, while the newest ``SUMMARY_KEEP_RECENT_MESSAGES`` stay verbatim.
+    Each refresh extends the previous summary with only the newly folded
+    messages, so the work per refresh does not grow with conversation length.
+    """
+
+    def __init__(self, gemini_service, db_service):
+        """
+        Initialize the summary service.
+
+        Args:
+            gemini_service (GeminiService): Service used to write summaries
+            db_service (DatabaseService): Service used to read messages and store summaries
+        """
+        self.gemini_service = gemini_service
+        self.db_service = db_service
+
+        self._pool = ThreadPoolExecutor(max_workers=Config.SUMMARY_WORKERS, thread_name_prefix='summary')
+        self._pending = set()
+        self._lock = threading.Lock()
+
+        self.logger = logging.getLogger(__name__)
+
+    def get_prompt_context(self, conversation_id: int) -> Tuple[Optional[str], int]:
+        """
+        Get the stored summary to prepend to a prompt.
+
+        Args:
+            conversation_id (int): Conversation ID
+
+        Returns:
+            Tuple[Optional[str], int]: Summary text (or None) and the ID of the
+            newest message it covers (0 when there is no summary)
+        """
+        if not Config.SUMMARY_ENABLED:
+            return None, 0
+
+        summary = self.db_service.get_conversation_summary(conversation_id)
+        if summary is None:
+            return None, 0
+        return summary.content, summary.last_message_id
+
+    @staticmethod
+    def unsummarized(conversation_history: List[Dict], last_message_id: int) -> List[Dict]:
+        """Drop history messages that are already covered by the summary."""
+        if not last_message_id:
+            return conversation_history
+        return [msg for msg in conversation_history if msg.get('id', 0) > last_message_id]
+
+    def schedule_refresh(self, conversation_id: int):
+        """
+        Queue a background summary refresh for a conversation.
+
+        Must be called inside an application context. Refreshes already queued
+        or running for the same conversation are not duplicated.
+
+        Args:
+            conversation_id (int): Conversation ID
+        """
+        if not Config.SUMMARY_ENABLED:
+            return
+
+        from flask import current_app
+        app = current_app._get_current_object()
+
+        with self._lock:
+            if conversation_id in self._pending:
+                return
+            self._pending.add(conversation_id)
+
+        try:
+            self._pool.submit(self._run_refresh, app, conversation_id)
+        except Exception as e:
+            with self._lock:
+                self._pending.discard(conversation_id)
+            self.logger.error(f"Error scheduling summary refresh: {str(e)}")
+
+    def _run_refresh(self, app, conversation_id: int):
+        try:
+            with app.app_context():
+                # Long legacy conversations catch up one batch per iteration
+                for _ in range(Config.SUMMARY_MAX_BATCHES_PER_RUN):
+                    if not self.refresh(conversation_id):
+                        break
+        except Exception as e:
+            self.logger.error(f"Summary refresh failed for conversation {conversation_id}: {str(e)}")
+        finally:
+            with self._lock:
+                self._pending.discard(conversation_id)
+
+    def refresh(self, conversation_id: int) -> bool:
+        """
+        Fold the next batch of older messages into the conversation summary.
+
+        Args:
+            conversation_id (int): Conversation ID
+
+        Returns:
+            bool: True if the summary was extended, False if nothing was due
+        """
+        summary = self.db_service.get_conversation_summary(conversation_id)
+        last_message_id = summary.last_message_id if summary else 0
+        previous = summary.content if summary else None
+        folded_so_far = summary.message_count if summary else 0
+
+        unsummarized_count = self.db_service.count_messages_after(conversation_id, last_message_id)
+        foldable = min(
+            unsummarized_count - Config.SUMMARY_KEEP_RECENT_MESSAGES,
+            Config.SUMMARY_BATCH_MESSAGES
+        )
+        if foldable < Config.SUMMARY_TRIGGER_MESSAGES:
+            return False
+
+        messages = self.db_service.get_messages_after(conversation_id, last_message_id, foldable)
+        if not messages:
+            return False
+
+        content = self.gemini_service.summarize_conversation(previous, [msg.to_dict() for msg in messages])
+        if not content:
+            return False
+
+        saved = self.db_service.save_conversation_summary(
+            conversation_id,
+            content,
+            messages[-1].id,
+            folded_so_far + len(messages),
+            self.gemini_service.count_tokens(content)
+        )
+        if saved:
+            self.logger.info(
+                f"Summarized {len(messages)} messages of conversation {conversation_id} "
+                f"(up to message {messages[-1].id})"
+            )
+        return saved is not None
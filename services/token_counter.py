@@ -0,0 +1,135 @@
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class TokenCounter:
+    """Local token count approximation calibrated against Gemini usage metadata.
+
+    The raw estimate mirrors how SentencePiece-style tokenizers split text:
+    letter runs cost one token per ~8 characters, every digit and every
+    symbol or non-Latin character costs one token. Observed
+    ``usage_metadata.prompt_token_count`` values feed an exponentially
+    weighted correction factor, and raw estimates are memoized per text.
+    """
+
+    _pieces = re.compile(r'[A-Za-z]+|\d|[^\sA-Za-z\d]')
+
+    def __init__(self, memo_size: int = 4096, smoothing: float = 0.1):
+        """
+        Initialize the counter.
+
+        Args:
+            memo_size (int): Number of raw estimates to memoize
+            smoothing (float): Weight of each new observation in the correction factor
+        """
+        self.memo_size = memo_size
+        self.smoothing = smoothing
+        self.factor = 1.0
+
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self._observations = 0
+
+        self.logger = logging.getLogger(__name__)
+
+    def raw_count(self, text: str) -> int:
+        """
+        Estimate tokens for a text before calibration.
+
+        Args:
+            text (str): Text to count
+
+        Returns:
+            int: Uncalibrated token estimate
+        """
+        if not text:
+            return 0
+
+        key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                return cached
+
+        count = 0
+        for piece in self._pieces.findall(text):
+            if piece[0].isascii() and piece[0].isalpha():
+                count += 1 + (len(piece) - 1) // 8
+            else:
+                count += 1
+
+        with self._lock:
+            self._memo[key] = count
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return count
+
+    def count(self, text: str) -> int:
+        """
+        Estimate tokens for a text using the calibrated factor.
+
+        Args:
+            text (str): Text to count
+
+        Returns:
+            int: Calibrated token estimate (0 only for empty text)
+        """
+        raw = self.raw_count(text)
+        if raw == 0:
+            return 0
+        return max(1, round(raw * self.factor))
+
+    def observe(self, text: str, actual_tokens: Optional[int]):
+        """
+        Calibrate against a token count reported by the model.
+
+        Args:
+            text (str): Text the model counted (e.g. the prompt)
+            actual_tokens (int): Token count reported in usage metadata
+        """
+        if not actual_tokens:
+            return
+        raw = self.raw_count(text)
+        if raw == 0:
+            return
+
+        ratio = min(max(actual_tokens / raw, 0.25), 4.0)
+        with self._lock:
+            if self._observations == 0:
+                self.factor = ratio
+            else:
+                self.factor += self.smoothing * (ratio - self.factor)
+            self._observations += 1
+
+    def get_stats(self) -> Dict:
+        """
+        Get a snapshot of calibration state.
+
+        Returns:
+            Dict: Correction factor, observation count and memo size
+        """
+        with self._lock:
+            return {
+                'factor': round(self.factor, 4),
+                'observations': self._observations,
+                'memoized': len(self._memo)
+            }
+
+
+_token_counter = None
+_token_counter_lock = threading.Lock()
+
+
+def get_token_counter() -> TokenCounter:
+    """Return the process-wide token counter."""
+    global _token_counter
+    if _token_counter is None:
+        with _token_counter_lock:
+            if _token_counter is None:
+                _token_counter = TokenCounter()
+    return _token_counter
@@ -143,8 +143,15 @@ class ChatApp {
 
     async loadConversations() {
         try {
-            const response = await App.apiCall('/api/chat/conversations');
-            this.conversations = response.conversations;
+            // The list is paginated; follow the cursors so older conversations stay listed
+            let response = await App.apiCall('/api/chat/conversations');
+            let conversations = response.conversations;
+            while (response.pagination && response.pagination.has_more) {
+                const before = encodeURIComponent(response.pagination.before_cursor);
+                response = await App.apiCall(`/api/chat/conversations?before=${before}`);
+                conversations = conversations.concat(response.conversations);
+            }
+            this.conversations = conversations;
             this.renderConversationList();
         } catch (error) {
             console.error('Error loading conversations:', error);
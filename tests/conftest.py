@@ -1,7 +1,24 @@
+import os
+
+# Tests are answered by the offline stub provider, never by a real LLM
+os.environ['LLM_PROVIDERS'] = 'stub'
+# Threads share the in-memory database's single connection, so a background
+# check's rollback or a log batch's commit could land inside a test's
+# transaction; keep the periodic jobs idle and flush/refresh explicitly, and
+# leave out the summaries refreshed in a pool after each chat turn
+for interval in ('DB_HEALTH_CHECK_INTERVAL_SECONDS', 'HEALTH_CHECK_INTERVAL_SECONDS',
+                 'STATS_REFRESH_SECONDS', 'SYSTEM_LOG_FLUSH_SECONDS'):
+    os.environ[interval] = '3600'
+os.environ['SUMMARY_ENABLED'] = 'False'
+
 import pytest
 from app import create_app
 from models import db as _db
 from models import User, Conversation, Message
+from services.history_cache import get_history_cache
+from services.log_writer import get_log_writer
+from services.response_cache import get_response_cache
+from services.semantic_cache import get_semantic_cache
 import bcrypt
 
 
@@ -10,9 +27,16 @@ def app():
     """Create application for testing."""
     app = create_app('testing')
     
+    # Process-wide caches outlive each test's in-memory database, whose ids start over
+    get_history_cache().clear()
+    get_response_cache().clear()
+    get_semantic_cache().clear()
+    
     with app.app_context():
         _db.create_all()
         yield app
+        # Write queued log events while this test's database still exists
+        get_log_writer().flush()
         _db.drop_all()
 
 
@@ -29,6 +53,14 @@ def client(app):
     return app.test_client()
 
 
+@pytest.fixture
+def auth_client(client):
+    """Test client logged in as a freshly registered user."""
+    response = client.post('/api/chat/register', json={'username': 'alice', 'password': 'secret'})
+    assert response.status_code == 200
+    return client
+
+
 @pytest.fixture
 def runner(app):
     """Create test runner."""
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import SystemLog, User
+
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def logs(db):
+    """Five logs a minute apart, alternating INFO/ERROR, all but the first from the chat module."""
+    for index in range(5):
+        db.session.add(SystemLog(
+            level='INFO' if index % 2 == 0 else 'ERROR',
+            message=f'event {index}',
+            module='auth' if index == 0 else 'chat',
+            user_id=index % 2 + 1,
+            timestamp=START + timedelta(minutes=index)
+        ))
+    db.session.commit()
+
+
+@pytest.fixture
+def users(db):
+    for index, username in enumerate(['a_b', 'axb', 'alice', 'bob']):
+        user = User(username=username, email=f'{username}@example.com', password='x')
+        user.created_at = START + timedelta(days=index)
+        db.session.add(user)
+    db.session.commit()
+
+
+def messages(response):
+    assert response.status_code == 200
+    return [log['message'] for log in response.get_json()['logs']]
+
+
+def test_logs_page_newest_first(client, logs):
+    first = client.get('/api/admin/logs', query_string={'limit': 2})
+    assert messages(first) == ['event 4', 'event 3']
+
+    cursor = first.get_json()['pagination']['before_cursor']
+    rest = client.get('/api/admin/logs', query_string={'limit': 10, 'before': cursor})
+    assert messages(rest) == ['event 2', 'event 1', 'event 0']
+    assert not rest.get_json()['pagination']['has_more']
+
+
+def test_logs_filters(client, logs):
+    assert messages(client.get('/api/admin/logs', query_string={'level': 'ERROR'})) == ['event 3', 'event 1']
+    assert messages(client.get('/api/admin/logs', query_string={'module': 'auth'})) == ['event 0']
+    assert messages(client.get('/api/admin/logs', query_string={'user_id': 2})) == ['event 3', 'event 1']
+    # Times with an offset are converted to UTC; the window is [since, until)
+    window = {'since': '2024-01-01T03:01:00+03:00', 'until': '2024-01-01T00:03:00Z'}
+    assert messages(client.get('/api/admin/logs', query_string=window)) == ['event 2', 'event 1']
+
+
+def test_logs_return_only_the_requested_fields(client, logs):
+    response = client.get('/api/admin/logs', query_string={'fields': 'level', 'limit': 1})
+
+    assert set(response.get_json()['logs'][0]) == {'id', 'timestamp', 'level'}
+
+
+@pytest.mark.parametrize('query', [{'fields': 'level,password'}, {'since': 'yesterday'}, {'before': 'nope'}])
+def test_logs_reject_bad_arguments(client, logs, query):
+    response = client.get('/api/admin/logs', query_string=query)
+
+    assert response.status_code == 400
+    assert response.get_json()['logs'] == []
+
+
+def test_users_page_and_prefix_filter(client, users):
+    response = client.get('/api/admin/users', query_string={'limit': 3, 'fields': 'username'})
+    page = response.get_json()
+    assert [user['username'] for user in page['users']] == ['bob', 'alice', 'axb']
+    assert set(page['users'][0]) == {'id', 'created_at', 'username'}
+    assert page['pagination']['has_more']
+
+    # '_' is matched literally, not as a LIKE wildcard
+    prefixed = client.get('/api/admin/users', query_string={'username': 'a_'}).get_json()
+    assert [user['username'] for user in prefixed['users']] == ['a_b']
+
+
+def test_users_reject_unknown_fields(client, users):
+    assert client.get('/api/admin/users', query_string={'fields': 'password'}).status_code == 400
@@ -0,0 +1,142 @@
+import threading
+import time
+import uuid
+
+import pytest
+
+from services.cache_backend import RedisBackend, SQLiteBackend
+
+
+def wait_for(event, timeout=2.0):
+    assert event.wait(timeout), 'broadcast was not delivered'
+
+
+def subscribe(backend, namespace):
+    """Subscribe a handler that records what it receives and signals each delivery."""
+    received = []
+    delivered = threading.Event()
+
+    def handler(key, data):
+        received.append((key, data))
+        delivered.set()
+
+    backend.subscribe(namespace, handler)
+    return received, delivered
+
+
+@pytest.fixture
+def sqlite_pair(tmp_path):
+    """Two backends on one file, as two workers of a host would open it."""
+    path = str(tmp_path / 'cache.db')
+    return (SQLiteBackend(path, max_entries=100, poll_seconds=0.02),
+            SQLiteBackend(path, max_entries=100, poll_seconds=0.02))
+
+
+def test_sqlite_entries_are_shared_and_expire(sqlite_pair):
+    first, second = sqlite_pair
+
+    first.set('response', 'k', {'text': 'hello'}, ttl_seconds=60)
+    first.set('response', 'short', 'soon gone', ttl_seconds=0.05)
+    assert second.get('response', 'k') == {'text': 'hello'}
+    assert second.get('response', 'short') == 'soon gone'
+
+    time.sleep(0.1)
+    assert second.get('response', 'short') is None
+
+    second.delete('response', 'k')
+    assert first.get('response', 'k') is None
+    assert (first.get_stats()['hits'], first.get_stats()['misses']) == (0, 1)
+
+
+def test_sqlite_invalidation_reaches_the_other_worker(sqlite_pair):
+    first, second = sqlite_pair
+    own, own_delivered = subscribe(first, 'history')
+    received, delivered = subscribe(second, 'history')
+
+    first.set('history', 'conv-1', ['message'], ttl_seconds=60)
+    first.invalidate('history', 'conv-1')
+
+    wait_for(delivered)
+    assert received == [('conv-1', None)]
+    assert second.get('history', 'conv-1') is None
+
+    delivered.clear()
+    first.publish('history', 'conv-2', {'appended': 2})
+    wait_for(delivered)
+    assert received[-1] == ('conv-2', {'appended': 2})
+
+    # Broadcasts never come back to the sender
+    time.sleep(0.1)
+    assert own == []
+    assert second.get_stats()['invalidations_received'] == 2
+
+
+def test_sqlite_prunes_the_invalidation_log_as_it_publishes(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'cache.db'), max_entries=100, poll_seconds=60)
+    conn = backend._connect()
+    conn.execute(
+        'INSERT INTO cache_invalidations (origin, payload, created_at) VALUES (?, ?, ?)',
+        ('gone-worker', '{}', time.time() - backend.invalidation_retention_seconds - 1)
+    )
+
+    for index in range(backend.prune_invalidations_every - 1):
+        backend.publish('history', str(index), {'n': index})
+    assert conn.execute('SELECT COUNT(*) FROM cache_invalidations').fetchone()[0] == backend.prune_invalidations_every
+
+    backend.publish('history', 'last', {'n': 'last'})
+    origins = {row[0] for row in conn.execute('SELECT origin FROM cache_invalidations')}
+    # Only the expired row is pruned; recent broadcasts stay for slower pollers
+    assert origins == {backend.origin}
+    assert conn.execute('SELECT COUNT(*) FROM cache_invalidations').fetchone()[0] == backend.prune_invalidations_every
+
+
+@pytest.fixture
+def redis_pair():
+    """Two backends sharing one fake Redis server."""
+    fakeredis = pytest.importorskip('fakeredis')
+    server = fakeredis.FakeServer()
+    prefix = f"test-{uuid.uuid4().hex[:8]}"
+    return (RedisBackend(prefix=prefix, client=fakeredis.FakeStrictRedis(server=server)),
+            RedisBackend(prefix=prefix, client=fakeredis.FakeStrictRedis(server=server)))
+
+
+def test_redis_entries_are_shared_and_expire(redis_pair):
+    first, second = redis_pair
+
+    first.set('response', 'k', {'text': 'hello'}, ttl_seconds=60)
+    first.set('response', 'short', 'soon gone', ttl_seconds=0.05)
+    first.set('semantic', 'k', 'other namespace', ttl_seconds=60)
+    assert second.get('response', 'k') == {'text': 'hello'}
+    assert first.client.get(f"{first.prefix}:response:k") is not None
+
+    time.sleep(0.1)
+    assert second.get('response', 'short') is None
+
+    second.clear('response')
+    assert first.get('response', 'k') is None
+    assert first.get('semantic', 'k') == 'other namespace'
+
+
+def test_redis_invalidation_reaches_the_other_worker(redis_pair):
+    first, second = redis_pair
+    own, _ = subscribe(first, 'history')
+    received, delivered = subscribe(second, 'history')
+    # The listener thread subscribes asynchronously; wait until it is on the channel
+    deadline = time.monotonic() + 2.0
+    while first.client.pubsub_numsub(first.channel)[0][1] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    first.set('history', 'conv-1', ['message'], ttl_seconds=60)
+    first.invalidate('history', 'conv-1')
+
+    wait_for(delivered)
+    assert received == [('conv-1', None)]
+    assert second.get('history', 'conv-1') is None
+
+    delivered.clear()
+    first.invalidate('history')
+    wait_for(delivered)
+    assert received[-1] == (None, None)
+
+    time.sleep(0.1)
+    assert own == []
@@ -0,0 +1,97 @@
+import json
+
+from models import Conversation, Message
+
+
+def parse_frames(body):
+    """Split a Server-Sent Events body into (event, data) pairs."""
+    frames = []
+    for block in body.split('\n\n'):
+        if not block.strip():
+            continue
+        fields = dict(line.split(': ', 1) for line in block.split('\n'))
+        frames.append((fields['event'], json.loads(fields['data'])))
+    return frames
+
+
+def read_frames(response, count):
+    """Read the first frames of a streamed response without consuming the rest."""
+    body = ''
+    chunks = iter(response.response)
+    while body.count('\n\n') < count:
+        body += next(chunks).decode('utf-8')
+    return parse_frames(body)
+
+
+def test_stream_sends_start_chunks_and_done(auth_client):
+    response = auth_client.post('/api/chat/stream', json={'message': 'Hello bot', 'use_cache': False})
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+    frames = parse_frames(response.get_data(as_text=True))
+    events = [event for event, _ in frames]
+    assert events[0] == 'start' and events[-1] == 'done'
+    assert set(events[1:-1]) == {'chunk'} and len(events) > 3
+
+    start, done = frames[0][1], frames[-1][1]
+    assert start['mode'] == done['mode'] == 'normal'
+    assert done['conversation_id'] == start['conversation_id']
+    assert isinstance(done['message_id'], int)
+
+    text = ''.join(data['text'] for event, data in frames if event == 'chunk')
+    assert text.startswith('[offline ') and text.endswith('You said: Hello bot')
+
+
+def test_stream_saves_the_turn_on_completion(auth_client, db):
+    frames = parse_frames(auth_client.post(
+        '/api/chat/stream', json={'message': 'Hello bot', 'use_cache': False}
+    ).get_data(as_text=True))
+    done = frames[-1][1]
+    text = ''.join(data['text'] for event, data in frames if event == 'chunk')
+
+    messages = Message.query.filter_by(conversation_id=done['conversation_id']).order_by(Message.id).all()
+    assert [(m.sender_type, m.content) for m in messages] == [('user', 'Hello bot'), ('bot', text)]
+    assert messages[1].id == done['message_id']
+
+    conversation = db.session.get(Conversation, done['conversation_id'])
+    assert conversation.message_count == 2
+    assert conversation.last_message_preview == text[:len(conversation.last_message_preview)]
+
+
+def test_stream_continues_an_existing_conversation(auth_client):
+    first = parse_frames(auth_client.post(
+        '/api/chat/stream', json={'message': 'Hello bot', 'use_cache': False}
+    ).get_data(as_text=True))
+    conversation_id = first[0][1]['conversation_id']
+
+    second = parse_frames(auth_client.post(
+        '/api/chat/stream', json={'message': 'Again', 'conversation_id': conversation_id, 'use_cache': False}
+    ).get_data(as_text=True))
+
+    assert second[0][1]['conversation_id'] == conversation_id
+    assert Message.query.filter_by(conversation_id=conversation_id).count() == 4
+
+
+def test_client_disconnect_saves_the_partial_answer(auth_client, db):
+    response = auth_client.post(
+        '/api/chat/stream', json={'message': 'Hello bot', 'use_cache': False}, buffered=False
+    )
+    frames = read_frames(response, 3)
+    assert [event for event, _ in frames] == ['start', 'chunk', 'chunk']
+
+    # Closing the response is what the server sees when the client goes away
+    response.close()
+
+    conversation_id = frames[0][1]['conversation_id']
+    partial = ''.join(data['text'] for _, data in frames[1:]).strip()
+    messages = Message.query.filter_by(conversation_id=conversation_id).order_by(Message.id).all()
+    assert [(m.sender_type, m.content) for m in messages] == [('user', 'Hello bot'), ('bot', partial)]
+    assert not partial.endswith('Hello bot')
+
+
+def test_stream_requires_a_message_and_a_login(client, auth_client):
+    assert auth_client.post('/api/chat/stream', json={'message': '  '}).status_code == 400
+    auth_client.post('/api/chat/logout')
+    assert client.post('/api/chat/stream', json={'message': 'Hello'}).status_code == 401
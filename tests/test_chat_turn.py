@@ -0,0 +1,62 @@
+import pytest
+
+from models import Conversation, Message
+from services.database_service import DatabaseService
+
+
+@pytest.fixture
+def db_service(app):
+    return DatabaseService()
+
+
+def test_new_conversation_is_created_with_both_messages(db, db_service, sample_user):
+    conversation_id, user_message_id, bot_message_id = db_service.save_chat_turn(
+        sample_user.id, None, 'Hello', 'Hi there', user_token_count=1, bot_token_count=2
+    )
+
+    conversation = db.session.get(Conversation, conversation_id)
+    assert conversation.user_id == sample_user.id
+    assert conversation.message_count == 2
+    assert conversation.last_message_preview == 'Hi there'
+
+    messages = Message.query.filter_by(conversation_id=conversation_id).order_by(Message.id).all()
+    assert [(m.id, m.sender_type, m.content) for m in messages] == [
+        (user_message_id, 'user', 'Hello'),
+        (bot_message_id, 'bot', 'Hi there')
+    ]
+
+
+def test_existing_conversation_is_bumped(db, db_service, sample_user):
+    conversation_id, _, _ = db_service.save_chat_turn(sample_user.id, None, 'Hello', 'Hi there')
+    before = db.session.get(Conversation, conversation_id).updated_at
+
+    turn = db_service.save_chat_turn(sample_user.id, conversation_id, 'Again', None)
+
+    assert turn[0] == conversation_id
+    assert turn[2] is None
+    db.session.expire_all()
+    conversation = db.session.get(Conversation, conversation_id)
+    assert conversation.message_count == 3
+    assert conversation.last_message_preview == 'Again'
+    assert conversation.updated_at >= before
+
+
+def test_failed_turn_writes_nothing(db, db_service, sample_user):
+    conversation_id, _, _ = db_service.save_chat_turn(sample_user.id, None, 'Hello', 'Hi there')
+
+    # A NULL user message violates NOT NULL at flush time, after the conversation UPDATE
+    assert db_service.save_chat_turn(sample_user.id, conversation_id, None, 'orphan reply') is None
+
+    db.session.expire_all()
+    assert db.session.get(Conversation, conversation_id).message_count == 2
+    assert Message.query.filter_by(conversation_id=conversation_id).count() == 2
+
+
+def test_send_route_saves_the_turn(auth_client, db):
+    response = auth_client.post('/api/chat/send', json={'message': 'Hello bot'})
+    assert response.status_code == 200
+    conversation_id = response.get_json()['conversation_id']
+
+    messages = Message.query.filter_by(conversation_id=conversation_id).order_by(Message.id).all()
+    assert [m.sender_type for m in messages] == ['user', 'bot']
+    assert messages[0].content == 'Hello bot'
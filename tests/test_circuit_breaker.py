@@ -0,0 +1,113 @@
+import threading
+import time
+
+from services.circuit_breaker import CircuitBreaker
+
+
+def make_breaker(**overrides):
+    options = {
+        'name': 'upstream',
+        'failure_rate_threshold': 0.5,
+        'slow_call_seconds': 1.0,
+        'slow_call_rate_threshold': 0.5,
+        'window_size': 4,
+        'min_calls': 2,
+        'open_seconds': 0.05,
+        'half_open_max_calls': 2
+    }
+    options.update(overrides)
+    return CircuitBreaker(**options)
+
+
+def test_closed_open_half_open_closed():
+    breaker = make_breaker()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_success(0.01)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    stats = breaker.get_stats()
+    assert stats['times_opened'] == 1
+    assert stats['rejected'] == 1
+
+
+def test_stays_closed_below_min_calls():
+    breaker = make_breaker(min_calls=3)
+    breaker.record_failure()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_slow_calls_open_the_circuit():
+    breaker = make_breaker()
+    breaker.record_success(2.0)
+    breaker.record_success(2.0)
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_failed_trial_call_reopens():
+    breaker = make_breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    assert breaker.allow_request()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.get_stats()['times_opened'] == 2
+
+
+def test_half_open_admits_only_the_trial_calls():
+    breaker = make_breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    assert breaker.can_attempt()
+    assert breaker.allow_request()
+    assert breaker.allow_request()
+    assert not breaker.can_attempt()
+    assert not breaker.allow_request()
+
+
+def test_can_attempt_takes_no_permit():
+    breaker = make_breaker(half_open_max_calls=1)
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    for _ in range(3):
+        assert breaker.can_attempt()
+    assert breaker.allow_request()
+
+
+def test_successful_probe_moves_to_half_open():
+    probed = threading.Event()
+
+    def probe():
+        probed.set()
+        return True
+
+    breaker = make_breaker(probe=probe)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    assert probed.wait(1.0)
+    deadline = time.monotonic() + 1.0
+    while breaker.state != CircuitBreaker.HALF_OPEN and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
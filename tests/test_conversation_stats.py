@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+import backfill_conversation_stats
+from models import Conversation, Message
+from services.database_service import DatabaseService
+
+
+@pytest.fixture
+def db_service(app):
+    return DatabaseService()
+
+
+def stats(db, conversation_id):
+    db.session.expire_all()
+    conversation = db.session.get(Conversation, conversation_id)
+    return conversation.message_count, conversation.last_message_at, conversation.last_message_preview
+
+
+def test_chat_turns_keep_the_stats_current(db, db_service, sample_user):
+    received_at = datetime.utcnow() - timedelta(seconds=5)
+    conversation_id, _, _ = db_service.save_chat_turn(sample_user.id, None, 'Hello', 'Hi there')
+    _, _, bot_id = db_service.save_chat_turn(
+        sample_user.id, conversation_id, 'Tell me more', 'Line one\n\n  line   two'
+    )
+
+    count, last_at, preview = stats(db, conversation_id)
+    assert count == 4
+    assert last_at == db.session.get(Message, bot_id).timestamp
+    assert preview == 'Line one line two'
+
+    # A turn without a reply ends on the user message and its receive time
+    _, user_id, _ = db_service.save_chat_turn(
+        sample_user.id, conversation_id, 'x' * 500, None, user_timestamp=received_at
+    )
+    count, last_at, preview = stats(db, conversation_id)
+    assert count == 5
+    assert last_at == received_at
+    assert len(preview) == Conversation.PREVIEW_LENGTH and preview.endswith('…')
+
+
+def test_a_failed_turn_leaves_the_stats_alone(db, db_service, sample_user):
+    conversation_id, _, _ = db_service.save_chat_turn(sample_user.id, None, 'Hello', 'Hi there')
+    before = stats(db, conversation_id)
+
+    assert db_service.save_chat_turn(sample_user.id, conversation_id, None, 'orphan reply') is None
+    assert stats(db, conversation_id) == before
+
+
+def stale_conversations(db, db_service, user_id):
+    """Conversations whose stored stats no longer match their messages."""
+    ids = []
+    for index in range(5):
+        conversation_id, _, _ = db_service.save_chat_turn(user_id, None, f"question {index}", f"answer {index}")
+        ids.append(conversation_id)
+    # Messages written behind save_chat_turn's back, as legacy code did
+    db.session.add(Message(conversation_id=ids[1], content='added later', sender_type='user'))
+    db.session.query(Message).filter(Message.conversation_id == ids[2]).delete()
+    db.session.execute(
+        update(Conversation).where(Conversation.id.in_(ids))
+        .values(message_count=99, last_message_preview='stale', updated_at=datetime(2024, 1, 1))
+    )
+    db.session.commit()
+    return ids
+
+
+def test_backfill_recomputes_the_stats_from_messages(db, db_service, sample_user):
+    ids = stale_conversations(db, db_service, sample_user.id)
+
+    assert db_service.backfill_conversation_stats(batch_size=2) == 5
+
+    added = Message.query.filter_by(conversation_id=ids[1], content='added later').one()
+    assert stats(db, ids[0])[0::2] == (2, 'answer 0')
+    assert stats(db, ids[1]) == (3, added.timestamp, 'added later')
+    assert stats(db, ids[2]) == (0, None, None)
+    # Recomputing the stats is not activity
+    assert {c.updated_at for c in Conversation.query.filter(Conversation.id.in_(ids))} == {datetime(2024, 1, 1)}
+
+
+def test_backfill_skips_archived_conversations(db, db_service, sample_user):
+    ids = stale_conversations(db, db_service, sample_user.id)
+    db.session.execute(update(Conversation).where(Conversation.id == ids[0]).values(archived_at=datetime.utcnow()))
+    db.session.commit()
+
+    assert db_service.backfill_conversation_stats(batch_size=500) == 4
+    assert stats(db, ids[0])[0::2] == (99, 'stale')
+    assert stats(db, ids[3])[0::2] == (2, 'answer 3')
+
+
+def test_backfill_script(app, db, db_service, sample_user, monkeypatch, capsys):
+    ids = stale_conversations(db, db_service, sample_user.id)
+    monkeypatch.setattr(backfill_conversation_stats, 'create_app', lambda: app)
+
+    assert backfill_conversation_stats.backfill_conversation_stats(batch_size=3) is True
+
+    assert 'for 5 conversations' in capsys.readouterr().out
+    assert stats(db, ids[4])[0::2] == (2, 'answer 4')
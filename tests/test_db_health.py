@@ -0,0 +1,79 @@
+import time
+
+from flask import Flask
+from sqlalchemy.exc import OperationalError
+
+from services.db_health import DatabaseHealthMonitor
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'condition not reached in time'
+        time.sleep(0.01)
+
+
+def counting_monitor(min_recheck_seconds):
+    """Monitor whose checks are recorded instead of run against a database."""
+    monitor = DatabaseHealthMonitor(interval=3600, min_recheck_seconds=min_recheck_seconds)
+    checks = []
+
+    def check():
+        checks.append(time.monotonic())
+        monitor._last_check = checks[-1]
+        return True
+
+    monitor.check = check
+    monitor.start(Flask(__name__))
+    wait_until(lambda: len(checks) == 1)
+    return monitor, checks
+
+
+def test_report_failure_wakes_an_early_check():
+    monitor, checks = counting_monitor(min_recheck_seconds=0)
+
+    monitor.report_failure(RuntimeError('server has gone away'))
+
+    # Far sooner than the hour-long interval
+    wait_until(lambda: len(checks) == 2)
+
+
+def test_repeated_failures_are_debounced():
+    monitor, checks = counting_monitor(min_recheck_seconds=0.2)
+
+    for _ in range(20):
+        monitor.report_failure()
+        time.sleep(0.01)
+    time.sleep(0.5)
+
+    # A burst of reports costs at most one check per min_recheck_seconds
+    assert 2 <= len(checks) <= 3
+    gaps = [later - earlier for earlier, later in zip(checks, checks[1:])]
+    assert all(gap >= 0.19 for gap in gaps)
+
+
+def test_failing_select_flips_the_status(app, db, monkeypatch):
+    monitor = DatabaseHealthMonitor(interval=3600, min_recheck_seconds=0)
+    # Bound without starting the loop, so only the checks below run
+    monitor._app = app
+
+    assert monitor.check() is True
+    assert monitor.is_available() is True
+
+    def unreachable(*args, **kwargs):
+        raise OperationalError('SELECT 1', {}, Exception('connection refused'))
+
+    monkeypatch.setattr(db.session, 'execute', unreachable)
+    assert monitor.check() is False
+    assert monitor.check() is False
+
+    status = monitor.get_status()
+    assert status['available'] is False
+    assert status['consecutive_failures'] == 2
+    assert 'connection refused' in status['last_error']
+    assert status['checked_at'] is not None
+
+    monkeypatch.undo()
+    assert monitor.check() is True
+    status = monitor.get_status()
+    assert (status['available'], status['consecutive_failures'], status['last_error']) == (True, 0, None)
@@ -0,0 +1,89 @@
+import gzip
+import json
+
+import pytest
+
+from models import User
+from services.database_service import DatabaseService
+from services.ndjson_export import ndjson_chunks
+
+
+@pytest.fixture
+def conversations(auth_client, db):
+    """Two conversations of the logged-in user and one of another user."""
+    db_service = DatabaseService()
+    alice = User.query.filter_by(username='alice').one()
+    bob = User(username='bob', email='bob@example.com', password='x')
+    db.session.add(bob)
+    db.session.commit()
+
+    first, _, _ = db_service.save_chat_turn(alice.id, None, 'Hello', 'Hi there')
+    db_service.save_chat_turn(alice.id, first, 'How are you?', 'Fine')
+    second, _, _ = db_service.save_chat_turn(alice.id, None, 'Second chat', None)
+    other, _, _ = db_service.save_chat_turn(bob.id, None, 'Private', 'Reply')
+    return first, second, other
+
+
+def records(body):
+    return [json.loads(line) for line in body.decode('utf-8').splitlines()]
+
+
+def test_conversation_export_shape(auth_client, conversations):
+    first, _, _ = conversations
+
+    response = auth_client.get(f'/api/chat/conversations/{first}/export')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert f'conversation-{first}.ndjson' in response.headers['Content-Disposition']
+
+    lines = records(response.data)
+    assert lines[0]['type'] == 'conversation'
+    assert lines[0]['id'] == first
+    assert set(lines[0]) == {'type', 'id', 'user_id', 'title', 'created_at', 'updated_at', 'is_active'}
+
+    assert [(r['type'], r['sender_type'], r['content']) for r in lines[1:]] == [
+        ('message', 'user', 'Hello'), ('message', 'bot', 'Hi there'),
+        ('message', 'user', 'How are you?'), ('message', 'bot', 'Fine')
+    ]
+    assert all(r['conversation_id'] == first and r['timestamp'] for r in lines[1:])
+
+
+def test_gzip_export_matches_the_plain_one(auth_client, conversations):
+    first, _, _ = conversations
+    url = f'/api/chat/conversations/{first}/export'
+
+    plain = auth_client.get(url).data
+    compressed = auth_client.get(url, query_string={'gzip': 'true'})
+
+    assert compressed.mimetype == 'application/gzip'
+    assert gzip.decompress(compressed.data) == plain
+
+
+def test_full_export_holds_only_the_users_conversations(auth_client, conversations):
+    first, second, _ = conversations
+
+    lines = records(auth_client.get('/api/chat/export').data)
+
+    assert [r['id'] for r in lines if r['type'] == 'conversation'] == [first, second]
+    assert 'Private' not in {r.get('content') for r in lines}
+
+
+def test_other_users_conversation_is_not_exported(auth_client, conversations):
+    _, _, other = conversations
+
+    assert auth_client.get(f'/api/chat/conversations/{other}/export').status_code == 404
+
+
+def test_export_requires_login(client):
+    assert client.get('/api/chat/export').status_code == 401
+
+
+def test_chunks_split_the_stream_on_line_boundaries():
+    items = [{'n': n, 'text': 'x' * 50} for n in range(100)]
+
+    chunks = list(ndjson_chunks(items, chunk_bytes=1024))
+
+    assert len(chunks) > 1
+    assert all(chunk.endswith(b'\n') for chunk in chunks)
+    assert records(b''.join(chunks)) == items
@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from services.health_monitor import HealthMonitor, fcntl
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'condition not reached in time'
+        time.sleep(0.01)
+
+
+class CountingCheck:
+    def __init__(self, healthy=True):
+        self.healthy = healthy
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.healthy
+
+
+@pytest.fixture
+def status_file(tmp_path):
+    return str(tmp_path / 'health.json')
+
+
+def make_monitor(status_file, **checks):
+    return HealthMonitor(checks, interval=3600, timeout=0.5, status_file=status_file)
+
+
+def started(monitor):
+    monitor.start(Flask(__name__))
+    assert monitor._first_result.wait(2)
+    # The leader publishes its round in memory first, then to the shared file
+    wait_until(lambda: os.path.exists(monitor.status_file))
+    return monitor
+
+
+@pytest.mark.skipif(fcntl is None, reason='leader election needs flock')
+def test_only_the_lock_holder_probes(status_file):
+    leader_check, follower_check = CountingCheck(), CountingCheck(healthy=False)
+    leader = started(make_monitor(status_file, database=leader_check))
+    follower = started(make_monitor(status_file, database=follower_check))
+
+    assert leader.is_leader() and not follower.is_leader()
+    assert (leader_check.calls, follower_check.calls) == (1, 0)
+
+    # The follower serves the leader's result from the shared file
+    status = follower.get_status()
+    assert status['database']['healthy'] is True
+    assert status['database']['stale'] is False
+
+
+def test_the_leader_writes_the_status_file(status_file):
+    monitor = started(make_monitor(status_file, database=CountingCheck(), llm=CountingCheck(healthy=False)))
+
+    with open(status_file) as handle:
+        shared = json.load(handle)
+    assert sorted(shared) == ['database', 'llm']
+    assert (shared['database']['healthy'], shared['llm']['healthy']) == (True, False)
+    assert shared['database']['checked_at'] == pytest.approx(time.time(), abs=5)
+    assert shared['database']['latency_ms'] >= 0
+
+    status = monitor.get_status()
+    assert status['llm']['healthy'] is False
+    assert status['llm']['age_seconds'] < 5
+
+
+def test_failing_and_hung_checks_count_as_unhealthy(status_file):
+    release = threading.Event()
+
+    def broken():
+        raise RuntimeError('connection refused')
+
+    monitor = started(make_monitor(status_file, broken=broken, hung=lambda: release.wait(5)))
+    release.set()
+
+    status = monitor.get_status()
+    assert status['broken']['healthy'] is False
+    assert status['hung']['healthy'] is False
+    assert status['hung']['latency_ms'] == monitor.timeout * 1000
+
+
+def test_a_stale_result_wakes_the_leader(status_file):
+    check = CountingCheck()
+    monitor = started(make_monitor(status_file, database=check))
+    assert monitor.get_status()['database']['stale'] is False
+
+    with monitor._lock:
+        monitor._results['database']['checked_at'] -= 3 * monitor.interval
+    status = monitor.get_status()
+
+    # The stale result is served at once, and a new round runs without waiting for the interval
+    assert status['database']['stale'] is True
+    wait_until(lambda: check.calls == 2)
+    wait_until(lambda: monitor.get_status()['database']['stale'] is False)
+
+
+@pytest.mark.skipif(fcntl is None, reason='leader election needs flock')
+def test_a_stale_result_makes_a_follower_reread_the_file(status_file):
+    leader = started(make_monitor(status_file, database=CountingCheck()))
+    follower = started(make_monitor(status_file, database=CountingCheck()))
+    assert follower.get_status()['database']['healthy'] is True
+
+    # The leader's next round, as the follower would find it on disk
+    with open(status_file, 'w') as handle:
+        json.dump({'database': {'healthy': False, 'checked_at': time.time(), 'latency_ms': 1.0}}, handle)
+    with follower._lock:
+        follower._results['database']['checked_at'] -= 3 * follower.interval
+
+    assert follower.get_status()['database']['stale'] is True
+    wait_until(lambda: follower.get_status()['database']['healthy'] is False)
+    assert leader.checks['database'].calls == 1
+
+
+def test_get_status_before_any_result_is_stale(status_file):
+    monitor = make_monitor(status_file, database=CountingCheck())
+
+    status = monitor.get_status()
+
+    assert status['database'] == {
+        'healthy': None, 'checked_at': None, 'latency_ms': None, 'age_seconds': None, 'stale': True
+    }
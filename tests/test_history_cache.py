@@ -0,0 +1,110 @@
+import time
+
+from models import Message
+from services.database_service import DatabaseService
+from services.history_cache import HistoryCache, get_history_cache
+
+
+def make_cache(**overrides):
+    options = {'max_conversations': 4, 'messages_per_conversation': 3, 'ttl_seconds': 60}
+    options.update(overrides)
+    return HistoryCache(**options)
+
+
+def msgs(*ids):
+    return [{'id': i, 'content': f'm{i}'} for i in ids]
+
+
+def ids(messages):
+    return [msg['id'] for msg in messages]
+
+
+def test_short_ring_answers_only_when_complete():
+    cache = make_cache()
+    cache.fill(1, msgs(1, 2), complete=True)
+    cache.fill(2, msgs(1, 2), complete=False)
+
+    assert ids(cache.get(1, 10)) == [1, 2]
+    assert cache.get(2, 10) is None
+    assert ids(cache.get(2, 2)) == [1, 2]
+
+
+def test_append_extends_the_ring_and_keeps_the_newest():
+    cache = make_cache()
+    cache.fill(1, msgs(1, 2), complete=True)
+
+    cache.append(1, msgs(3, 4))
+
+    assert ids(cache.get(1, 3)) == [2, 3, 4]
+    assert cache.get(1, 4) is None
+
+
+def test_append_skips_messages_a_fill_already_holds():
+    cache = make_cache()
+    cache.fill(1, msgs(1, 2, 3), complete=True)
+
+    cache.append(1, msgs(2, 3))
+
+    assert ids(cache.get(1, 3)) == [1, 2, 3]
+
+
+def test_out_of_order_append_drops_the_entry():
+    cache = make_cache()
+    cache.fill(1, msgs(1, 5), complete=True)
+
+    cache.append(1, msgs(3))
+
+    assert cache.get(1, 1) is None
+
+
+def test_fill_after_a_write_is_dropped_as_stale():
+    cache = make_cache()
+    generation = cache.generation(1)
+
+    cache.append(1, msgs(1))
+    cache.fill(1, [], complete=True, generation=generation)
+
+    assert cache.get(1, 1) is None
+    assert cache.get_stats()['stale_fills'] == 1
+
+
+def test_remote_writes_append_and_invalidate():
+    cache = make_cache()
+    cache.fill(1, msgs(1), complete=True)
+
+    cache._on_remote_write('1', msgs(2))
+    assert ids(cache.get(1, 5)) == [1, 2]
+
+    cache._on_remote_write('1', None)
+    assert cache.get(1, 5) is None
+
+    stats = cache.get_stats()
+    assert (stats['remote_appends'], stats['remote_invalidations']) == (1, 1)
+
+
+def test_entries_expire_and_lru_is_bounded():
+    cache = make_cache(max_conversations=2, ttl_seconds=0.05)
+    for conversation_id in (1, 2, 3):
+        cache.fill(conversation_id, msgs(1), complete=True)
+
+    assert cache.get(1, 1) is None
+    assert cache.get(3, 1) is not None
+
+    time.sleep(0.1)
+    assert cache.get(3, 1) is None
+
+
+def test_chat_turns_write_through_to_cached_history(db, sample_user):
+    db_service = DatabaseService()
+    cache = get_history_cache()
+    conversation_id, _, _ = db_service.save_chat_turn(sample_user.id, None, 'Hello', 'Hi there')
+
+    assert [m['content'] for m in cache.get(conversation_id, 10)] == ['Hello', 'Hi there']
+
+    misses = cache.get_stats()['misses']
+    db_service.save_chat_turn(sample_user.id, conversation_id, 'Again', 'Sure')
+    history = db_service.get_conversation_history(conversation_id, limit=10)
+
+    assert [m['content'] for m in history] == ['Hello', 'Hi there', 'Again', 'Sure']
+    assert ids(history) == [m.id for m in Message.query.order_by(Message.id)]
+    assert cache.get_stats()['misses'] == misses
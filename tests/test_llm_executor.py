@@ -0,0 +1,51 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.llm_executor import LLMExecutor, LLMQueueFullError, LLMTimeoutError
+
+
+@pytest.fixture
+def executor():
+    """Executor with one running and one queued slot."""
+    executor = LLMExecutor(max_concurrency=1, queue_depth=1, timeout=1.0)
+    yield executor
+    executor.shutdown(wait=False)
+
+
+def test_rejects_calls_beyond_running_and_queued_slots(executor):
+    release = threading.Event()
+    running = executor.submit(release.wait, 5)
+    queued = executor.submit(lambda: 'queued')
+
+    with pytest.raises(LLMQueueFullError):
+        executor.submit(lambda: 'rejected')
+
+    release.set()
+    assert running.result(timeout=5) is True
+    assert queued.result(timeout=5) == 'queued'
+
+    stats = executor.get_stats()
+    assert stats['submitted'] == 2
+    assert stats['rejected'] == 1
+
+
+def test_slots_are_released_when_calls_finish(executor):
+    for value in range(5):
+        assert executor.run(lambda v=value: v * 2) == value * 2
+    assert executor.get_stats()['in_flight'] == 0
+
+
+def test_run_times_out_without_blocking_the_caller(executor):
+    release = threading.Event()
+    try:
+        with pytest.raises(LLMTimeoutError):
+            executor.run(release.wait, 5, timeout=0.05)
+        assert executor.get_stats()['timed_out'] == 1
+    finally:
+        release.set()
+
+
+def test_run_async_returns_the_result(executor):
+    assert asyncio.run(executor.run_async(lambda: 'async')) == 'async'
@@ -0,0 +1,229 @@
+import time
+import uuid
+
+import pytest
+
+from config import Config
+from services import llm_providers
+from services.circuit_breaker import CircuitBreaker
+from services.gemini_service import GeminiService
+from services.llm_providers import OpenAICompatibleProvider, StubProvider, build_providers
+
+
+class FakeProvider(llm_providers.LLMProvider):
+    """Provider whose failures are scripted per test."""
+
+    kind = 'fake'
+
+    def __init__(self, model: str):
+        super().__init__(model)
+        self.error = None
+        self.delay = 0
+        self.chunks = ['fake ', 'answer']
+        self.fail_after_chunks = None
+        self.timeouts = []
+
+    def generate(self, prompt, timeout, max_output_tokens=None):
+        self.timeouts.append(timeout)
+        if self.delay:
+            time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return ''.join(self.chunks)
+
+    def stream(self, prompt, timeout):
+        self.timeouts.append(timeout)
+        for index, chunk in enumerate(self.chunks):
+            if self.error and index == (self.fail_after_chunks or 0):
+                raise self.error
+            yield chunk
+        if self.error and self.fail_after_chunks is None:
+            raise self.error
+
+
+@pytest.fixture
+def make_service(monkeypatch):
+    """Build a GeminiService over fake providers whose breakers are new to this test."""
+    monkeypatch.setitem(llm_providers.PROVIDER_TYPES, FakeProvider.kind, FakeProvider)
+
+    def make(*kinds):
+        suffix = uuid.uuid4().hex
+        return GeminiService(','.join(f"{kind}:{index}-{suffix}" for index, kind in enumerate(kinds)))
+    return make
+
+
+def open_breaker(service, index):
+    """Swap in a breaker that is open and stays open for the test."""
+    breaker = CircuitBreaker(
+        name=service.providers[index].name, failure_rate_threshold=0.5, slow_call_seconds=10,
+        slow_call_rate_threshold=0.5, window_size=2, min_calls=1, open_seconds=60, half_open_max_calls=1
+    )
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    service.circuit_breakers[index] = breaker
+
+
+def test_providers_are_tried_in_order_until_one_answers(make_service):
+    service = make_service('fake', 'fake', 'fake')
+    first, second, third = service.providers
+    first.error = RuntimeError('first down')
+    second.chunks = ['second answer']
+
+    assert service.generate_response('hi', use_cache=False) == 'second answer'
+    assert (len(first.timeouts), len(second.timeouts), len(third.timeouts)) == (1, 1, 0)
+
+    first_stats, second_stats, _ = service.get_provider_stats()
+    assert (first_stats['failures'], second_stats['successes']) == (1, 1)
+
+
+def test_every_provider_failing_returns_the_default_response(make_service):
+    service = make_service('fake', 'fake')
+    for provider in service.providers:
+        provider.error = RuntimeError('down')
+
+    assert service.generate_response('hi', use_cache=False) == Config.DEFAULT_RESPONSE
+
+
+def test_each_attempt_gets_the_failover_timeout_within_the_overall_deadline(make_service, monkeypatch):
+    monkeypatch.setattr(Config, 'LLM_FAILOVER_TIMEOUT_SECONDS', 0.2)
+    monkeypatch.setattr(Config, 'LLM_TIMEOUT_SECONDS', 0.3)
+    service = make_service('fake', 'fake', 'fake')
+    first, second, third = service.providers
+    first.delay = 0.2
+    first.error = TimeoutError('slow primary')
+    second.delay = 0.15
+    second.error = TimeoutError('slow secondary')
+
+    # Run the chain on this thread so the executor's own wait does not cut it short
+    with pytest.raises(TimeoutError):
+        service._generate('prompt')
+    assert first.timeouts == [0.2]
+    # The second attempt only gets what is left of the overall deadline
+    assert 0 < second.timeouts[0] < 0.2
+    # ...and nothing is left for the third
+    assert third.timeouts == []
+
+
+def test_a_provider_with_an_open_circuit_is_skipped(make_service):
+    service = make_service('fake', 'stub')
+    open_breaker(service, 0)
+
+    assert service.generate_response('hi', use_cache=False).startswith('[offline ')
+    assert service.providers[0].timeouts == []
+    assert service.circuit_breakers[0].get_stats()['rejected'] == 1
+
+
+def test_all_circuits_open_fails_fast(make_service):
+    service = make_service('fake')
+    open_breaker(service, 0)
+
+    assert service.generate_response('hi', use_cache=False) == Config.DEFAULT_RESPONSE
+    assert list(service.generate_response_stream('hi', use_cache=False)) == [Config.DEFAULT_RESPONSE]
+    assert service.providers[0].timeouts == []
+
+
+def test_stream_fails_over_before_the_first_chunk(make_service):
+    service = make_service('fake', 'fake')
+    first, second = service.providers
+    first.error = RuntimeError('refused')
+    second.chunks = ['from ', 'second']
+
+    assert list(service.generate_response_stream('hi', use_cache=False)) == ['from ', 'second']
+    assert service.get_provider_stats()[0]['failures'] == 1
+
+
+def test_stream_does_not_fail_over_after_the_first_chunk(make_service):
+    service = make_service('fake', 'fake')
+    first, second = service.providers
+    first.chunks = ['partial ', 'never sent']
+    first.error = RuntimeError('connection reset')
+    first.fail_after_chunks = 1
+
+    # The client keeps what it got; the second provider is never started
+    assert list(service.generate_response_stream('hi', use_cache=False)) == ['partial ']
+    assert second.timeouts == []
+    assert service.get_provider_stats()[0]['failures'] == 1
+
+
+class FakeResponse:
+    def __init__(self, lines=None, body=None):
+        self.lines = lines or []
+        self.body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self.lines)
+
+    def json(self):
+        return self.body
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.headers = {}
+        self.requests = []
+
+    def post(self, url, **kwargs):
+        self.requests.append((url, kwargs))
+        return self.response
+
+
+def test_openai_stream_parses_server_sent_events(monkeypatch):
+    monkeypatch.setattr(Config, 'OPENAI_COMPAT_BASE_URL', 'http://llm.test/v1/')
+    provider = OpenAICompatibleProvider('llama')
+    provider.session = FakeSession(FakeResponse(lines=[
+        ': keep-alive',
+        '',
+        'data: {"choices": [{"delta": {"role": "assistant"}}]}',
+        'data: {"choices": [{"delta": {"content": "Hel"}}]}',
+        'data:{"choices": [{"delta": {"content": "lo"}}]}',
+        'data: {"choices": []}',
+        'data: [DONE]',
+        'data: {"choices": [{"delta": {"content": "after done"}}]}'
+    ]))
+
+    assert list(provider.stream('hi', timeout=5)) == ['Hel', 'lo']
+
+    url, kwargs = provider.session.requests[0]
+    assert url == 'http://llm.test/v1/chat/completions'
+    assert kwargs['stream'] is True and kwargs['json']['stream'] is True
+    assert kwargs['json']['model'] == 'llama'
+    assert kwargs['timeout'] == 5
+
+
+def test_openai_generate_reads_the_first_choice(monkeypatch):
+    provider = OpenAICompatibleProvider('llama')
+    provider.session = FakeSession(FakeResponse(body={'choices': [{'message': {'content': ' Hello \n'}}]}))
+
+    assert provider.generate('hi', timeout=5, max_output_tokens=3) == 'Hello'
+    assert provider.session.requests[0][1]['json']['max_tokens'] == 3
+
+    provider.session = FakeSession(FakeResponse(body={'choices': []}))
+    assert provider.generate('hi', timeout=5) == ''
+
+
+def test_build_providers_keeps_order_and_skips_bad_entries(monkeypatch):
+    monkeypatch.setattr(Config, 'GEMINI_API_KEY', None)
+
+    providers = build_providers(' stub:b , nosuch:model,, gemini:gemini-2.0-flash, stub ')
+
+    assert [provider.name for provider in providers] == ['stub:b', 'stub:offline']
+    assert all(isinstance(provider, StubProvider) for provider in providers)
+
+
+def test_build_providers_raises_without_a_usable_entry(monkeypatch):
+    monkeypatch.setattr(Config, 'GEMINI_API_KEY', None)
+
+    with pytest.raises(ValueError):
+        build_providers('nosuch:model, gemini:gemini-2.0-flash')
+    with pytest.raises(ValueError):
+        build_providers(' , ')
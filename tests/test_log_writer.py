@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from models import SystemLog
+from services.database_service import DatabaseService
+from services.log_writer import SystemLogWriter, get_log_writer
+
+
+@pytest.fixture
+def writer(app):
+    writer = SystemLogWriter(queue_size=10, batch_size=2, flush_seconds=0.05, enqueue_timeout=0, max_retries=2)
+    writer.start(app)
+    yield writer
+    writer.shutdown()
+
+
+def test_events_are_written_in_batches(db, writer):
+    for index in range(5):
+        assert writer.enqueue('INFO', f'event {index}', 'tests', None)
+
+    writer.shutdown()
+
+    assert [log.message for log in SystemLog.query.order_by(SystemLog.id)] == [f'event {i}' for i in range(5)]
+    stats = writer.get_stats()
+    assert stats['written'] == 5
+    assert stats['batches'] >= 3
+    assert stats['queued'] == 0
+
+
+def test_flush_writes_the_batch_the_flusher_is_collecting(app, db):
+    writer = SystemLogWriter(queue_size=10, batch_size=100, flush_seconds=30, enqueue_timeout=0, max_retries=1)
+    writer.start(app)
+    try:
+        writer.enqueue('INFO', 'held by the flusher', 'tests', None)
+        started = time.monotonic()
+
+        assert writer.flush(timeout=5) == 1
+        assert time.monotonic() - started < 5
+        assert SystemLog.query.filter_by(module='tests').count() == 1
+    finally:
+        writer.shutdown()
+
+
+def test_full_queue_drops_instead_of_blocking():
+    writer = SystemLogWriter(queue_size=1, batch_size=10, flush_seconds=1, enqueue_timeout=0, max_retries=1)
+
+    assert writer.enqueue('INFO', 'kept')
+    assert not writer.enqueue('INFO', 'dropped')
+    assert writer.get_stats()['dropped'] == 1
+
+
+def test_database_service_logs_through_the_running_writer(db):
+    assert get_log_writer().is_running()
+
+    assert DatabaseService().log_system_event('WARNING', 'disk almost full', 'tests')
+    get_log_writer().flush()
+
+    log = SystemLog.query.filter_by(module='tests').one()
+    assert (log.level, log.message) == ('WARNING', 'disk almost full')
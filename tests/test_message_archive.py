@@ -0,0 +1,122 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import update
+
+from models import Conversation, Message, MessageArchive, User
+from services.database_service import DatabaseService
+from services.message_archive import MessageArchiver
+
+
+@pytest.fixture
+def archiver():
+    return MessageArchiver(idle_days=30, batch_size=10)
+
+
+@pytest.fixture
+def idle_conversation(auth_client, db):
+    """Conversation of the logged-in user with four messages, last updated 60 days ago."""
+    db_service = DatabaseService()
+    user_id = User.query.filter_by(username='alice').one().id
+    conversation_id, _, _ = db_service.save_chat_turn(user_id, None, 'Hello', 'Hi there')
+    db_service.save_chat_turn(user_id, conversation_id, 'How are you?', 'Fine')
+    db.session.execute(
+        update(Conversation).where(Conversation.id == conversation_id)
+        .values(updated_at=datetime.utcnow() - timedelta(days=60))
+    )
+    db.session.commit()
+    return conversation_id
+
+
+def message_rows(conversation_id):
+    return [(m.id, m.sender_type, m.content)
+            for m in Message.query.filter_by(conversation_id=conversation_id).order_by(Message.id)]
+
+
+def test_idle_conversations_are_moved_to_the_archive(db, archiver, idle_conversation):
+    recent, _, _ = DatabaseService().save_chat_turn(User.query.one().id, None, 'Recent', None)
+    assert archiver.count_idle() == 1
+
+    totals = archiver.archive_idle()
+
+    assert (totals['conversations'], totals['messages'], totals['batches']) == (1, 4, 1)
+    assert message_rows(idle_conversation) == []
+    assert len(message_rows(recent)) == 1
+    archive = MessageArchive.query.filter_by(conversation_id=idle_conversation).one()
+    assert archive.message_count == 4
+    assert db.session.get(Conversation, idle_conversation).archived_at is not None
+    assert archiver.count_idle() == 0
+
+
+def test_archived_messages_are_read_without_restoring(auth_client, db, archiver, idle_conversation):
+    before = message_rows(idle_conversation)
+    archiver.archive_idle()
+
+    response = auth_client.get(f'/api/chat/conversations/{idle_conversation}/messages', query_string={'limit': 3})
+    page = response.get_json()
+    assert [(m['id'], m['sender_type'], m['content']) for m in page['messages']] == before[1:]
+    assert page['pagination']['has_more']
+
+    older = auth_client.get(f'/api/chat/conversations/{idle_conversation}/messages',
+                            query_string={'limit': 3, 'before': page['pagination']['before_cursor']})
+    assert [m['id'] for m in older.get_json()['messages']] == [before[0][0]]
+
+    history = DatabaseService().get_conversation_history(idle_conversation, limit=10)
+    assert [m['content'] for m in history] == ['Hello', 'Hi there', 'How are you?', 'Fine']
+    assert message_rows(idle_conversation) == []
+
+
+def test_writing_to_an_archived_conversation_restores_original_ids(auth_client, db, archiver, idle_conversation):
+    before = message_rows(idle_conversation)
+    archiver.archive_idle()
+
+    response = auth_client.post('/api/chat/send', json={'message': 'Back again', 'conversation_id': idle_conversation})
+    assert response.status_code == 200
+
+    db.session.expire_all()
+    rows = message_rows(idle_conversation)
+    assert rows[:4] == before
+    assert [content for _, _, content in rows[4:]][0] == 'Back again'
+    assert rows[4][0] > before[-1][0]
+    assert db.session.get(Conversation, idle_conversation).archived_at is None
+    assert MessageArchive.query.count() == 0
+
+
+def test_restore_on_demand_keeps_the_conversation_idle(db, archiver, idle_conversation):
+    before = message_rows(idle_conversation)
+    updated_at = db.session.get(Conversation, idle_conversation).updated_at
+    archiver.archive_idle()
+
+    assert archiver.restore_conversation(idle_conversation) == 4
+
+    db.session.expire_all()
+    assert message_rows(idle_conversation) == before
+    assert db.session.get(Conversation, idle_conversation).updated_at == updated_at
+    assert archiver.restore_conversation(idle_conversation) == 0
+
+
+def test_iter_unpack_decodes_across_chunks():
+    rows = [SimpleNamespace(id=i, sender_type='user', content='ü' * 40, timestamp=datetime(2024, 1, 1, 0, i),
+                            token_count=i) for i in range(50)]
+    payload = MessageArchiver.pack(rows)
+
+    messages = list(MessageArchiver.iter_unpack(7, payload, chunk_size=16))
+
+    assert [(m.id, m.content, m.timestamp, m.token_count) for m in messages] == [
+        (r.id, r.content, r.timestamp, r.token_count) for r in rows
+    ]
+    assert all(m.conversation_id == 7 for m in messages)
+    assert [m.id for m in MessageArchiver.unpack(7, payload)] == list(range(50))
+
+
+@pytest.mark.parametrize('data', ['{"id": 1}', '[[1, "user", "cut'])
+def test_iter_unpack_rejects_bad_payloads(data):
+    with pytest.raises(ValueError):
+        list(MessageArchiver.iter_unpack(1, gzip.compress(data.encode('utf-8')), chunk_size=4))
+
+
+def test_empty_archive_unpacks_to_no_messages():
+    assert MessageArchiver.unpack(1, gzip.compress(json.dumps([]).encode('utf-8'))) == []
@@ -0,0 +1,80 @@
+import pytest
+
+from models import User
+from services.database_service import DatabaseService
+from services.message_search import MessageSearch, get_message_search
+
+
+@pytest.fixture
+def messages(auth_client, db):
+    """Messages of the logged-in user and of another user that mention volcanoes."""
+    db_service = DatabaseService()
+    alice = User.query.filter_by(username='alice').one()
+    bob = User(username='bob', email='bob@example.com', password='x')
+    db.session.add(bob)
+    db.session.commit()
+
+    db_service.save_chat_turn(alice.id, None, 'Tell me about volcano eruptions', 'Volcanoes erupt <b>magma</b>')
+    db_service.save_chat_turn(alice.id, None, 'How do I bake bread?', 'Knead the dough')
+    db_service.save_chat_turn(bob.id, None, 'My volcano eruption notes', None)
+    return alice, bob
+
+
+def search(client, **params):
+    response = client.get('/api/chat/search', query_string=params)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_index_is_full_text_on_sqlite(messages):
+    assert get_message_search().mode == 'fts5'
+
+
+def test_results_are_scoped_to_the_caller(auth_client, messages):
+    results = search(auth_client, q='eruption')['results']
+
+    assert len(results) == 1
+    assert results[0]['sender_type'] == 'user'
+    assert results[0]['snippet'] == 'Tell me about volcano <mark>eruptions</mark>'
+
+
+def test_every_word_must_match_and_the_last_is_a_prefix(auth_client, messages):
+    assert len(search(auth_client, q='volcano erupt')['results']) == 1
+    assert len(search(auth_client, q='bake')['results']) == 1
+    assert len(search(auth_client, q='volc')['results']) == 2
+    assert search(auth_client, q='volcano bread')['results'] == []
+
+
+def test_snippets_are_html_escaped(auth_client, messages):
+    snippet = search(auth_client, q='magma')['results'][0]['snippet']
+
+    assert '&lt;b&gt;' in snippet
+    assert '<b>' not in snippet
+
+
+def test_results_page_by_offset(auth_client, messages):
+    first = search(auth_client, q='volc', limit=1)
+    assert first['pagination']['has_more']
+    assert first['pagination']['next_offset'] == 1
+
+    second = search(auth_client, q='volc', limit=1, offset=1)
+    assert not second['pagination']['has_more']
+    assert second['results'][0]['message_id'] != first['results'][0]['message_id']
+
+
+def test_query_and_login_are_required(client, auth_client):
+    assert auth_client.get('/api/chat/search', query_string={'q': '  ?! '}).status_code == 400
+    auth_client.post('/api/chat/logout')
+    assert client.get('/api/chat/search', query_string={'q': 'volcano'}).status_code == 401
+
+
+def test_like_fallback_is_scoped_to_the_caller(messages, monkeypatch):
+    alice, bob = messages
+    fallback = MessageSearch(max_results=100)
+    monkeypatch.setattr(fallback, '_current_mode', lambda: 'like')
+
+    results, has_more = fallback.search(bob.id, 'volcano', limit=10)
+
+    assert len(results) == 1 and not has_more
+    assert '<mark>volcano</mark>' in results[0]['snippet']
+    assert fallback.search(alice.id, 'notes', limit=10) == ([], False)
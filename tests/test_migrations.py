@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+
+import pytest
+from migrations import MIGRATIONS, apply_migrations, migration_status
+from migrations.runner import get_applied_versions
+from models import SystemLog
+
+
+def test_pending_migrations_are_applied_and_recorded_once(db):
+    versions = [migration.VERSION for migration in MIGRATIONS]
+
+    assert apply_migrations(MIGRATIONS) == versions
+    assert apply_migrations(MIGRATIONS) == []
+
+    assert sorted(get_applied_versions()) == versions
+    assert all(status['applied'] and status['applied_at'] for status in migration_status(MIGRATIONS))
+
+
+def test_target_stops_at_a_version(db):
+    first, second = MIGRATIONS[0].VERSION, MIGRATIONS[1].VERSION
+
+    assert apply_migrations(MIGRATIONS, target=second) == [first, second]
+    assert [s['applied'] for s in migration_status(MIGRATIONS)][:3] == [True, True, False]
+
+
+def test_failed_migration_is_rolled_back_and_not_recorded(db):
+    def upgrade():
+        db.session.add(SystemLog(level='INFO', message='half done'))
+        db.session.flush()
+        raise RuntimeError('boom')
+
+    broken = SimpleNamespace(VERSION=999, NAME='broken', upgrade=upgrade)
+
+    with pytest.raises(RuntimeError):
+        apply_migrations([broken])
+
+    assert 999 not in get_applied_versions()
+    assert SystemLog.query.count() == 0
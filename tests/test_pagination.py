@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import User
+from services.database_service import DatabaseService
+
+
+@pytest.fixture
+def conversation_id(auth_client, db):
+    """Conversation of the logged-in user with messages 'm0' (oldest) to 'm4'."""
+    db_service = DatabaseService()
+    user_id = User.query.filter_by(username='alice').one().id
+    start = datetime(2024, 1, 1)
+    conversation_id = None
+    for index in range(5):
+        conversation_id, _, _ = db_service.save_chat_turn(
+            user_id, conversation_id, f'm{index}', None, user_timestamp=start + timedelta(minutes=index)
+        )
+    return conversation_id
+
+
+def contents(response):
+    return [message['content'] for message in response.get_json()['messages']]
+
+
+def test_messages_page_towards_older_and_newer(auth_client, conversation_id):
+    url = f'/api/chat/conversations/{conversation_id}/messages'
+
+    newest = auth_client.get(url, query_string={'limit': 2})
+    assert contents(newest) == ['m3', 'm4']
+    assert newest.get_json()['pagination']['has_more']
+
+    older = auth_client.get(url, query_string={'limit': 2, 'before': newest.get_json()['pagination']['before_cursor']})
+    assert contents(older) == ['m1', 'm2']
+
+    oldest = auth_client.get(url, query_string={'limit': 2, 'before': older.get_json()['pagination']['before_cursor']})
+    assert contents(oldest) == ['m0']
+    assert not oldest.get_json()['pagination']['has_more']
+
+    newer = auth_client.get(url, query_string={'limit': 2, 'after': oldest.get_json()['pagination']['after_cursor']})
+    assert contents(newer) == ['m1', 'm2']
+    assert newer.get_json()['pagination']['direction'] == 'newer'
+    assert newer.get_json()['pagination']['has_more']
+
+
+def test_conversations_page_most_recent_first(auth_client, db):
+    db_service = DatabaseService()
+    user_id = User.query.filter_by(username='alice').one().id
+    ids = [db_service.save_chat_turn(user_id, None, f'c{index}', None)[0] for index in range(3)]
+
+    first = auth_client.get('/api/chat/conversations', query_string={'limit': 2})
+    assert [c['id'] for c in first.get_json()['conversations']] == [ids[2], ids[1]]
+
+    cursor = first.get_json()['pagination']['before_cursor']
+    rest = auth_client.get('/api/chat/conversations', query_string={'limit': 2, 'before': cursor})
+    assert [c['id'] for c in rest.get_json()['conversations']] == [ids[0]]
+    assert not rest.get_json()['pagination']['has_more']
+
+
+def test_limit_is_clamped(auth_client, conversation_id):
+    response = auth_client.get(f'/api/chat/conversations/{conversation_id}/messages', query_string={'limit': 0})
+
+    assert response.get_json()['pagination']['limit'] == 1
+    assert contents(response) == ['m4']
+
+
+@pytest.mark.parametrize('query', [{'before': 'not-a-cursor'}, {'after': '!!!'}, {'before': 'x', 'after': 'y'}])
+def test_bad_cursors_are_rejected(auth_client, conversation_id, query):
+    assert auth_client.get('/api/chat/conversations', query_string=query).status_code == 400
+    assert auth_client.get(f'/api/chat/conversations/{conversation_id}/messages',
+                           query_string=query).status_code == 400
+
+
+def test_cursor_round_trip():
+    timestamp = datetime(2024, 5, 6, 7, 8, 9, 123456)
+
+    assert DatabaseService.decode_cursor(DatabaseService.encode_cursor(timestamp, 42)) == (timestamp, 42)
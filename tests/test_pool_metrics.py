@@ -0,0 +1,97 @@
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, exc
+
+from services.pool_metrics import TimedQueuePool, get_pool_stats, instrument_engines
+
+
+@pytest.fixture
+def pool(tmp_path):
+    """A small instrumented pool: two connections plus one overflow, 0.2s checkout timeout."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool, pool_size=2, max_overflow=1, pool_timeout=0.2
+    )
+    # Metrics are process-wide, keyed by name
+    metrics, = instrument_engines({f"test-{uuid.uuid4().hex[:8]}": engine})
+    yield engine, metrics
+    engine.dispose()
+
+
+def test_checkouts_overflow_and_checkins_are_counted(pool):
+    engine, metrics = pool
+
+    connections = [engine.connect() for _ in range(3)]
+    stats = metrics.get_stats()
+    assert stats['pool_class'] == 'TimedQueuePool'
+    assert (stats['size'], stats['max_overflow'], stats['timeout_seconds']) == (2, 1, 0.2)
+    assert (stats['checked_out'], stats['overflow'], stats['peak_checked_out']) == (3, 1, 3)
+    assert (stats['checkouts'], stats['connects'], stats['checkins']) == (3, 3, 0)
+
+    for connection in connections:
+        connection.close()
+    stats = metrics.get_stats()
+    assert (stats['checked_out'], stats['idle'], stats['checkins']) == (0, 2, 3)
+    # The overflow connection is closed instead of returned to the pool
+    assert (stats['overflow'], stats['closes']) == (0, 1)
+
+    with engine.connect():
+        pass
+    stats = metrics.get_stats()
+    assert (stats['checkouts'], stats['connects']) == (4, 3)
+
+
+def test_waits_and_timeouts_are_measured(pool):
+    engine, metrics = pool
+    connections = [engine.connect() for _ in range(3)]
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+
+    stats = metrics.get_stats()
+    assert stats['timeouts'] == 1
+    wait = stats['checkout_wait_ms']
+    assert wait['count'] == 4
+    assert 200 <= wait['max'] < 1000
+    histogram = {bucket['le_ms']: bucket['count'] for bucket in wait['histogram']}
+    # Three quick checkouts, then the one that waited out the 0.2s timeout
+    assert histogram[100] == 3
+    assert histogram[1000] == histogram['+Inf'] == 4
+
+    for connection in connections:
+        connection.close()
+
+
+def test_metrics_survive_engine_dispose(pool):
+    engine, metrics = pool
+    with engine.connect():
+        pass
+
+    engine.dispose()
+    with engine.connect():
+        pass
+
+    stats = metrics.get_stats()
+    assert (stats['checkouts'], stats['checkout_wait_ms']['count']) == (2, 2)
+
+
+def test_instrumenting_again_keeps_the_metrics(pool):
+    engine, metrics = pool
+
+    assert instrument_engines({metrics.name: engine}) == [metrics]
+
+
+def test_pool_endpoint_reports_every_instrumented_pool(client, pool):
+    engine, metrics = pool
+    with engine.connect():
+        pass
+
+    response = client.get('/api/admin/pool')
+
+    assert response.status_code == 200
+    pools = response.get_json()['pools']
+    assert set(pools) == set(get_pool_stats())
+    assert 'primary' in pools
+    assert pools[metrics.name] == metrics.get_stats()
+    assert set(pools['primary']) == set(pools[metrics.name])
@@ -0,0 +1,119 @@
+import time
+
+import pytest
+from flask import Flask
+
+from models import Conversation, Message, User, db as _db
+from services.cache_backend import MemoryBackend
+from services.database_service import DatabaseService
+from services.replica_router import ReplicaRouter
+
+
+@pytest.fixture
+def replica_app(tmp_path):
+    """App whose primary and replica_0 bind are separate SQLite files with the same schema."""
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'primary.db'}",
+        SQLALCHEMY_BINDS={'replica_0': f"sqlite:///{tmp_path / 'replica.db'}"}
+    )
+    _db.init_app(app)
+    with app.app_context():
+        _db.create_all()
+        _db.metadata.create_all(_db.engines['replica_0'])
+        yield app
+        _db.session.remove()
+        for engine in _db.engines.values():
+            engine.dispose()
+    # init_app registered an empty metadata for the bind; later apps do not have it
+    _db.metadatas.pop('replica_0', None)
+
+
+@pytest.fixture
+def router(replica_app):
+    router = ReplicaRouter(['replica_0'], max_lag_seconds=5, interval=3600, sticky_seconds=60,
+                           backend=MemoryBackend(max_entries=100))
+    router.start(replica_app)
+    deadline = time.monotonic() + 2
+    while router.get_stats()['replicas'][0]['checked_at'] is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return router
+
+
+def add_user(session, username):
+    session.add(User(username=username, email=f'{username}@example.com', password='x'))
+    session.commit()
+
+
+def test_caught_up_replica_gets_reads(router):
+    assert router.choose() == 'replica_0'
+
+    replica = router.get_stats()['replicas'][0]
+    assert replica['available'] and replica['lag_seconds'] == 0.0
+    assert replica['reads'] == 1
+
+
+def test_lagging_replica_is_skipped(router):
+    router.max_lag_seconds = 0.01
+    add_user(_db.session, 'alice')
+    conversation = Conversation(user_id=User.query.one().id, title='Chat')
+    _db.session.add(conversation)
+    _db.session.add(Message(conversation=conversation, content='not replicated', sender_type='user'))
+    _db.session.commit()
+
+    # The primary's position is sampled on every check; lag is the age of the oldest unreplicated sample
+    router.check()
+    time.sleep(0.05)
+    router.check()
+
+    assert router.get_stats()['replicas'][0]['lag_seconds'] >= 0.05
+    assert router.choose() is None
+    assert router.get_stats()['primary_reads'] == 1
+
+
+def test_writers_read_their_writes_from_the_primary(replica_app, router):
+    router.mark_write(user_id=7)
+
+    # The request that wrote, and any later request of the same user, stay on the primary
+    assert router.choose(user_id=7) is None
+    with replica_app.app_context():
+        assert router.choose(user_id=7) is None
+        assert router.choose(user_id=8) == 'replica_0'
+    assert router.get_stats()['sticky_reads'] == 2
+
+
+def test_failed_replica_is_taken_out_until_the_next_check(router):
+    router.report_failure('replica_0', RuntimeError('connection reset'))
+    assert router.choose() is None
+    assert router.get_stats()['fallbacks'] == 1
+
+    router.check()
+    assert router.choose() == 'replica_0'
+
+
+def test_route_reads_from_the_replica_and_keeps_pending_primary_changes(router):
+    with _db.engines['replica_0'].begin() as conn:
+        conn.execute(User.__table__.insert().values(username='replicated', email='r@example.com', password='x'))
+    pending = User(username='pending', email='p@example.com', password='x')
+    _db.session.add(pending)
+
+    with router.route('replica_0'):
+        assert [user.username for user in User.query.all()] == ['replicated']
+
+    assert pending in _db.session.new
+    _db.session.commit()
+    assert [user.username for user in User.query.all()] == ['pending']
+
+
+def test_database_service_reads_run_in_the_replica_session(router):
+    with _db.engines['replica_0'].begin() as conn:
+        conn.execute(Conversation.__table__.insert().values(id=1, user_id=1, title='On the replica'))
+    db_service = DatabaseService()
+    db_service.replicas = router
+
+    conversations, _ = db_service.get_user_conversations_page(1, 10)
+
+    assert [c.title for c in conversations] == ['On the replica']
+    # Nothing read from the replica may land in the request's primary session
+    assert not any(isinstance(obj, Conversation) for obj in _db.session.identity_map.values())
+    assert Conversation.query.all() == []
@@ -0,0 +1,71 @@
+import time
+import uuid
+
+import pytest
+
+from services import llm_providers
+from services.cache_backend import MemoryBackend
+from services.gemini_service import GeminiService
+from services.response_cache import ResponseCache
+
+
+class CountingProvider(llm_providers.LLMProvider):
+    """Provider that answers with the number of upstream calls made so far."""
+
+    kind = 'counting'
+
+    def __init__(self, model: str):
+        super().__init__(model)
+        self.calls = 0
+
+    def generate(self, prompt, timeout, max_output_tokens=None):
+        self.calls += 1
+        return f"answer {self.calls}"
+
+
+@pytest.fixture
+def counting_service(monkeypatch):
+    """GeminiService over a CountingProvider with a model name of its own."""
+    monkeypatch.setitem(llm_providers.PROVIDER_TYPES, CountingProvider.kind, CountingProvider)
+    return GeminiService(f"counting:{uuid.uuid4().hex}")
+
+
+def test_keys_ignore_whitespace_but_not_case_or_the_model():
+    cache = ResponseCache(MemoryBackend(max_entries=10), ttl_seconds=60)
+
+    assert cache.make_key('m', 'Hello   World') == cache.make_key('m', ' Hello\nWorld ')
+    assert cache.make_key('m', "Translate 'HELLO' exactly") != cache.make_key('m', "translate 'hello' exactly")
+    assert cache.make_key('m', 'hello') != cache.make_key('other', 'hello')
+
+
+def test_miss_then_hit():
+    cache = ResponseCache(MemoryBackend(max_entries=10), ttl_seconds=60)
+    key = cache.make_key('m', 'prompt')
+
+    assert cache.get(key) is None
+    cache.set(key, 'response')
+    assert cache.get(key) == 'response'
+
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+
+def test_entries_expire_after_the_ttl():
+    cache = ResponseCache(MemoryBackend(max_entries=10), ttl_seconds=0.05)
+    key = cache.make_key('m', 'prompt')
+    cache.set(key, 'response')
+
+    time.sleep(0.1)
+    assert cache.get(key) is None
+
+
+def test_service_answers_repeated_prompts_from_the_cache(counting_service):
+    history = [{'sender_type': 'user', 'content': 'earlier'}]
+
+    first = counting_service.generate_response('same question', history)
+    second = counting_service.generate_response('same question', history)
+    uncached = counting_service.generate_response('same question', history, use_cache=False)
+
+    assert first == second == 'answer 1'
+    assert uncached == 'answer 2'
+    assert counting_service.providers[0].calls == 2
@@ -0,0 +1,70 @@
+import time
+
+import numpy as np
+
+from services.semantic_cache import HashingVectorizer, SemanticCache
+
+
+def make_cache(**overrides):
+    options = {'max_entries': 4, 'ttl_seconds': 60, 'threshold': 0.9, 'dimensions': 1024}
+    options.update(overrides)
+    return SemanticCache(**options)
+
+
+def test_vectors_are_unit_length_and_stable():
+    vectorizer = HashingVectorizer(256)
+    vector = vectorizer.embed('What is the capital of France?')
+
+    assert np.isclose(np.linalg.norm(vector), 1.0)
+    assert np.array_equal(vector, HashingVectorizer(256).embed('What is the capital of France?'))
+    assert not vectorizer.embed('').any()
+
+
+def test_near_duplicates_hit_and_unrelated_messages_miss():
+    cache = make_cache()
+    cache.set('model', 'What is the capital of France?', 'Paris')
+
+    assert cache.get('model', 'what is the capital of france') == 'Paris'
+    assert cache.get('model', 'How do I bake bread?') is None
+    assert cache.get('model', 'What is the capital of Germany?') is None
+
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses']) == (1, 2)
+
+
+def test_namespaces_do_not_share_answers():
+    cache = make_cache()
+    cache.set('model-a', 'What is the capital of France?', 'Paris')
+
+    assert cache.get('model-b', 'What is the capital of France?') is None
+
+
+def test_entries_expire_after_the_ttl():
+    cache = make_cache(ttl_seconds=0.05)
+    cache.set('model', 'What is the capital of France?', 'Paris')
+
+    time.sleep(0.1)
+    assert cache.get('model', 'What is the capital of France?') is None
+
+
+def test_least_recently_used_entry_is_evicted_when_full():
+    cache = make_cache(max_entries=2)
+    cache.set('model', 'tell me about volcanoes', 'volcanoes')
+    cache.set('model', 'explain photosynthesis', 'photosynthesis')
+    assert cache.get('model', 'tell me about volcanoes') == 'volcanoes'
+
+    cache.set('model', 'history of the roman empire', 'rome')
+
+    assert cache.get('model', 'explain photosynthesis') is None
+    assert cache.get('model', 'tell me about volcanoes') == 'volcanoes'
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_clear_drops_every_entry():
+    cache = make_cache()
+    cache.set('model', 'What is the capital of France?', 'Paris')
+
+    cache.clear()
+
+    assert cache.get('model', 'What is the capital of France?') is None
+    assert cache.get_stats()['size'] == 0
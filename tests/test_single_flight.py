@@ -0,0 +1,69 @@
+from concurrent.futures import Future
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+def test_callers_of_the_same_key_share_one_call():
+    group = SingleFlight()
+    started = []
+
+    def start():
+        started.append(Future())
+        return started[-1]
+
+    first = group.submit('prompt', start)
+    second = group.submit('prompt', start)
+    assert second is first
+    assert len(started) == 1
+
+    started[0].set_result('answer')
+    assert first.result(timeout=1) == second.result(timeout=1) == 'answer'
+
+    stats = group.get_stats()
+    assert (stats['calls'], stats['upstream_calls'], stats['coalesced']) == (2, 1, 1)
+
+
+def test_key_is_released_when_the_call_finishes():
+    group = SingleFlight()
+    upstream = Future()
+    group.submit('prompt', lambda: upstream)
+    upstream.set_result('first')
+
+    again = Future()
+    again.set_result('second')
+    assert group.submit('prompt', lambda: again).result(timeout=1) == 'second'
+    assert group.get_stats()['in_flight'] == 0
+
+
+def test_different_keys_do_not_coalesce():
+    group = SingleFlight()
+    a, b = Future(), Future()
+
+    assert group.submit('a', lambda: a) is not group.submit('b', lambda: b)
+    assert group.get_stats()['upstream_calls'] == 2
+
+
+def test_errors_reach_every_waiting_caller():
+    group = SingleFlight()
+    upstream = Future()
+    first = group.submit('prompt', lambda: upstream)
+    second = group.submit('prompt', lambda: upstream)
+
+    upstream.set_exception(RuntimeError('upstream down'))
+
+    for future in (first, second):
+        with pytest.raises(RuntimeError):
+            future.result(timeout=1)
+
+
+def test_failing_start_releases_the_key():
+    group = SingleFlight()
+
+    def broken():
+        raise RuntimeError('queue full')
+
+    with pytest.raises(RuntimeError):
+        group.submit('prompt', broken)
+    assert group.get_stats()['in_flight'] == 0
@@ -0,0 +1,66 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from models import Conversation, Message, StatsCounter
+from services.stats_service import StatsService
+
+
+@pytest.fixture
+def service(db):
+    return StatsService(interval=60, active_refresh_seconds=0, reconcile_seconds=0)
+
+
+def add_conversation(db, user, messages=1, updated_at=None):
+    conversation = Conversation(user_id=user.id, title='Chat', updated_at=updated_at or datetime.utcnow())
+    db.session.add(conversation)
+    for index in range(messages):
+        db.session.add(Message(conversation=conversation, content=f'm{index}', sender_type='user'))
+    db.session.commit()
+    return conversation
+
+
+def test_no_snapshot_before_the_first_refresh(service):
+    assert service.get_stats() is None
+
+
+def test_counters_advance_by_the_new_rows(db, service, sample_user):
+    add_conversation(db, sample_user, messages=2)
+    first = service.refresh()
+    assert (first['users'], first['conversations'], first['messages']) == (1, 1, 2)
+
+    add_conversation(db, sample_user, messages=3)
+    second = service.refresh()
+    assert (second['conversations'], second['messages']) == (2, 5)
+    assert service.get_job_stats()['refreshes'] == 2
+
+
+def test_active_count_skips_idle_conversations(db, service, sample_user):
+    add_conversation(db, sample_user)
+    add_conversation(db, sample_user, updated_at=datetime.utcnow() - timedelta(days=2))
+
+    assert service.refresh()['active_conversations_24h'] == 1
+
+
+def test_reconcile_corrects_a_drifted_total(db, sample_user):
+    service = StatsService(interval=60, active_refresh_seconds=0, reconcile_seconds=0.05)
+    add_conversation(db, sample_user, messages=2)
+    service.refresh()
+
+    db.session.execute(update(StatsCounter.__table__).where(StatsCounter.name == 'messages').values(value=99))
+    db.session.commit()
+    time.sleep(0.1)
+
+    assert service.refresh()['messages'] == 2
+
+
+def test_admin_stats_are_served_from_the_counters(client, db, sample_user):
+    add_conversation(db, sample_user, messages=2)
+
+    stats = client.get('/api/admin/stats').get_json()
+
+    assert stats['database_status'] == 'connected'
+    assert (stats['users'], stats['conversations'], stats['messages']) == (1, 1, 2)
+    assert 'age_seconds' in stats
@@ -0,0 +1,167 @@
+import threading
+
+import pytest
+
+from config import Config
+from models import ConversationSummary, Message
+from services.database_service import DatabaseService
+from services.summary_service import SummaryService
+
+
+class FakeSummarizer:
+    """Stands in for GeminiService: records what it is asked to fold."""
+
+    def __init__(self):
+        self.calls = []
+
+    def summarize_conversation(self, previous_summary, messages):
+        self.calls.append((previous_summary, [msg['content'] for msg in messages]))
+        return f"summary #{len(self.calls)}"
+
+    def count_tokens(self, text):
+        return len(text.split())
+
+
+@pytest.fixture
+def summaries(monkeypatch):
+    monkeypatch.setattr(Config, 'SUMMARY_ENABLED', True)
+    monkeypatch.setattr(Config, 'SUMMARY_KEEP_RECENT_MESSAGES', 10)
+    monkeypatch.setattr(Config, 'SUMMARY_TRIGGER_MESSAGES', 10)
+    monkeypatch.setattr(Config, 'SUMMARY_BATCH_MESSAGES', 40)
+    return SummaryService(FakeSummarizer(), DatabaseService())
+
+
+def add_messages(db, conversation, count, start=0):
+    messages = [
+        Message(conversation_id=conversation.id, content=f"message {start + index}",
+                sender_type='user' if index % 2 == 0 else 'bot')
+        for index in range(count)
+    ]
+    db.session.add_all(messages)
+    db.session.commit()
+    return messages
+
+
+def test_refresh_folds_older_messages_and_keeps_the_recent_ones(db, summaries, sample_conversation):
+    messages = add_messages(db, sample_conversation, 25)
+
+    assert summaries.refresh(sample_conversation.id) is True
+
+    previous, folded = summaries.gemini_service.calls[0]
+    assert previous is None
+    assert folded == [f"message {index}" for index in range(15)]
+
+    summary = ConversationSummary.query.filter_by(conversation_id=sample_conversation.id).one()
+    assert (summary.content, summary.last_message_id, summary.message_count, summary.token_count) == (
+        'summary #1', messages[14].id, 15, 2
+    )
+
+    # Ten unsummarized messages are below the trigger
+    assert summaries.refresh(sample_conversation.id) is False
+    assert len(summaries.gemini_service.calls) == 1
+
+
+def test_refresh_extends_the_previous_summary(db, summaries, sample_conversation):
+    add_messages(db, sample_conversation, 25)
+    summaries.refresh(sample_conversation.id)
+    newer = add_messages(db, sample_conversation, 12, start=25)
+
+    assert summaries.refresh(sample_conversation.id) is True
+
+    previous, folded = summaries.gemini_service.calls[1]
+    assert previous == 'summary #1'
+    assert folded == [f"message {index}" for index in range(15, 27)]
+
+    summary = ConversationSummary.query.filter_by(conversation_id=sample_conversation.id).one()
+    assert (summary.content, summary.last_message_id, summary.message_count) == (
+        'summary #2', newer[1].id, 27
+    )
+
+
+def test_refresh_folds_at_most_one_batch(db, summaries, sample_conversation, monkeypatch):
+    monkeypatch.setattr(Config, 'SUMMARY_BATCH_MESSAGES', 12)
+    add_messages(db, sample_conversation, 40)
+
+    assert summaries.refresh(sample_conversation.id) is True
+    assert summaries.refresh(sample_conversation.id) is True
+    # 16 left: 6 foldable, under the trigger
+    assert summaries.refresh(sample_conversation.id) is False
+    assert [len(folded) for _, folded in summaries.gemini_service.calls] == [12, 12]
+
+
+def test_failed_summary_is_not_stored(db, summaries, sample_conversation):
+    add_messages(db, sample_conversation, 25)
+    summaries.gemini_service.summarize_conversation = lambda previous, messages: None
+
+    assert summaries.refresh(sample_conversation.id) is False
+    assert ConversationSummary.query.count() == 0
+
+
+def test_prompt_context_returns_the_summary_and_its_coverage(db, summaries, sample_conversation, monkeypatch):
+    messages = add_messages(db, sample_conversation, 25)
+    assert summaries.get_prompt_context(sample_conversation.id) == (None, 0)
+
+    summaries.refresh(sample_conversation.id)
+    assert summaries.get_prompt_context(sample_conversation.id) == ('summary #1', messages[14].id)
+
+    history = [msg.to_dict() for msg in messages]
+    recent = summaries.unsummarized(history, messages[14].id)
+    assert [msg['content'] for msg in recent] == [f"message {index}" for index in range(15, 25)]
+    assert summaries.unsummarized(history, 0) == history
+
+    monkeypatch.setattr(Config, 'SUMMARY_ENABLED', False)
+    assert summaries.get_prompt_context(sample_conversation.id) == (None, 0)
+
+
+def test_schedule_refresh_runs_in_the_background_without_duplicates(app, summaries):
+    started = threading.Event()
+    release = threading.Event()
+    runs = []
+
+    def refresh(conversation_id):
+        runs.append(conversation_id)
+        started.set()
+        assert release.wait(2)
+        return False
+
+    # The scheduling is under test here; refresh itself is covered above
+    summaries.refresh = refresh
+
+    summaries.schedule_refresh(1)
+    assert started.wait(2)
+    summaries.schedule_refresh(1)
+    summaries.schedule_refresh(1)
+    summaries.schedule_refresh(2)
+    release.set()
+    summaries._pool.shutdown(wait=True)
+
+    assert sorted(runs) == [1, 2]
+    assert summaries._pending == set()
+
+
+def test_a_run_catches_up_in_several_batches(app, summaries, monkeypatch):
+    monkeypatch.setattr(Config, 'SUMMARY_MAX_BATCHES_PER_RUN', 3)
+    runs = []
+
+    def refresh(conversation_id):
+        runs.append(conversation_id)
+        return True
+
+    summaries.refresh = refresh
+    summaries.schedule_refresh(7)
+    summaries._pool.shutdown(wait=True)
+
+    assert runs == [7, 7, 7]
+    # Once the run is over the conversation can be scheduled again
+    assert summaries._pending == set()
+
+
+def test_schedule_refresh_does_nothing_when_disabled(app, summaries, monkeypatch):
+    monkeypatch.setattr(Config, 'SUMMARY_ENABLED', False)
+    runs = []
+    summaries.refresh = lambda conversation_id: runs.append(conversation_id)
+
+    summaries.schedule_refresh(1)
+    summaries._pool.shutdown(wait=True)
+
+    assert runs == []
@@ -0,0 +1,136 @@
+from types import SimpleNamespace
+
+import pytest
+
+from config import Config
+from services.gemini_service import GeminiService
+from services.token_counter import TokenCounter
+
+
+def test_raw_count_follows_the_tokenizer_pieces():
+    counter = TokenCounter()
+
+    assert counter.raw_count('') == 0
+    assert counter.raw_count('hello') == 1
+    # Letter runs cost a token per ~8 characters, digits and symbols one each
+    assert counter.raw_count('abcdefghij') == 2
+    assert counter.raw_count('123') == 3
+    assert counter.raw_count('Hello, world 42') == 5
+    assert counter.raw_count('héllo') == 3
+
+
+def test_raw_counts_are_memoized_up_to_memo_size():
+    counter = TokenCounter(memo_size=2)
+    for text in ('one', 'two', 'three'):
+        counter.raw_count(text)
+
+    assert counter.get_stats()['memoized'] == 2
+    assert counter.raw_count('one') == 1
+
+
+def test_observations_calibrate_the_factor():
+    counter = TokenCounter(smoothing=0.5)
+    text = 'word ' * 100
+
+    counter.observe(text, 150)
+    assert counter.factor == pytest.approx(1.5)
+    assert counter.count(text) == 150
+
+    counter.observe(text, 100)
+    assert counter.factor == pytest.approx(1.25)
+    assert counter.get_stats()['observations'] == 2
+
+    # Missing usage figures are ignored
+    counter.observe(text, None)
+    counter.observe('', 10)
+    assert counter.get_stats()['observations'] == 2
+
+
+def test_the_factor_is_clamped():
+    text = 'word ' * 100
+
+    high = TokenCounter()
+    high.observe(text, 100 * 100)
+    assert high.factor == 4.0
+
+    low = TokenCounter()
+    low.observe(text, 1)
+    assert low.factor == 0.25
+    # A calibrated count never drops a non-empty text to zero tokens
+    assert low.count('hi') == 1
+
+
+@pytest.mark.filterwarnings('ignore::FutureWarning')
+def test_gemini_usage_metadata_calibrates_the_counter(monkeypatch):
+    pytest.importorskip('google.generativeai')
+    from services.llm_providers import GeminiProvider
+
+    monkeypatch.setattr(Config, 'GEMINI_API_KEY', 'test-key')
+    provider = GeminiProvider('gemini-test')
+    provider.token_counter = TokenCounter()
+    prompt = 'word ' * 100
+    reply = SimpleNamespace(text='answer', usage_metadata=SimpleNamespace(prompt_token_count=100 * 50))
+    provider.client = SimpleNamespace(generate_content=lambda *args, **kwargs: reply)
+
+    assert provider.generate(prompt, timeout=5) == 'answer'
+    assert provider.token_counter.factor == 4.0
+
+
+@pytest.fixture
+def service():
+    service = GeminiService('stub')
+    service.token_counter = TokenCounter()
+    return service
+
+
+def history(count, tokens, chars=600):
+    return [
+        {'sender_type': 'user' if index % 2 == 0 else 'bot',
+         'content': f"{index:03d}" + 'x' * (chars - 3),
+         'token_count': tokens}
+        for index in range(count)
+    ]
+
+
+def test_pack_history_keeps_the_newest_turns_and_truncates_the_oldest(service):
+    budget = Config.HISTORY_TOKEN_BUDGET
+    tokens = 120
+    messages = history(budget // tokens + 10, tokens)
+    fits = budget // tokens
+
+    packed = service._pack_history(messages, budget)
+
+    assert packed[1:] == messages[-fits:]
+    oldest = packed[0]
+    source = messages[-fits - 1]
+    assert oldest['content'].startswith(source['content'][:3])
+    assert oldest['content'].endswith(' ...[truncated]')
+    remaining = budget - fits * tokens
+    assert len(oldest['content']) == len(source['content']) * remaining // tokens + len(' ...[truncated]')
+
+
+def test_pack_history_drops_a_remainder_too_small_to_be_useful(service, monkeypatch):
+    monkeypatch.setattr(Config, 'HISTORY_MIN_PARTIAL_TOKENS', 64)
+    messages = history(10, 100)
+
+    packed = service._pack_history(messages, 350)
+
+    # 50 tokens are left for the fourth-newest message, under the minimum
+    assert packed == messages[-3:]
+
+
+def test_pack_history_counts_messages_without_a_stored_count(service):
+    messages = [{'sender_type': 'user', 'content': 'word ' * 40}, {'sender_type': 'bot', 'content': 'short'}]
+
+    assert service._pack_history(messages, 100) == messages
+    assert service._pack_history(messages, 10) == messages[-1:]
+
+
+def test_prompt_includes_only_the_packed_history(service):
+    messages = history(Config.HISTORY_TOKEN_BUDGET // 100 + 5, 100)
+
+    prompt = service._prepare_prompt('now', messages)
+
+    assert messages[-1]['content'] in prompt
+    assert messages[0]['content'] not in prompt
+    assert prompt.endswith('User: now\nAssistant:')